@@ -1,11 +1,24 @@
+import json
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from core.cache import ResponseCache
+from core.model_client import ModelClient
+from core.prompts import PromptTemplate, compile_template
+from core.metrics import AGENT_TASK_SECONDS, PROMPT_BUILD_SECONDS, AGENT_IN_FLIGHT, CACHE_LOOKUPS, record_timing
 
 class BaseAgent(ABC):
-    def __init__(self, name: str):
+    def __init__(self, name: str, cache: Optional[ResponseCache] = None,
+                 model_client: Optional[ModelClient] = None):
         self.name = name
+        self.cache = cache
+        self.model_client = model_client
         self.system_prompt = self._get_system_prompt()
         self.task_prompts = self._get_task_prompts()
+        # Templates are parsed once per distinct template text and shared by every instance
+        self.templates: Dict[str, PromptTemplate] = {
+            task_type: compile_template(template) for task_type, template in self.task_prompts.items()
+        }
 
     @abstractmethod
     def _get_system_prompt(self) -> str:
@@ -18,10 +31,63 @@ class BaseAgent(ABC):
         pass
 
     @abstractmethod
+    async def _execute_task(self, task_type: str, prompt: str, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Produce results for a formatted prompt without a model (used when no model client is set)."""
+        pass
+
+    async def _run_task(self, task_type: str, prompt: str, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Send the prompt to the model client if one is configured, otherwise run the agent locally."""
+        if self.model_client is None:
+            return await self._execute_task(task_type, prompt, task)
+        completion = await self.model_client.complete(self.name, self.system_prompt, prompt, task_type)
+        try:
+            result = json.loads(completion)
+        except ValueError:
+            raise ValueError(f"{self.name} received a non-JSON completion for {task_type}")
+        if not isinstance(result, dict):
+            raise ValueError(f"{self.name} expected a JSON object for {task_type}")
+        return result
+
     async def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
-        """Process a task and return the results."""
+        """Process a task and return the results, serving repeated prompts from the cache."""
+        task_type = task.get("type")
+        if task_type not in self.task_prompts:
+            raise ValueError(f"Unknown task type: {task_type}")
+
+        start = time.perf_counter()
+        AGENT_IN_FLIGHT.inc(agent=self.name)
+        try:
+            # Format the prompt with the task data; missing fields are rejected before any work is done
+            prompt = self.templates[task_type].render(task)
+            prompt_seconds = time.perf_counter() - start
+            PROMPT_BUILD_SECONDS.observe(prompt_seconds, agent=self.name, task_type=task_type)
+            record_timing(f"{self.name}.prompt", prompt_seconds)
+
+            if self.cache is None:
+                return await self._run_task(task_type, prompt, task)
+
+            key = self.cache.make_key(self.name, task_type, prompt)
+            cached = await self.cache.aget(key)
+            CACHE_LOOKUPS.inc(agent=self.name, result="miss" if cached is None else "hit")
+            if cached is not None:
+                return cached
+            result = await self._run_task(task_type, prompt, task)
+            await self.cache.aset(key, result)
+            return result
+        finally:
+            AGENT_IN_FLIGHT.dec(agent=self.name)
+            elapsed = time.perf_counter() - start
+            AGENT_TASK_SECONDS.observe(elapsed, agent=self.name, task_type=task_type)
+            record_timing(f"{self.name}.{task_type}", elapsed)
+
+    async def warm_up(self) -> None:
+        """Prepare resources before the agent takes traffic. No-op by default."""
+        pass
+
+    async def shutdown(self) -> None:
+        """Release resources when the agent is retired. No-op by default."""
         pass
 
     def _format_prompt(self, prompt_template: str, **kwargs) -> str:
         """Format a prompt template with the provided kwargs."""
-        return prompt_template.format(**kwargs) 
\ No newline at end of file
+        return compile_template(prompt_template).render(kwargs)
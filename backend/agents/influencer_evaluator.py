@@ -1,9 +1,18 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from agents.base_agent import BaseAgent
+from core.cache import ResponseCache
+from core.model_client import ModelClient
+from core.influencer_catalog import InfluencerCatalog
+from core.feature_store import DemographicFeatureStore
 
 class InfluencerEvaluator(BaseAgent):
-    def __init__(self):
-        super().__init__("InfluencerEvaluator")
+    def __init__(self, cache: Optional[ResponseCache] = None, model_client: Optional[ModelClient] = None,
+                 catalog: Optional[InfluencerCatalog] = None, shortlist_size: int = 10,
+                 feature_store: Optional[DemographicFeatureStore] = None):
+        super().__init__("InfluencerEvaluator", cache, model_client)
+        self.catalog = catalog
+        self.feature_store = feature_store
+        self.shortlist_size = shortlist_size
 
     def _get_system_prompt(self) -> str:
         return """You are an expert Influencer Evaluation Agent specialized in analyzing influencer profiles 
@@ -35,15 +44,29 @@ class InfluencerEvaluator(BaseAgent):
         }
 
     async def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
-        task_type = task.get("type")
-        if task_type not in self.task_prompts:
-            raise ValueError(f"Unknown task type: {task_type}")
+        # Influencers with precomputed demographics are matched directly against the store, without a prompt
+        if self.feature_store is not None and task.get("type") == "demographic_analysis":
+            analysis = self.feature_store.analyze(task.get("name"), task.get("target_audience"))
+            if analysis is not None:
+                return analysis
+        result = await super().process_task(task)
+        # The shortlist is cheap and depends on fields outside the prompt, so it is never cached
+        if self.catalog is not None and task.get("type") == "profile_analysis" and not task.get("name"):
+            result = dict(result, shortlist=self._shortlist(task))
+        return result
 
-        # Format the prompt with the task data
-        prompt = self._format_prompt(self.task_prompts[task_type], **task)
-        
-        # In a real implementation, this would call an AI model with the prompt
-        # For now, we'll return mock data based on the task type
+    def _shortlist(self, task: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Score the catalog against the task's categories, audiences and platforms."""
+        platforms = task.get("platforms") or ([task["platform"]] if task.get("platform") else None)
+        return self.catalog.shortlist(
+            categories=task.get("categories"),
+            audiences=task.get("audiences"),
+            platforms=platforms,
+            k=self.shortlist_size
+        )
+
+    async def _execute_task(self, task_type: str, prompt: str, task: Dict[str, Any]) -> Dict[str, Any]:
+        # Without a model client configured, return mock data based on the task type
         if task_type == "profile_analysis":
             return {
                 "score": 85,
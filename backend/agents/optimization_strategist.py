@@ -1,9 +1,16 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from agents.base_agent import BaseAgent
+from core.cache import ResponseCache
+from core.model_client import ModelClient
+from core.budget_optimizer import BudgetOptimizer
+from core.query_parser import get_default_parser
+from agents.campaign_predictor import DEFAULT_WEEKS
 
 class OptimizationStrategist(BaseAgent):
-    def __init__(self):
-        super().__init__("OptimizationStrategist")
+    def __init__(self, cache: Optional[ResponseCache] = None, model_client: Optional[ModelClient] = None,
+                 optimizer: Optional[BudgetOptimizer] = None):
+        super().__init__("OptimizationStrategist", cache, model_client)
+        self.optimizer = optimizer or BudgetOptimizer()
 
     def _get_system_prompt(self) -> str:
         return """You are an expert Optimization Strategy Agent specialized in improving marketing campaign 
@@ -34,15 +41,28 @@ class OptimizationStrategist(BaseAgent):
         }
 
     async def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
-        task_type = task.get("type")
-        if task_type not in self.task_prompts:
-            raise ValueError(f"Unknown task type: {task_type}")
+        result = await super().process_task(task)
+        # With candidates and a budget, the allocation and its improvements are solved for rather than generated
+        if task.get("type") == "campaign_optimization" and task.get("candidates") and task.get("budget_constraints"):
+            allocation = self.allocate_budget(task)
+            plan = dict(result.get("optimization_plan") or {}, budget_allocation=allocation)
+            result = dict(result, optimization_plan=plan, expected_improvements=allocation["expected_improvements"])
+        return result
 
-        # Format the prompt with the task data
-        prompt = self._format_prompt(self.task_prompts[task_type], **task)
-        
-        # In a real implementation, this would call an AI model with the prompt
-        # For now, we'll return mock data based on the task type
+    def allocate_budget(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Split the task's budget across its candidates to maximize expected net return over its timeline."""
+        weeks = get_default_parser().parse(str(task["timeline"]))["duration_weeks"] if task.get("timeline") else None
+        return self.optimizer.allocate(
+            float(task["budget_constraints"]),
+            task["candidates"],
+            weeks=weeks or DEFAULT_WEEKS,
+            channel_curves=task.get("channel_curves"),
+            max_channel_share=task.get("max_channel_share"),
+            max_candidate_share=task.get("max_candidate_share") or 1.0
+        )
+
+    async def _execute_task(self, task_type: str, prompt: str, task: Dict[str, Any]) -> Dict[str, Any]:
+        # Without a model client configured, return mock data based on the task type
         if task_type == "campaign_optimization":
             return {
                 "optimization_plan": {
@@ -51,11 +71,8 @@ class OptimizationStrategist(BaseAgent):
                         "Focus on user-generated content",
                         "Highlight sustainability aspects"
                     ],
-                    "budget_allocation": {
-                        "influencer_payout": "60%",
-                        "content_production": "20%",
-                        "promotion": "20%"
-                    },
+                    # Solved by the budget optimizer when the task lists candidates
+                    "budget_allocation": None,
                     "timing_adjustments": [
                         "Peak engagement times",
                         "Seasonal considerations",
@@ -67,11 +84,7 @@ class OptimizationStrategist(BaseAgent):
                         "geographic_concentration": "Urban centers"
                     }
                 },
-                "expected_improvements": {
-                    "engagement_rate": "+15%",
-                    "conversion_rate": "+8%",
-                    "roi": "+25%"
-                }
+                "expected_improvements": None
             }
         else:
             return {
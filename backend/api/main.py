@@ -1,12 +1,49 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from fastapi.responses import StreamingResponse, PlainTextResponse, FileResponse
+from fastapi.exceptions import ResponseValidationError
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional, AsyncIterator
+from contextlib import asynccontextmanager
+import asyncio
 import os
+import secrets
+import time
+import numpy as np
+import orjson
 from core.orchestrator import Orchestrator
+from core.cache import ResponseCache, MemoryCacheBackend, SqliteCacheBackend
+from core.model_client import ModelClient, HTTPModelClient, RetryPolicy
+from core.batching import BatchingModelClient
+from core.agent_pool import AgentPoolError
+from core.influencer_catalog import InfluencerCatalog
+from core.feature_store import DemographicFeatureStore
+from core.forecast import CampaignForecaster
+from core.budget_optimizer import BudgetOptimizer
+from core.campaign_sessions import CampaignSessionStore
+from core.semantic_cache import SemanticQueryCache
+from core.audience_sketches import AudienceSketchStore
+from core.trend_store import TrendStore
+from core.jobs import JobQueue, JobQueueError, MemoryJobStore, SqliteJobStore, TERMINAL_STATUSES
+from core.metrics import REGISTRY, HTTP_REQUEST_SECONDS, INVALID_RESPONSES, request_timings
+from core.profiling import RequestProfiler, FORMATS as PROFILE_FORMATS
+from api.responses import FastJSONResponse, AnalyzeResponse, QueryResponse, BatchAnalyzeResponse
 from simulation import QueryProcessor
 
-app = FastAPI(title="MarketMuse API", description="AI-driven marketing intelligence system")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if orchestrator is not None:
+        await orchestrator.start()
+    await job_queue.start()
+    yield
+    await job_queue.shutdown(DRAIN_TIMEOUT)
+    if orchestrator is not None:
+        await orchestrator.shutdown(DRAIN_TIMEOUT)
+    if model_client is not None:
+        await model_client.aclose()
+
+app = FastAPI(title="MarketMuse API", description="AI-driven marketing intelligence system", lifespan=lifespan,
+              default_response_class=FastJSONResponse)
 
 # Configure CORS
 app.add_middleware(
@@ -19,8 +56,224 @@ app.add_middleware(
 
 # Initialize components based on environment
 IS_SIMULATION = os.getenv("MARKETMUSE_SIMULATION", "false").lower() == "true"
-orchestrator = Orchestrator() if not IS_SIMULATION else None
+MAX_BATCH_SIZE = int(os.getenv("MARKETMUSE_MAX_BATCH_SIZE", "1000"))
+MAX_BATCH_CONCURRENCY = int(os.getenv("MARKETMUSE_MAX_BATCH_CONCURRENCY", "32"))
+AGENT_POOL_SIZE = int(os.getenv("MARKETMUSE_AGENT_POOL_SIZE", "4"))
+AGENT_QUEUE_LIMIT = int(os.getenv("MARKETMUSE_AGENT_QUEUE_LIMIT", "64"))
+AGENT_ACQUIRE_TIMEOUT = float(os.getenv("MARKETMUSE_AGENT_ACQUIRE_TIMEOUT", "0")) or None
+DRAIN_TIMEOUT = float(os.getenv("MARKETMUSE_DRAIN_TIMEOUT", "30"))
+MAX_SWEEP_SCENARIOS = int(os.getenv("MARKETMUSE_MAX_SWEEP_SCENARIOS", "10000"))
+MAX_ALLOCATION_CANDIDATES = int(os.getenv("MARKETMUSE_MAX_ALLOCATION_CANDIDATES", "10000"))
+MAX_SESSIONS = int(os.getenv("MARKETMUSE_MAX_SESSIONS", "1024"))
+SESSION_TTL = float(os.getenv("MARKETMUSE_SESSION_TTL", "3600"))
+JOB_MAX_WAIT = float(os.getenv("MARKETMUSE_JOB_MAX_WAIT", "30"))
+# Send orchestrator results as-is instead of re-validating them against the response models
+TRUSTED_RESPONSES = os.getenv("MARKETMUSE_TRUSTED_RESPONSES", "false").lower() == "true"
+# Default request deadline in seconds (0 = none); requests can set their own with a `deadline` field
+REQUEST_DEADLINE = float(os.getenv("MARKETMUSE_REQUEST_DEADLINE", "0")) or None
+# Seconds before a late model call under a deadline is backed up by the agent's local response (0 = only on failure)
+HEDGE_AFTER = float(os.getenv("MARKETMUSE_HEDGE_AFTER", "0")) or None
+
+def _build_response_cache() -> Optional[ResponseCache]:
+    """Create the agent response cache from MARKETMUSE_CACHE_* settings, or None when disabled."""
+    if os.getenv("MARKETMUSE_CACHE", "true").lower() != "true":
+        return None
+    ttl = float(os.getenv("MARKETMUSE_CACHE_TTL", "300"))
+    max_entries = int(os.getenv("MARKETMUSE_CACHE_SIZE", "1024"))
+    path = os.getenv("MARKETMUSE_CACHE_PATH")
+    backend = SqliteCacheBackend(path, max_entries) if path else MemoryCacheBackend(max_entries)
+    return ResponseCache(backend, ttl=ttl)
+
+def _build_semantic_cache() -> Optional[SemanticQueryCache]:
+    """Create the paraphrase-tolerant query cache from MARKETMUSE_SEMANTIC_CACHE_* settings, or None when disabled."""
+    if os.getenv("MARKETMUSE_SEMANTIC_CACHE", "false").lower() != "true":
+        return None
+    return SemanticQueryCache(
+        max_entries=int(os.getenv("MARKETMUSE_SEMANTIC_CACHE_SIZE", "10000")),
+        threshold=float(os.getenv("MARKETMUSE_SEMANTIC_CACHE_THRESHOLD", "0.9")),
+        ttl=float(os.getenv("MARKETMUSE_SEMANTIC_CACHE_TTL", os.getenv("MARKETMUSE_CACHE_TTL", "300")))
+    )
+
+def _build_model_client() -> Optional[ModelClient]:
+    """Create the shared model client from MARKETMUSE_MODEL_* settings, or None to use mock agents."""
+    base_url = os.getenv("MARKETMUSE_MODEL_URL")
+    if not base_url:
+        return None
+    rate = os.getenv("MARKETMUSE_MODEL_RATE")
+    client = HTTPModelClient(
+        base_url,
+        api_key=os.getenv("MARKETMUSE_MODEL_API_KEY"),
+        timeout=float(os.getenv("MARKETMUSE_MODEL_TIMEOUT", "30")),
+        max_concurrency=int(os.getenv("MARKETMUSE_MODEL_MAX_CONCURRENCY", "32")),
+        per_agent_concurrency=int(os.getenv("MARKETMUSE_MODEL_AGENT_CONCURRENCY", "8")),
+        requests_per_second=float(rate) if rate else None,
+        retry_policy=RetryPolicy(max_retries=int(os.getenv("MARKETMUSE_MODEL_RETRIES", "3")))
+    )
+    if os.getenv("MARKETMUSE_MODEL_BATCHING", "false").lower() != "true":
+        return client
+    # A batch never holds more prompts than an agent has workers, so the pool size is both the default and the limit
+    batch_size = int(os.getenv("MARKETMUSE_MODEL_BATCH_SIZE", str(AGENT_POOL_SIZE)))
+    if batch_size > AGENT_POOL_SIZE:
+        raise ValueError(f"MARKETMUSE_MODEL_BATCH_SIZE ({batch_size}) cannot exceed MARKETMUSE_AGENT_POOL_SIZE "
+                         f"({AGENT_POOL_SIZE}); a batch could never fill")
+    return BatchingModelClient(
+        client,
+        max_batch_size=batch_size,
+        max_wait=float(os.getenv("MARKETMUSE_MODEL_BATCH_WINDOW", "0.005"))
+    )
+
+def _build_job_queue() -> JobQueue:
+    """Create the background job queue from MARKETMUSE_JOB_* settings."""
+    path = os.getenv("MARKETMUSE_JOB_STORE_PATH")
+    return JobQueue(
+        SqliteJobStore(path) if path else MemoryJobStore(),
+        workers=int(os.getenv("MARKETMUSE_JOB_WORKERS", "4")),
+        max_queued=int(os.getenv("MARKETMUSE_JOB_QUEUE_LIMIT", "256")),
+        result_ttl=float(os.getenv("MARKETMUSE_JOB_TTL", "3600"))
+    )
+
+# Bearer token for admin routes and header-triggered profiling; without one they are disabled
+ADMIN_TOKEN = os.getenv("MARKETMUSE_ADMIN_TOKEN")
+
+def _is_admin(request: Request) -> bool:
+    """Whether the request carries the admin token as `Authorization: Bearer <token>`."""
+    if not ADMIN_TOKEN:
+        return False
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and secrets.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+async def require_admin(request: Request) -> None:
+    """Route dependency rejecting requests without the admin token."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin routes are disabled; set MARKETMUSE_ADMIN_TOKEN")
+    if not _is_admin(request):
+        raise HTTPException(status_code=401, detail="Admin token required", headers={"WWW-Authenticate": "Bearer"})
+
+def _build_profiler() -> RequestProfiler:
+    """Create the request profiler from MARKETMUSE_PROFILE_* settings; it stays idle unless a request asks or is sampled."""
+    return RequestProfiler(
+        directory=os.getenv("MARKETMUSE_PROFILE_DIR"),
+        sample_rate=float(os.getenv("MARKETMUSE_PROFILE_SAMPLE_RATE", "0")),
+        allow_header=os.getenv("MARKETMUSE_PROFILE_HEADER", "false").lower() == "true",
+        keep=int(os.getenv("MARKETMUSE_PROFILE_KEEP", "50"))
+    )
+
+CATALOG_PATH = os.getenv("MARKETMUSE_CATALOG_PATH")
+# Built with `python -m core.feature_store`; memory-mapped, so uvicorn workers share one copy
+FEATURE_STORE_PATH = os.getenv("MARKETMUSE_FEATURE_STORE_PATH")
+# Built with `python -m core.audience_sketches`; enables deduplicated reach across influencer sets
+AUDIENCE_SKETCH_PATH = os.getenv("MARKETMUSE_AUDIENCE_SKETCH_PATH")
+audience_sketches = AudienceSketchStore.open(AUDIENCE_SKETCH_PATH) if AUDIENCE_SKETCH_PATH else None
+# Built with `python -m core.trend_store` from historical campaign outcome logs
+TREND_STORE_PATH = os.getenv("MARKETMUSE_TREND_STORE_PATH")
+trend_store = TrendStore.open(TREND_STORE_PATH) if TREND_STORE_PATH else None
+
+model_client = _build_model_client() if not IS_SIMULATION else None
+orchestrator = Orchestrator(
+    cache=_build_response_cache(),
+    model_client=model_client,
+    pool_size=AGENT_POOL_SIZE,
+    max_waiting=AGENT_QUEUE_LIMIT,
+    acquire_timeout=AGENT_ACQUIRE_TIMEOUT,
+    catalog=InfluencerCatalog.load(CATALOG_PATH) if CATALOG_PATH else None,
+    feature_store=DemographicFeatureStore.open(FEATURE_STORE_PATH) if FEATURE_STORE_PATH else None,
+    sessions=CampaignSessionStore(MAX_SESSIONS, SESSION_TTL),
+    request_deadline=REQUEST_DEADLINE,
+    hedge_after=HEDGE_AFTER,
+    semantic_cache=_build_semantic_cache(),
+    audience_sketches=audience_sketches,
+    trend_store=trend_store
+) if not IS_SIMULATION else None
 simulation_processor = QueryProcessor() if IS_SIMULATION else None
+forecaster = orchestrator.forecaster if orchestrator is not None else CampaignForecaster()
+budget_optimizer = (orchestrator.optimizer if orchestrator is not None
+                    else BudgetOptimizer(forecaster, audience_sketches=audience_sketches))
+job_queue = _build_job_queue()
+profiler = _build_profiler()
+
+def _register_app_metrics() -> None:
+    """Expose cache, coalescing and pool state of this process's orchestrator as gauges."""
+    cache = orchestrator.cache
+    if cache is not None:
+        REGISTRY.gauge("marketmuse_cache_hit_ratio", "Response cache hit ratio since startup",
+                       collect=lambda: {(): cache.stats()["hit_rate"]})
+        REGISTRY.gauge("marketmuse_cache_entries", "Entries in the response cache",
+                       collect=lambda: {(): len(cache.backend)})
+    semantic_cache = orchestrator.semantic_cache
+    if semantic_cache is not None:
+        REGISTRY.gauge("marketmuse_semantic_cache_hit_ratio", "Semantic query cache hit ratio since startup",
+                       collect=lambda: {(): semantic_cache.stats()["hit_rate"]})
+        REGISTRY.gauge("marketmuse_semantic_cache_entries", "Queries held in the semantic cache",
+                       collect=lambda: {(): len(semantic_cache)})
+        REGISTRY.gauge("marketmuse_semantic_cache_bytes", "Memory held by the semantic cache's vector index",
+                       collect=lambda: {(): semantic_cache.index.nbytes})
+    if isinstance(model_client, BatchingModelClient):
+        REGISTRY.gauge("marketmuse_model_batch_waiting", "Prompts waiting for their model batch to be sent",
+                       collect=lambda: {(): model_client.stats()["waiting"]})
+    REGISTRY.gauge("marketmuse_orchestrator_in_flight", "Distinct orchestrator runs in flight",
+                   collect=lambda: {(): orchestrator.single_flight.stats()["in_flight"]})
+    REGISTRY.gauge("marketmuse_campaign_sessions", "Campaign sessions held for incremental re-analysis",
+                   collect=lambda: {(): len(orchestrator.sessions)})
+    REGISTRY.gauge("marketmuse_pool_busy_workers", "Busy workers per agent pool", ("agent",),
+                   collect=lambda: {(key,): stats["busy"] for key, stats in orchestrator.pool_stats().items()})
+    REGISTRY.gauge("marketmuse_pool_waiting", "Tasks waiting for a worker per agent pool", ("agent",),
+                   collect=lambda: {(key,): stats["waiting"] for key, stats in orchestrator.pool_stats().items()})
+
+if orchestrator is not None:
+    _register_app_metrics()
+REGISTRY.gauge("marketmuse_job_queue_depth", "Background jobs waiting for a worker",
+               collect=lambda: {(): job_queue.queued})
+REGISTRY.gauge("marketmuse_jobs_running", "Background jobs currently running",
+               collect=lambda: {(): job_queue.running})
+
+@app.exception_handler(ResponseValidationError)
+async def invalid_response(request: Request, exc: ResponseValidationError):
+    """
+    Report a result that does not match its response model (agent output is model-generated)
+    as a bad gateway, listing where it failed, instead of an unhandled 500.
+    """
+    route = request.scope.get("route")
+    INVALID_RESPONSES.inc(path=route.path if route is not None else "unmatched")
+    errors = [{"loc": list(error.get("loc", ())), "msg": error.get("msg"), "type": error.get("type")}
+              for error in exc.errors()]
+    return FastJSONResponse({"detail": "Agent result did not match the response schema", "errors": errors},
+                            status_code=502)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Time every request; add a Server-Timing breakdown when the client sends X-MarketMuse-Timing.
+    Sampled requests, and admin requests that send X-MarketMuse-Profile, are profiled; see core.profiling.
+    """
+    timings = {} if request.headers.get("x-marketmuse-timing") else None
+    token = request_timings.set(timings)
+    # The token is only checked when the header is present, so other requests pay nothing for it
+    requested = bool(request.headers.get("x-marketmuse-profile")) and profiler.allow_header and _is_admin(request)
+    trigger = profiler.select(requested)
+    start = time.perf_counter()
+    status = 500
+    try:
+        if trigger is None:
+            response = await call_next(request)
+        else:
+            # A streamed body is still being sent after call_next returns, so its profile ends at the headers
+            async with profiler.profile(f"{request.method} {request.url.path}", trigger) as profile:
+                response = await call_next(request)
+                profile.status = response.status_code
+            response.headers["X-MarketMuse-Profile-Id"] = profile.profile_id
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        request_timings.reset(token)
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        HTTP_REQUEST_SECONDS.observe(elapsed, method=request.method, path=path, status=status)
+    if timings is not None:
+        timings["total"] = elapsed
+        response.headers["Server-Timing"] = ", ".join(
+            f"{name.replace('.', '_')};dur={seconds * 1000:.3f}" for name, seconds in timings.items()
+        )
+    return response
 
 class CampaignRequest(BaseModel):
     brand_name: str
@@ -34,60 +287,334 @@ class CampaignRequest(BaseModel):
     engagement_rate: Optional[float] = None
     categories: Optional[List[str]] = None
     target_metrics: Optional[Dict[str, Any]] = None
+    candidates: Optional[List[Dict[str, Any]]] = None
+    max_channel_share: Optional[Dict[str, float]] = None
+    session_id: Optional[str] = None
+    deadline: Optional[float] = Field(None, gt=0)
 
 class QueryRequest(BaseModel):
     query: str
+    deadline: Optional[float] = Field(None, gt=0)
+
+class BatchAnalyzeRequest(BaseModel):
+    items: List[CampaignRequest]
+    max_concurrency: int = 8
 
-@app.post("/api/analyze")
+class ForecastSweepRequest(BaseModel):
+    budgets: List[float]
+    weeks: List[float]
+    followers: List[int]
+    engagement_rates: List[float]
+    audience_fit: float = 0.7
+    samples: int = 128
+
+class AudienceReachRequest(BaseModel):
+    influencers: List[str]
+
+class ProfilingSettings(BaseModel):
+    sample_rate: Optional[float] = None
+    allow_header: Optional[bool] = None
+
+class BudgetAllocationRequest(BaseModel):
+    total_budget: float
+    candidates: List[Dict[str, Any]]
+    weeks: float = 4.0
+    channel_curves: Optional[Dict[str, Dict[str, float]]] = None
+    max_channel_share: Optional[Dict[str, float]] = None
+    max_candidate_share: float = 1.0
+    min_marginal_return: float = 1.0
+
+@app.post("/api/analyze", response_model=AnalyzeResponse, response_model_exclude_unset=True)
 async def analyze(request: Dict[str, Any]):
     """
     Unified endpoint for analyzing marketing campaigns or processing queries.
+    Campaign requests carrying a session_id only recompute the stages their changes affect.
+    With a `deadline` in seconds, the agents that answered in time are returned with per-agent status flags.
+    """
+    _check_deadline(request)
+    try:
+        return _respond(await _analyze(request))
+    except AgentPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": "1"})
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _respond(result: Dict[str, Any]) -> Any:
+    """Skip response model validation and encoding for trusted results; otherwise let FastAPI validate them."""
+    return FastJSONResponse(result) if TRUSTED_RESPONSES else result
+
+def _check_deadline(request: Dict[str, Any]) -> None:
+    """Reject a `deadline` on an untyped request body unless it is a positive number of seconds."""
+    deadline = request.get("deadline")
+    if deadline is None:
+        return
+    if isinstance(deadline, bool) or not isinstance(deadline, (int, float)) or not 0 < deadline < float("inf"):
+        raise HTTPException(status_code=400, detail="deadline must be a positive number of seconds")
+    request["deadline"] = float(deadline)
+
+async def _analyze(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a query or campaign request in the configured mode."""
+    deadline = request.pop("deadline", None)
+    # Check if this is a campaign request or a query request
+    if "query" in request:
+        # This is a query request
+        if IS_SIMULATION:
+            return await simulation_processor.process_query(request["query"])
+        return await orchestrator.process_query(request["query"], deadline)
+    # This is a campaign request
+    if IS_SIMULATION:
+        # Convert campaign request to a query string for simulation
+        query = f"Analyze campaign for {request.get('brand_name')} in {request.get('product_category')} targeting {request.get('target_audience')} with budget {request.get('budget')}"
+        return await simulation_processor.process_query(query)
+    session_id = request.pop("session_id", None)
+    return await orchestrator.process_campaign_request(request, session_id, deadline)
+
+@app.post("/api/jobs/analyze", status_code=202)
+async def submit_analysis_job(request: Dict[str, Any]):
+    """
+    Queue the same work as /api/analyze and return a job ID at once.
+    Poll GET /api/jobs/{job_id} (optionally with ?wait=<seconds>) for the result.
+    """
+    _check_deadline(request)
+    try:
+        record = await job_queue.submit("analyze", lambda: _analyze(request))
+    except JobQueueError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": "1"})
+    return FastJSONResponse(record, status_code=202, headers={"Location": f"/api/jobs/{record['job_id']}"})
+
+@app.get("/api/jobs")
+async def job_queue_stats():
+    """
+    Job queue depth, running jobs and outcome counters.
+    """
+    return await job_queue.stats()
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    """
+    Return a job's status and, once finished, its result or error.
+    With wait > 0, hold the request until the job finishes or `wait` seconds pass (capped).
     """
+    if wait > 0:
+        record = await job_queue.wait(job_id, min(wait, JOB_MAX_WAIT))
+    else:
+        record = await job_queue.get(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return record
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job.
+    """
+    record = await job_queue.get(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    if record["status"] in TERMINAL_STATUSES:
+        return record
+    if not job_queue.owns(job_id):
+        raise HTTPException(status_code=409, detail="Job is owned by another worker process")
+    await job_queue.cancel(job_id)
+    # A running job records its cancellation once its task unwinds
+    return await job_queue.wait(job_id, 1.0)
+
+@app.post("/api/analyze/batch", response_model=BatchAnalyzeResponse, response_model_exclude_unset=True)
+async def analyze_batch(request: BatchAnalyzeRequest):
+    """
+    Analyze many campaign requests in one call. Returns per-item results and errors.
+    """
+    if len(request.items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_SIZE} items")
+    if request.max_concurrency < 1:
+        raise HTTPException(status_code=400, detail="max_concurrency must be at least 1")
+    max_concurrency = min(request.max_concurrency, MAX_BATCH_CONCURRENCY)
     try:
-        # Check if this is a campaign request or a query request
-        if "query" in request:
-            # This is a query request
-            if IS_SIMULATION:
-                result = simulation_processor.process_query(request["query"])
-                return result
-            else:
-                result = await orchestrator.process_query(request["query"])
-                return result
+        if IS_SIMULATION:
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            async def simulate(index: int, item: CampaignRequest) -> Dict[str, Any]:
+                query = f"Analyze campaign for {item.brand_name} in {item.product_category} targeting {item.target_audience} with budget {item.budget}"
+                async with semaphore:
+                    return {"index": index, "status": "ok", "result": await simulation_processor.process_query(query)}
+
+            items = await asyncio.gather(*[simulate(index, item) for index, item in enumerate(request.items)])
         else:
-            # This is a campaign request
-            if IS_SIMULATION:
-                # Convert campaign request to a query string for simulation
-                query = f"Analyze campaign for {request.get('brand_name')} in {request.get('product_category')} targeting {request.get('target_audience')} with budget {request.get('budget')}"
-                result = simulation_processor.process_query(query)
-                return result
-            else:
-                result = await orchestrator.process_campaign_request(request)
-                return result
+            items = await orchestrator.process_campaign_batch(
+                [item.model_dump(exclude={"session_id", "deadline"}) for item in request.items], max_concurrency
+            )
+        return _respond({
+            "items": items,
+            "succeeded": sum(1 for item in items if item["status"] == "ok"),
+            "failed": sum(1 for item in items if item["status"] == "error")
+        })
+    except AgentPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/process-query")
+@app.post("/api/forecast/sweep")
+async def forecast_sweep(request: ForecastSweepRequest):
+    """
+    Forecast every combination of the given budgets, durations, follower counts and engagement rates.
+    """
+    grid_size = len(request.budgets) * len(request.weeks) * len(request.followers) * len(request.engagement_rates)
+    if grid_size == 0:
+        raise HTTPException(status_code=400, detail="Every sweep dimension needs at least one value")
+    if grid_size > MAX_SWEEP_SCENARIOS:
+        raise HTTPException(status_code=413, detail=f"Sweep exceeds {MAX_SWEEP_SCENARIOS} scenarios")
+    if not 1 <= request.samples <= 10000:
+        raise HTTPException(status_code=400, detail="samples must be between 1 and 10000")
+    grid = np.meshgrid(request.budgets, request.weeks, request.followers, request.engagement_rates, indexing="ij")
+    scenarios = forecaster.sweep(*[axis.ravel() for axis in grid], request.audience_fit, samples=request.samples)
+    return {"scenarios": scenarios, "count": len(scenarios)}
+
+@app.post("/api/optimize/budget")
+async def optimize_budget(request: BudgetAllocationRequest):
+    """
+    Allocate a total budget across candidate influencers to maximize expected net return.
+    """
+    if len(request.candidates) > MAX_ALLOCATION_CANDIDATES:
+        raise HTTPException(status_code=413, detail=f"Allocation exceeds {MAX_ALLOCATION_CANDIDATES} candidates")
+    if request.total_budget < 0 or not 0 < request.max_candidate_share <= 1:
+        raise HTTPException(status_code=400, detail="total_budget must be non-negative and max_candidate_share in (0, 1]")
+    return budget_optimizer.allocate(
+        request.total_budget,
+        request.candidates,
+        weeks=request.weeks,
+        channel_curves=request.channel_curves,
+        max_channel_share=request.max_channel_share,
+        max_candidate_share=request.max_candidate_share,
+        min_marginal_return=request.min_marginal_return
+    )
+
+@app.post("/api/audience/reach")
+async def audience_reach(request: AudienceReachRequest):
+    """
+    Estimate the deduplicated audience of a set of influencers from their audience sketches.
+    """
+    if audience_sketches is None:
+        raise HTTPException(status_code=404, detail="No audience sketch store is loaded")
+    if len(request.influencers) > MAX_ALLOCATION_CANDIDATES:
+        raise HTTPException(status_code=413, detail=f"Reach estimate exceeds {MAX_ALLOCATION_CANDIDATES} influencers")
+    return audience_sketches.reach_report(request.influencers)
+
+@app.get("/api/trends/{category}")
+async def category_trends(category: str):
+    """
+    Precomputed market trend aggregates for a product category from the historical campaign logs.
+    """
+    summary = trend_store.summary(category) if trend_store is not None else None
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"No trend data for category '{category}'")
+    return {"category": category, **summary}
+
+@app.post("/api/process-query", response_model=QueryResponse, response_model_exclude_unset=True)
 async def process_query(request: QueryRequest):
     """
     Process a marketing query and return agent responses and summary.
     """
     try:
         if IS_SIMULATION:
-            result = simulation_processor.process_query(request.query)
-            return result
+            result = await simulation_processor.process_query(request.query)
+            return _respond(result)
         else:
-            result = await orchestrator.process_query(request.query)
-            return result
+            result = await orchestrator.process_query(request.query, request.deadline)
+            return _respond(result)
+    except AgentPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": "1"})
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/process-query/stream")
+async def process_query_stream(request: QueryRequest, http_request: Request):
+    """
+    Stream each agent's response as it completes, followed by the summary.
+    Sends server-sent events when the client accepts text/event-stream, newline-delimited JSON otherwise.
+    """
+    use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+
+    async def events() -> AsyncIterator[str]:
+        source = simulation_processor if IS_SIMULATION else orchestrator
+        try:
+            async for event in source.stream_query(request.query):
+                yield _encode_stream_event(event, use_sse)
+        except Exception as e:
+            # Headers are already sent, so failures are reported in-band
+            yield _encode_stream_event({"event": "error", "data": {"detail": str(e)}}, use_sse)
+
+    media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+def _encode_stream_event(event: Dict[str, Any], use_sse: bool) -> str:
+    """Serialize one stream event as an SSE frame or an NDJSON line."""
+    data = orjson.dumps(event, default=str).decode()
+    if use_sse:
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+@app.delete("/api/sessions/{session_id}")
+async def end_session(session_id: str):
+    """
+    Drop a campaign session's stored stages.
+    """
+    if orchestrator is None or not orchestrator.sessions.discard(session_id):
+        raise HTTPException(status_code=404, detail="Unknown session")
+    return {"session_id": session_id, "status": "ended"}
+
+@app.get("/api/metrics")
+async def metrics():
+    """
+    Prometheus text-format metrics.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/profiling", dependencies=[Depends(require_admin)])
+async def profiling_status():
+    """
+    Request profiling settings and the kept profiles, newest first.
+    """
+    return {**profiler.configure(), "profiles": profiler.profiles()}
+
+@app.put("/api/profiling", dependencies=[Depends(require_admin)])
+async def configure_profiling(settings: ProfilingSettings):
+    """
+    Change the sampling rate (0 turns sampling off) and whether admin requests may ask for a profile
+    with X-MarketMuse-Profile.
+    """
+    try:
+        return profiler.configure(settings.sample_rate, settings.allow_header)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/profiling/{profile_id}", dependencies=[Depends(require_admin)])
+async def download_profile(profile_id: str, format: str = "speedscope"):
+    """
+    Download a kept profile as speedscope JSON or as a pstats file.
+    """
+    if format not in PROFILE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of {', '.join(PROFILE_FORMATS)}")
+    path = profiler.artifact(profile_id, format)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired profile, or no CPU profile was captured")
+    media_type = "application/json" if format == "speedscope" else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+
 @app.get("/api/health")
 async def health_check():
     """
     Health check endpoint.
     """
-    return {
+    health = {
         "status": "healthy",
         "service": "MarketMuse API",
         "mode": "simulation" if IS_SIMULATION else "production"
-    } 
\ No newline at end of file
+    }
+    if orchestrator is not None:
+        health["agent_pools"] = orchestrator.pool_stats()
+    health["jobs"] = await job_queue.stats()
+    return health 
\ No newline at end of file
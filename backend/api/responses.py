@@ -0,0 +1,160 @@
+"""
+Response models and the JSON response class for the API.
+
+The query response models mirror the QueryResponse types in
+frontend/src/types/index.ts; campaign and batch responses have no frontend
+counterpart. Declared fields are type-checked, but agent results come from
+model output, so every model also passes extra fields through, and fields that
+only one mode fills in (simulation strings, production numeric intervals) are
+optional. Routes
+using them set response_model_exclude_unset so optional fields an agent did not
+return are left out instead of being sent as null.
+"""
+from typing import Dict, Any, List, Optional, Union
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict
+
+from core.metrics import timed
+
+# Ints stay ints, so a validated response is byte-for-byte the agent's result
+Number = Union[int, float]
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson. Returning one from a route bypasses
+    response_model validation and jsonable_encoder, so it is reserved for trusted content.
+    """
+
+    def render(self, content: Any) -> bytes:
+        # Same fallbacks as the cache's json.dumps(default=str): numpy values and non-string keys pass through
+        with timed("serialize"):
+            return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class ResponseModel(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+
+class Interval(ResponseModel):
+    low: float
+    median: float
+    high: float
+    mean: float
+
+
+class InfluencerProfile(ResponseModel):
+    """A recommended (simulation) or shortlisted (catalog) influencer."""
+    name: str
+    platform: Optional[str] = None
+    followers: Union[int, str, None] = None
+    engagement_rate: Union[Number, str, None] = None
+    relevance_score: Optional[Number] = None
+    reason: Optional[str] = None
+    score: Optional[Number] = None
+    categories: Optional[List[str]] = None
+    audiences: Optional[List[str]] = None
+
+
+class PredictedMetrics(ResponseModel):
+    reach: Optional[str] = None
+    engagement_rate: Optional[str] = None
+    conversion_rate: Optional[str] = None
+    estimated_roi: Optional[str] = None
+
+
+class AgentResult(ResponseModel):
+    recommended_influencers: Optional[List[InfluencerProfile]] = None
+    shortlist: Optional[List[InfluencerProfile]] = None
+    predicted_metrics: Optional[PredictedMetrics] = None
+    predictions: Optional[Dict[str, Interval]] = None
+    probability_of_profit: Optional[Number] = None
+    recommendations: Optional[List[str]] = None
+    confidence_score: Optional[Number] = None
+    key_factors: Optional[List[str]] = None
+    budget_allocation: Optional[Dict[str, Any]] = None
+    timeline: Optional[Dict[str, Any]] = None
+
+
+class AgentResponse(ResponseModel):
+    agent: str
+    query: str
+    response: AgentResult
+
+
+class InfluencerSummary(ResponseModel):
+    name: Optional[str] = None
+    platform: Optional[str] = None
+    score: Optional[Number] = None
+    match_reasons: Optional[List[str]] = None
+
+
+class ExpectedPerformance(ResponseModel):
+    """Display strings in simulation mode; numeric intervals from the forecaster otherwise."""
+    reach: Optional[str] = None
+    engagement: Optional[str] = None
+    roi: Union[Interval, str, None] = None
+    expected_reach: Optional[Interval] = None
+    engagement_rate: Optional[Interval] = None
+    conversion_rate: Optional[Interval] = None
+    probability_of_profit: Optional[Number] = None
+    unique_audience: Optional[int] = None
+
+
+class AgentStatus(ResponseModel):
+    """How an agent fared under a request deadline: ok, fallback, failed, timeout or skipped."""
+    status: str
+    error: Optional[str] = None
+    elapsed_ms: Optional[float] = None
+
+
+class QuerySummary(ResponseModel):
+    top_influencers: List[Union[str, InfluencerSummary]]
+    expected_performance: ExpectedPerformance
+    key_recommendations: List[str]
+    confidence_score: Optional[Number] = None
+
+
+class QueryResponse(ResponseModel):
+    query: str
+    agent_responses: Dict[str, AgentResponse]
+    summary: QuerySummary
+    partial: Optional[bool] = None
+    agent_status: Optional[Dict[str, AgentStatus]] = None
+
+
+class CampaignSummary(ResponseModel):
+    recommended_influencers: List[InfluencerSummary]
+    expected_performance: ExpectedPerformance
+    key_recommendations: List[str]
+
+
+class CampaignResponse(ResponseModel):
+    """Stages that missed a request deadline are None."""
+    influencer_evaluation: Optional[AgentResult]
+    campaign_prediction: Optional[AgentResult]
+    optimization_recommendations: Optional[AgentResult]
+    market_trends: Optional[Dict[str, Any]]
+    summary: CampaignSummary
+    audience_demographics: Optional[Dict[str, Any]] = None
+    incremental: Optional[Dict[str, Any]] = None
+    partial: Optional[bool] = None
+    agent_status: Optional[Dict[str, AgentStatus]] = None
+
+
+AnalyzeResponse = Union[CampaignResponse, QueryResponse]
+
+
+class BatchItem(ResponseModel):
+    index: int
+    status: str
+    result: Optional[AnalyzeResponse] = None
+    error: Optional[str] = None
+
+
+class BatchAnalyzeResponse(ResponseModel):
+    items: List[BatchItem]
+    succeeded: int
+    failed: int
@@ -0,0 +1,99 @@
+"""
+Audience sketch accuracy and latency for deduplicated reach across influencer sets.
+
+Runs from the backend directory:
+
+    python -m benchmarks.audience_reach --influencers 2000 --set-sizes 2 10 100
+
+Synthetic audiences are drawn from a shared follower pool with a popularity skew,
+so influencers overlap the way real ones do. Reports the streaming builder's
+throughput on a text follower-ID file, store size, unique-reach and reach-report
+latency per candidate set size, their error against exact set unions, and the
+naive follower-sum error the sketches replace.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Any, List
+
+import numpy as np
+
+from benchmarks.common import summarize_latencies
+from core.audience_sketches import AudienceSketch, AudienceSketchStore
+
+
+def synthetic_audiences(influencers: int, pool: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Follower ID sets whose sizes follow a power law, drawn with a skew towards popular accounts."""
+    rng = np.random.default_rng(seed)
+    sizes = np.minimum((1000 * rng.pareto(1.2, influencers) + 1000).astype(np.int64), pool // 4)
+    audiences = {}
+    for index, size in enumerate(sizes.tolist()):
+        # A per-influencer offset into the pool gives each one a distinct neighbourhood plus shared popular accounts
+        local = (rng.integers(0, pool // 4) + rng.integers(0, pool // 20, size)) % pool
+        popular = (pool * rng.random(size // 2) ** 4).astype(np.int64)
+        audiences[f"creator_{index:06d}"] = np.unique(np.concatenate([local, popular])).astype(np.uint64)
+    return audiences
+
+
+def bench(influencers: int, pool: int, set_sizes: List[int], trials: int, file_ids: int) -> Dict[str, Any]:
+    audiences = synthetic_audiences(influencers, pool)
+    names = list(audiences)
+    results: Dict[str, Any] = {"influencers": influencers, "follower_pool": pool}
+    with tempfile.TemporaryDirectory() as directory:
+        ids_path = os.path.join(directory, "followers.txt")
+        ids = np.random.default_rng(1).integers(0, 10 ** 12, file_ids, dtype=np.uint64)
+        np.savetxt(ids_path, ids, fmt="%d")
+        began = time.perf_counter()
+        AudienceSketch.from_file(ids_path)
+        elapsed = time.perf_counter() - began
+        results["stream_ids_per_second"] = round(file_ids / elapsed)
+        results["stream_file_mb"] = round(os.path.getsize(ids_path) / 1024 / 1024, 1)
+
+        store_path = os.path.join(directory, "store")
+        began = time.perf_counter()
+        AudienceSketchStore.write(store_path, {name: AudienceSketch().update_ids(ids) for name, ids in audiences.items()})
+        results["build_s"] = round(time.perf_counter() - began, 2)
+        results["store_mb"] = round(sum(os.path.getsize(os.path.join(store_path, entry))
+                                        for entry in os.listdir(store_path)) / 1024 / 1024, 2)
+        store = AudienceSketchStore.open(store_path)
+
+        rng = np.random.default_rng(2)
+        for size in set_sizes:
+            unique_latencies, report_latencies, errors, naive_errors = [], [], [], []
+            for _ in range(trials):
+                chosen = [names[index] for index in rng.choice(len(names), size, replace=False)]
+                rows, _ = store.rows(chosen)
+                began = time.perf_counter()
+                estimate = store.unique_audience(rows)
+                unique_latencies.append(time.perf_counter() - began)
+                began = time.perf_counter()
+                store.reach_report(chosen)
+                report_latencies.append(time.perf_counter() - began)
+                exact = len(np.unique(np.concatenate([audiences[name] for name in chosen])))
+                errors.append(abs(estimate - exact) / exact)
+                naive_errors.append(sum(len(audiences[name]) for name in chosen) / exact - 1)
+            results[f"set_{size}"] = {
+                "unique_audience": summarize_latencies(unique_latencies),
+                "reach_report": summarize_latencies(report_latencies),
+                "mean_abs_error": round(float(np.mean(errors)), 4),
+                "p95_abs_error": round(float(np.percentile(errors, 95)), 4),
+                "follower_sum_overstatement": round(float(np.mean(naive_errors)), 3)
+            }
+
+        began = time.perf_counter()
+        store.greedy_reach(np.arange(len(store)), limit=20)
+        results["greedy_top20_ms"] = round((time.perf_counter() - began) * 1000, 2)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audience sketch reach benchmark")
+    parser.add_argument("--influencers", type=int, default=2000)
+    parser.add_argument("--pool", type=int, default=500_000, help="Distinct followers across all influencers")
+    parser.add_argument("--set-sizes", type=int, nargs="+", default=[2, 10, 100])
+    parser.add_argument("--trials", type=int, default=200)
+    parser.add_argument("--file-ids", type=int, default=5_000_000, help="IDs in the streamed text file")
+    args = parser.parse_args()
+    print(json.dumps(bench(args.influencers, args.pool, args.set_sizes, args.trials, args.file_ids), indent=2))
@@ -0,0 +1,71 @@
+"""
+Compare N serial /api/analyze-style calls with one batch call.
+
+Runs from the backend directory:
+
+    python -m benchmarks.batch_analysis --items 200 --brands 5 --model-latency 0.02
+
+Agents return mock data instantly, so each agent call is given a fixed fake
+model latency to make the comparison reflect a deployment with real model calls.
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, Any, List
+
+from core.orchestrator import Orchestrator
+from benchmarks.common import add_fake_latency
+
+
+def make_requests(items: int, brands: int) -> List[Dict[str, Any]]:
+    return [{
+        "brand_name": f"Brand {index % brands}",
+        "product_category": "skincare",
+        "target_audience": "Gen Z",
+        "campaign_duration": "8 weeks",
+        "budget": 10000.0,
+        "influencer_name": f"creator_{index}",
+        "platform": "Instagram",
+        "followers": 100000 + index,
+        "engagement_rate": 4.2,
+        "categories": ["beauty"]
+    } for index in range(items)]
+
+
+async def main(items: int, brands: int, concurrency: int, model_latency: float) -> Dict[str, Any]:
+    requests = make_requests(items, brands)
+
+    serial_orchestrator = Orchestrator()
+    add_fake_latency(serial_orchestrator, model_latency)
+    start = time.perf_counter()
+    for request in requests:
+        await serial_orchestrator.process_campaign_request(request)
+    serial_elapsed = time.perf_counter() - start
+
+    batch_orchestrator = Orchestrator()
+    add_fake_latency(batch_orchestrator, model_latency)
+    start = time.perf_counter()
+    results = await batch_orchestrator.process_campaign_batch(requests, concurrency)
+    batch_elapsed = time.perf_counter() - start
+
+    return {
+        "items": items,
+        "brands": brands,
+        "max_concurrency": concurrency,
+        "model_latency_s": model_latency,
+        "serial_elapsed_s": round(serial_elapsed, 3),
+        "batch_elapsed_s": round(batch_elapsed, 3),
+        "batch_errors": sum(1 for item in results if item["status"] == "error"),
+        "speedup": round(serial_elapsed / batch_elapsed, 2)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serial vs batch campaign analysis")
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--brands", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--model-latency", type=float, default=0.01)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.items, args.brands, args.concurrency, args.model_latency)), indent=2))
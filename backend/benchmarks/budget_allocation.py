@@ -0,0 +1,52 @@
+"""
+Budget allocation latency as the candidate set grows.
+
+Runs from the backend directory:
+
+    python -m benchmarks.budget_allocation --candidates 100 1000 10000
+"""
+import argparse
+import json
+import timeit
+from typing import Dict, Any, List
+
+import numpy as np
+
+from core.budget_optimizer import BudgetOptimizer
+
+PLATFORMS = ["Instagram", "TikTok", "YouTube", "Twitch", "Pinterest"]
+
+
+def synthetic_candidates(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    followers = np.exp(rng.normal(11, 1.5, count)).astype(int) + 1000
+    engagement = np.clip(rng.gamma(2.0, 1.8, count), 0.1, 30)
+    scores = rng.uniform(30, 95, count)
+    return [{"name": f"creator_{index}", "platform": PLATFORMS[index % len(PLATFORMS)], "followers": int(followers[index]),
+             "engagement_rate": float(engagement[index]), "score": float(scores[index])} for index in range(count)]
+
+
+def bench(candidate_counts: List[int], budget: float, repeat: int) -> Dict[str, Any]:
+    optimizer = BudgetOptimizer()
+    results = {"budget": budget, "resolution": optimizer.resolution}
+    for count in candidate_counts:
+        candidates = synthetic_candidates(count)
+        seconds = min(timeit.repeat(lambda: optimizer.allocate(budget, candidates, max_channel_share={"YouTube": 0.4}),
+                                    number=repeat, repeat=3))
+        allocation = optimizer.allocate(budget, candidates, max_channel_share={"YouTube": 0.4})
+        results[f"candidates_{count}"] = {
+            "allocate_ms": round(seconds / repeat * 1000, 3),
+            "booked": len(allocation["allocations"]),
+            "roi": allocation["expected"]["roi"],
+            "even_split_roi": allocation["even_split"]["roi"]
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Budget allocation benchmark")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--budget", type=float, default=250000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(bench(args.candidates, args.budget, args.repeat), indent=2))
@@ -0,0 +1,69 @@
+"""Helpers shared by the benchmark scripts."""
+import asyncio
+import statistics
+import subprocess
+import time
+from typing import Dict, Any, List, Awaitable, Callable
+
+from core.orchestrator import Orchestrator
+
+
+def add_fake_latency(orchestrator: Orchestrator, seconds: float) -> None:
+    """Delay every agent call by `seconds` to stand in for a model round trip."""
+    for pool in orchestrator.agents.values():
+        for agent in pool.workers:
+            execute = agent._execute_task
+
+            async def delayed(task_type, prompt, task, execute=execute):
+                await asyncio.sleep(seconds)
+                return await execute(task_type, prompt, task)
+
+            agent._execute_task = delayed
+
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, Any]:
+    """Reduce a list of durations in seconds to count, mean and p50/p95/p99 in milliseconds."""
+    ordered = sorted(latencies)
+
+    def percentile(fraction: float) -> float:
+        index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 4)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99)
+    }
+
+
+async def run_concurrently(call: Callable[[int], Awaitable[Any]], total: int, concurrency: int) -> Dict[str, Any]:
+    """Run `call(i)` for i in range(total) with bounded concurrency; report latency and throughput."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(index: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await call(index)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(index) for index in range(total)])
+    elapsed = time.perf_counter() - start
+    summary = summarize_latencies(latencies)
+    summary.update({
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 4),
+        "requests_per_second": round(total / elapsed, 2)
+    })
+    return summary
+
+
+def git_revision() -> str:
+    """Return the current commit hash, or "unknown" outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
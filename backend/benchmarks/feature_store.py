@@ -0,0 +1,127 @@
+"""
+Worker startup time and memory for the demographic feature store, memory-mapped
+versus loaded into each process.
+
+Runs from the backend directory:
+
+    python -m benchmarks.feature_store --rows 2000000 --workers 4
+
+Each mode starts `--workers` fresh processes (like uvicorn --workers) that open
+the same store, run one full-table match, and report, while all of them are
+alive, their startup time plus RSS, private (anonymous) RSS and PSS. PSS
+divides shared pages between the processes that map them, so its sum is the
+real memory cost of the worker fleet.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import Dict, Any
+
+import numpy as np
+
+from core.feature_store import DemographicFeatureStore, AGE_BUCKETS, GENDERS
+
+LOCATIONS = ["United States", "United Kingdom", "Canada", "Australia", "Germany", "India", "Brazil", "France"]
+INTERESTS = ["skincare", "beauty", "fashion", "fitness", "wellness", "food", "gaming", "technology", "travel", "pets"]
+TARGET_AUDIENCE = "Gen Z women in the United States interested in skincare"
+
+
+def write_synthetic_store(path: str, rows: int, seed: int = 0) -> None:
+    """Write a store with random but well-formed columns, without going through per-row records."""
+    rng = np.random.default_rng(seed)
+    age = rng.dirichlet(np.ones(len(AGE_BUCKETS)), rows) * 100
+    gender = rng.dirichlet(np.ones(len(GENDERS)), rows) * 100
+    interests = np.zeros(rows, dtype=np.uint64)
+    for _ in range(3):
+        interests |= np.left_shift(np.uint64(1), rng.integers(0, len(INTERESTS), rows).astype(np.uint64))
+    names = np.sort(np.array([f"creator_{row:09d}" for row in range(rows)], dtype="S17"))
+    columns = {
+        "names": names,
+        "age": age.astype(np.uint8),
+        "gender": gender.astype(np.uint8),
+        "location": rng.integers(0, len(LOCATIONS), rows).astype(np.uint16),
+        "interests": interests
+    }
+    os.makedirs(path, exist_ok=True)
+    for name, values in columns.items():
+        np.save(os.path.join(path, f"{name}.npy"), values)
+    with open(os.path.join(path, "meta.json"), "w") as meta_file:
+        json.dump({"version": 1, "rows": rows, "locations": LOCATIONS, "interests": INTERESTS}, meta_file)
+
+
+def _memory_kb() -> Dict[str, int]:
+    """RSS and private RSS from /proc/self/status, and PSS from smaps_rollup (Linux only)."""
+    values = {}
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(("VmRSS:", "RssAnon:")):
+                key, amount = line.split()[:2]
+                values[key.rstrip(":")] = int(amount)
+    try:
+        with open("/proc/self/smaps_rollup") as rollup:
+            for line in rollup:
+                if line.startswith("Pss:"):
+                    values["Pss"] = int(line.split()[1])
+    except OSError:
+        pass
+    return {"rss_kb": values.get("VmRSS", 0), "private_kb": values.get("RssAnon", 0), "pss_kb": values.get("Pss", 0)}
+
+
+def _worker(path: str, mmap: bool, barrier, results) -> None:
+    start = time.perf_counter()
+    store = DemographicFeatureStore.open(path, mmap=mmap)
+    startup = time.perf_counter() - start
+    # Touch every column once, as a full-table match would
+    store.match_scores(store.target_profile(TARGET_AUDIENCE))
+    store.find("creator_000000042")
+    barrier.wait()
+    results.put({"startup_s": startup, **_memory_kb()})
+    barrier.wait()
+
+
+def run_workers(path: str, workers: int, mmap: bool) -> Dict[str, Any]:
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=_worker, args=(path, mmap, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {
+        "startup_ms_max": round(max(report["startup_s"] for report in reports) * 1000, 2),
+        "rss_mb_per_worker": round(sum(report["rss_kb"] for report in reports) / len(reports) / 1024, 1),
+        "private_mb_per_worker": round(sum(report["private_kb"] for report in reports) / len(reports) / 1024, 1),
+        "pss_mb_total": round(sum(report["pss_kb"] for report in reports) / 1024, 1)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Feature store worker startup and memory benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--path", help="Existing store to use instead of a synthetic one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        path = args.path
+        if path is None:
+            path = os.path.join(scratch, "store")
+            write_synthetic_store(path, args.rows)
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        results = {
+            "rows": len(DemographicFeatureStore.open(path)),
+            "store_mb": round(size / 1024 / 1024, 1),
+            "workers": args.workers,
+            "mmap": run_workers(path, args.workers, mmap=True),
+            "loaded": run_workers(path, args.workers, mmap=False)
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
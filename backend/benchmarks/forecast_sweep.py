@@ -0,0 +1,41 @@
+"""
+Campaign forecast latency for single scenarios and what-if sweeps.
+
+Runs from the backend directory:
+
+    python -m benchmarks.forecast_sweep --scenarios 1000 4000
+"""
+import argparse
+import json
+import timeit
+from typing import Dict, Any, List
+
+import numpy as np
+
+from core.forecast import CampaignForecaster
+
+
+def bench(scenario_counts: List[int], sweep_samples: int, repeat: int) -> Dict[str, Any]:
+    forecaster = CampaignForecaster()
+    single = min(timeit.repeat(lambda: forecaster.forecast(50000, 8, 250000, 4.2, 0.85), number=repeat, repeat=3))
+    results = {
+        "forecast_samples": forecaster.samples,
+        "forecast_ms": round(single / repeat * 1000, 3),
+        "sweep_samples": sweep_samples
+    }
+    for count in scenario_counts:
+        budgets = np.linspace(5000, 200000, count)
+        weeks = np.resize(np.arange(2, 26), count)
+        seconds = min(timeit.repeat(lambda: forecaster.sweep(budgets, weeks, 250000, 4.2, 0.85, samples=sweep_samples),
+                                    number=repeat, repeat=3))
+        results[f"sweep_{count}_ms"] = round(seconds / repeat * 1000, 3)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Campaign forecast benchmark")
+    parser.add_argument("--scenarios", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--samples", type=int, default=128, help="Monte Carlo samples per sweep scenario")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps(bench(args.scenarios, args.samples, args.repeat), indent=2))
@@ -0,0 +1,65 @@
+"""
+Shortlisting latency on a synthetic influencer catalog.
+
+Runs from the backend directory:
+
+    python -m benchmarks.influencer_shortlist --rows 2000000
+"""
+import argparse
+import json
+import time
+import timeit
+from typing import Dict, Any
+
+import numpy as np
+
+from core.bitsets import Vocabulary
+from core.influencer_catalog import InfluencerCatalog
+
+PLATFORMS = ["Instagram", "TikTok", "YouTube", "Twitch", "Snapchat", "Pinterest"]
+CATEGORIES = ["skincare", "beauty", "fashion", "fitness", "wellness", "food", "gaming", "technology", "travel", "pets"]
+AUDIENCES = ["Gen Z", "Millennials", "Gen X", "Women", "Men", "Students", "Parents", "Gamers"]
+
+
+def synthetic_catalog(rows: int, seed: int = 0) -> InfluencerCatalog:
+    """Generate a catalog with realistic-looking column distributions directly as arrays."""
+    rng = np.random.default_rng(seed)
+    followers = np.exp(rng.normal(11, 1.6, rows)).astype(np.int64) + 1000
+    engagement = np.clip(rng.gamma(2.0, 1.8, rows), 0.1, 30).astype(np.float32)
+    category_masks = np.zeros(rows, dtype=np.uint64)
+    for _ in range(2):
+        category_masks |= np.left_shift(np.uint64(1), rng.integers(0, len(CATEGORIES), rows).astype(np.uint64))
+    audience_masks = np.zeros(rows, dtype=np.uint64)
+    for _ in range(2):
+        audience_masks |= np.left_shift(np.uint64(1), rng.integers(0, len(AUDIENCES), rows).astype(np.uint64))
+    names = np.array([f"creator_{row}" for row in range(rows)], dtype=object)
+    return InfluencerCatalog(names, rng.integers(0, len(PLATFORMS), rows), followers, engagement,
+                             category_masks, audience_masks, Vocabulary(PLATFORMS),
+                             Vocabulary(CATEGORIES), Vocabulary(AUDIENCES))
+
+
+def bench(rows: int, repeat: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    catalog = synthetic_catalog(rows)
+    build_seconds = time.perf_counter() - start
+
+    scenarios = {
+        "unfiltered": dict(k=10),
+        "category_and_audience": dict(categories=["skincare"], audiences=["Gen Z"], k=10),
+        "platform_category_audience": dict(categories=["skincare", "beauty"], audiences=["Gen Z", "Women"],
+                                           platforms=["TikTok", "Instagram"], k=25),
+        "micro_band": dict(categories=["fitness"], bands=["micro"], k=10)
+    }
+    results = {"rows": rows, "build_and_index_s": round(build_seconds, 3)}
+    for name, arguments in scenarios.items():
+        seconds = timeit.timeit(lambda: catalog.shortlist(**arguments), number=repeat)
+        results[f"{name}_ms"] = round(seconds / repeat * 1000, 3)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Influencer shortlist benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(bench(args.rows, args.repeat), indent=2))
@@ -0,0 +1,78 @@
+"""
+Throughput and latency of query processing with and without model micro-batching.
+
+Runs from the backend directory:
+
+    python -m benchmarks.model_batching --requests 400 --concurrency 200 --windows 0.002 0.005 0.01
+
+Queries go through the orchestrator against the in-process FakeModelClient,
+where a call over n prompts costs `latency * n ** exponent` and only a few
+calls run at once, as on a model server with one accelerator. Every query is
+distinct and the response cache is off, so each request makes its own three
+model calls. The "unbatched" run sends them one by one; each "window_*" run
+groups them per agent and task type with that batching window.
+"""
+import argparse
+import asyncio
+import json
+from typing import Dict, Any, List, Optional
+
+from benchmarks.common import run_concurrently
+from core.batching import BatchingModelClient
+from core.metrics import MODEL_BATCH_FILL, MODEL_BATCH_QUEUE_SECONDS
+from core.model_client import FakeModelClient
+from core.orchestrator import Orchestrator
+
+
+def _histogram_mean(histogram) -> float:
+    """Mean observation across every label set, resetting the histogram for the next run."""
+    counts = sum(sum(counts) for counts in histogram._counts.values())
+    mean = sum(histogram._sums.values()) / counts if counts else 0.0
+    histogram._counts.clear()
+    histogram._sums.clear()
+    return mean
+
+
+async def run(requests: int, concurrency: int, latency: float, exponent: float, model_concurrency: int,
+              batch_size: int, window: Optional[float]) -> Dict[str, Any]:
+    backend = FakeModelClient(latency, exponent, model_concurrency)
+    client = backend if window is None else BatchingModelClient(backend, batch_size, window)
+    # Workers hold their slot through the model call, so the pools must admit a full batch
+    orchestrator = Orchestrator(model_client=client, pool_size=concurrency, max_waiting=concurrency)
+    await orchestrator.start()
+    summary = await run_concurrently(
+        lambda index: orchestrator.process_query(f"Find skincare influencers for Gen Z on Instagram #{index}"),
+        requests, concurrency)
+    summary["model_calls"] = backend.calls
+    summary["prompts_per_call"] = round(backend.prompts / backend.calls, 2)
+    await orchestrator.shutdown()
+    await client.aclose()
+    return summary
+
+
+async def main(requests: int, concurrency: int, latency: float, exponent: float, model_concurrency: int,
+               batch_size: int, windows: List[float]) -> Dict[str, Any]:
+    results: Dict[str, Any] = {
+        "unbatched": await run(requests, concurrency, latency, exponent, model_concurrency, batch_size, None)
+    }
+    for window in windows:
+        summary = await run(requests, concurrency, latency, exponent, model_concurrency, batch_size, window)
+        summary["mean_fill_ratio"] = round(_histogram_mean(MODEL_BATCH_FILL), 3)
+        summary["mean_queue_ms"] = round(_histogram_mean(MODEL_BATCH_QUEUE_SECONDS) * 1000, 3)
+        summary["speedup"] = round(summary["requests_per_second"] / results["unbatched"]["requests_per_second"], 2)
+        results[f"window_{window}"] = summary
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Model micro-batching benchmark")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per single-prompt model call")
+    parser.add_argument("--exponent", type=float, default=0.3, help="A batch of n prompts costs latency * n ** exponent")
+    parser.add_argument("--model-concurrency", type=int, default=4, help="Model calls the fake backend runs at once")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--windows", type=float, nargs="+", default=[0.002, 0.005, 0.01])
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.requests, args.concurrency, args.latency, args.exponent,
+                                      args.model_concurrency, args.batch_size, args.windows)), indent=2))
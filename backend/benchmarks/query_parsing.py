@@ -0,0 +1,61 @@
+"""
+Query parser scaling with vocabulary size.
+
+Runs from the backend directory:
+
+    python -m benchmarks.query_parsing --sizes 100,10000,50000
+
+Pads the bundled vocabulary with synthetic category terms and reports the
+one-off build time and the per-query parse time for each size.
+"""
+import argparse
+import json
+import random
+import string
+import time
+import timeit
+from typing import Dict, Any, List
+
+from core.query_parser import QueryParser, DEFAULT_VOCABULARY_PATH
+
+QUERIES = [
+    "Identify the optimal influencers and predict campaign outcomes for launching a new sustainable skincare brand targeting Gen Z audiences",
+    "Best Gen-Z eco skin care creators on TikTok and Instagram, budget of 50k for 3 months",
+    "Forecast ROI for a $25,000 six week fitness campaign aimed at millennials and women on YouTube"
+]
+
+
+def synthetic_vocabulary(size: int, seed: int = 0) -> Dict[str, Dict[str, str]]:
+    with open(DEFAULT_VOCABULARY_PATH) as vocabulary_file:
+        vocabulary = json.load(vocabulary_file)
+    rng = random.Random(seed)
+    categories = vocabulary["category"]
+    while len(categories) < size:
+        words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+                 for _ in range(rng.randint(1, 3))]
+        categories[" ".join(words)] = words[0]
+    return vocabulary
+
+
+def bench(sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for size in sizes:
+        vocabulary = synthetic_vocabulary(size)
+        start = time.perf_counter()
+        parser = QueryParser(vocabulary)
+        build_seconds = time.perf_counter() - start
+        parse_seconds = timeit.timeit(lambda: [parser.parse(query) for query in QUERIES], number=repeat)
+        results.append({
+            "vocabulary_terms": sum(len(entries) for entries in vocabulary.values()),
+            "build_ms": round(build_seconds * 1000, 2),
+            "parse_us_per_query": round(parse_seconds / (repeat * len(QUERIES)) * 1e6, 2)
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query parser scaling benchmark")
+    parser.add_argument("--sizes", default="100,1000,10000,50000")
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(bench([int(size) for size in args.sizes.split(",")], args.repeat), indent=2))
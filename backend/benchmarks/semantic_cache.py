@@ -0,0 +1,143 @@
+"""
+Semantic query cache lookup latency, recall and memory at 1M entries.
+
+Runs from the backend directory:
+
+    python -m benchmarks.semantic_cache --entries 1000000
+
+Cached queries are paraphrases generated from the query vocabulary: a set of
+distinct queries is embedded for real, and the index is filled to `--entries`
+with noisy copies of them, which keeps the clustered shape of real traffic
+without embedding a million strings first. Reports the build (including k-means
+training), index memory, lookup latency and recall@1 against exact search for
+several `nprobe` settings, eviction cost at capacity, and the end-to-end
+`SemanticQueryCache.get` latency including embedding.
+"""
+import argparse
+import itertools
+import json
+import random
+import time
+from typing import Dict, Any, List
+
+import numpy as np
+
+from benchmarks.common import summarize_latencies
+from core.query_parser import get_default_parser
+from core.semantic_cache import SemanticQueryCache
+
+TEMPLATES = [
+    "find {value} {category} influencers for {audience} on {platform}",
+    "best {audience} {value} {category} creators on {platform}",
+    "{platform} creators for a {value} {category} brand aimed at {audience}",
+    "who should promote our {value} {category} line to {audience} on {platform}"
+]
+
+
+def vocabulary_queries(count: int, seed: int = 0) -> List[str]:
+    """Distinct marketing queries built from the parser's vocabulary."""
+    with open("data/query_vocabulary.json") as vocabulary_file:
+        vocabulary = json.load(vocabulary_file)
+    rng = random.Random(seed)
+    combos = list(itertools.product(TEMPLATES, vocabulary["category"], vocabulary["value"],
+                                    vocabulary["audience"], vocabulary["platform"]))
+    rng.shuffle(combos)
+    return [template.format(category=category, value=value, audience=audience, platform=platform)
+            for template, category, value, audience, platform in combos[:count]]
+
+
+def bench(entries: int, distinct: int, lookups: int, nprobes: List[int]) -> Dict[str, Any]:
+    parser = get_default_parser()
+    cache = SemanticQueryCache(max_entries=entries, ttl=None)
+
+    def key(query: str):
+        entities = parser.parse(query)
+        keywords = [f"{kind}:{value}" for kind, values in entities.items() if isinstance(values, list) for value in values]
+        return parser.canonical_text(query), keywords
+
+    queries = vocabulary_queries(distinct)
+    start = time.perf_counter()
+    base = np.stack([cache.embedder.embed(*key(query)) for query in queries])
+    embed_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for offset in range(0, entries, 100_000):
+        count = min(100_000, entries - offset)
+        noisy = base[rng.integers(0, len(base), count)] + rng.normal(0, 0.02, (count, base.shape[1])).astype(np.float32)
+        noisy /= np.linalg.norm(noisy, axis=1, keepdims=True)
+        slots = cache.index.add_many(noisy)
+        for slot in slots.tolist():
+            cache._entries[slot] = ("", slot, None)
+    build_s = time.perf_counter() - start
+
+    probes = base[rng.integers(0, len(base), lookups)] + rng.normal(0, 0.02, (lookups, base.shape[1])).astype(np.float32)
+    probes /= np.linalg.norm(probes, axis=1, keepdims=True)
+    # Exact neighbours, scored in chunks to bound memory
+    exact = np.empty(lookups, dtype=np.int64)
+    exact_latencies = []
+    for index, probe in enumerate(probes):
+        began = time.perf_counter()
+        best, best_score = -1, -np.inf
+        for chunk in range(0, entries, 250_000):
+            scores = cache.index.decode(np.arange(chunk, min(chunk + 250_000, entries))) @ probe
+            position = int(np.argmax(scores))
+            if scores[position] > best_score:
+                best, best_score = chunk + position, scores[position]
+        exact[index] = best
+        exact_latencies.append(time.perf_counter() - began)
+
+    results: Dict[str, Any] = {
+        "entries": entries,
+        "distinct_queries": distinct,
+        "embed_us": round(embed_us, 1),
+        "build_s": round(build_s, 2),
+        "index": cache.index.stats(),
+        "index_mb": round(cache.index.nbytes / 1024 / 1024, 1),
+        "exact_search": summarize_latencies(exact_latencies)
+    }
+    for nprobe in nprobes:
+        cache.index.nprobe = min(nprobe, cache.index.nlist)
+        latencies, found = [], []
+        for probe in probes:
+            began = time.perf_counter()
+            slots, _ = cache.index.search(probe, 1)
+            latencies.append(time.perf_counter() - began)
+            found.append(int(slots[0]) if len(slots) else -1)
+        # Noisy copies of one query are near-ties, so count a hit when the similarity matches the exact best
+        exact_scores = np.einsum("ij,ij->i", cache.index.decode(exact), probes)
+        found_scores = np.einsum("ij,ij->i", cache.index.decode(np.array(found)), probes)
+        results[f"nprobe_{nprobe}"] = {
+            **summarize_latencies(latencies),
+            "recall_at_1": round(float(np.mean(found_scores >= exact_scores - 1e-6)), 3)
+        }
+
+    cache.index.nprobe = min(8, cache.index.nlist)
+    text, keywords = key(queries[0])
+    cache.set(text, "guard", {"result": 0}, keywords)
+    latencies = []
+    for query in queries[:lookups]:
+        text, keywords = key(query)
+        began = time.perf_counter()
+        cache.get(text, "guard", keywords)
+        latencies.append(time.perf_counter() - began)
+    results["cache_get"] = summarize_latencies(latencies)
+
+    # At capacity every insert evicts the least recently used entry
+    began = time.perf_counter()
+    for query in queries[:lookups]:
+        text, keywords = key(query)
+        cache.set(text, "other", {"result": 1}, keywords)
+    results["set_with_eviction_us"] = round((time.perf_counter() - began) / lookups * 1e6, 1)
+    results["evicted"] = cache.evicted
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Semantic query cache benchmark")
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, default=20_000, help="Distinct queries embedded to seed the index")
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    args = parser.parse_args()
+    print(json.dumps(bench(args.entries, args.distinct, args.lookups, args.nprobe), indent=2))
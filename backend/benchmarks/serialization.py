@@ -0,0 +1,114 @@
+"""
+Response serialization cost per query response with 10, 1k and 100k shortlisted influencers.
+
+Runs from the backend directory:
+
+    python -m benchmarks.serialization --sizes 10 1000 100000
+
+Compares the three ways a route result reaches the wire:
+    encoder    jsonable_encoder + JSONResponse (routes without a response model)
+    validated  response model validation + serialization + orjson rendering
+    trusted    orjson rendering of the plain result (MARKETMUSE_TRUSTED_RESPONSES)
+"""
+import argparse
+import json
+import random
+import timeit
+from typing import Dict, Any, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from api.responses import FastJSONResponse, QueryResponse
+
+PLATFORMS = ["Instagram", "TikTok", "YouTube", "Twitch"]
+CATEGORIES = ["beauty", "skincare", "fashion", "fitness", "wellness", "food", "gaming", "technology"]
+AUDIENCES = ["gen z", "millennials", "parents", "students", "professionals"]
+
+
+def _interval(rng: random.Random, scale: float) -> Dict[str, float]:
+    median = round(rng.uniform(0.5, 1.5) * scale, 2)
+    return {"low": round(median * 0.6, 2), "median": median, "high": round(median * 1.5, 2), "mean": round(median * 1.05, 2)}
+
+
+def query_response(influencers: int, seed: int = 0) -> Dict[str, Any]:
+    """A production-shaped /api/process-query result whose evaluator shortlisted `influencers` creators."""
+    rng = random.Random(seed)
+    shortlist = [{
+        "name": f"creator_{index:06d}",
+        "platform": rng.choice(PLATFORMS),
+        "followers": rng.randint(5_000, 5_000_000),
+        "engagement_rate": round(rng.uniform(0.5, 9.0), 2),
+        "categories": rng.sample(CATEGORIES, 2),
+        "audiences": rng.sample(AUDIENCES, 2),
+        "score": round(rng.uniform(20, 99), 1)
+    } for index in range(influencers)]
+    predictions = {name: _interval(rng, scale) for name, scale in
+                   [("expected_reach", 80000), ("engagement_rate", 4), ("conversion_rate", 3), ("estimated_roi", 120)]}
+    query = "Find skincare influencers for Gen Z on Instagram with a $50000 budget"
+    return {
+        "query": query,
+        "agent_responses": {
+            "influencer_evaluator": {"agent": "InfluencerEvaluator", "query": query, "response": {
+                "score": 85, "shortlist": shortlist, "recommendations": ["Prioritize high-engagement micro creators"]
+            }},
+            "campaign_predictor": {"agent": "CampaignPredictor", "query": query, "response": {
+                "predictions": predictions, "probability_of_profit": 0.82, "confidence_score": 74,
+                "key_factors": ["Audience fit", "Posting cadence"]
+            }}
+        },
+        "summary": {
+            "top_influencers": [{
+                "name": candidate["name"],
+                "platform": candidate["platform"],
+                "score": candidate["score"],
+                "match_reasons": [f"{candidate['engagement_rate']}% engagement across {candidate['followers']:,} followers"]
+            } for candidate in shortlist],
+            "expected_performance": {
+                "expected_reach": predictions["expected_reach"],
+                "engagement_rate": predictions["engagement_rate"],
+                "conversion_rate": predictions["conversion_rate"],
+                "roi": predictions["estimated_roi"],
+                "probability_of_profit": 0.82
+            },
+            "key_recommendations": ["Post twice weekly", "Lead with tutorials"]
+        }
+    }
+
+
+def bench(sizes: List[int], min_seconds: float) -> Dict[str, Any]:
+    adapter = TypeAdapter(QueryResponse)
+
+    def encoder(payload):
+        return JSONResponse(jsonable_encoder(payload)).body
+
+    def validated(payload):
+        model = adapter.validate_python(payload)
+        return FastJSONResponse(adapter.dump_python(model, mode="json", exclude_unset=True)).body
+
+    def trusted(payload):
+        return FastJSONResponse(payload).body
+
+    results = {}
+    for size in sizes:
+        payload = query_response(size)
+        assert json.loads(encoder(payload)) == json.loads(validated(payload)) == json.loads(trusted(payload))
+        row = {"bytes": len(trusted(payload))}
+        for name, serialize in [("encoder", encoder), ("validated", validated), ("trusted", trusted)]:
+            timer = timeit.Timer(lambda: serialize(payload))
+            number, _ = timer.autorange()
+            number = max(1, int(number * min_seconds / 0.2))
+            row[f"{name}_ms"] = round(min(timer.repeat(repeat=3, number=number)) / number * 1000, 4)
+        row["validated_speedup"] = round(row["encoder_ms"] / row["validated_ms"], 1)
+        row["trusted_speedup"] = round(row["encoder_ms"] / row["trusted_ms"], 1)
+        results[str(size)] = row
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Response serialization benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="Minimum time per timing repeat")
+    args = parser.parse_args()
+    print(json.dumps(bench(args.sizes, args.min_seconds), indent=2))
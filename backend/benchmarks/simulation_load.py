@@ -0,0 +1,83 @@
+"""
+Load-test harness for the simulation mode of the API.
+
+Runs from the backend directory:
+
+    python -m benchmarks.simulation_load --requests 50 --concurrency 25
+
+Requests are sent through an in-process ASGI client, so no server needs to
+be running. The "serial" run sends one request at a time, which is the
+throughput ceiling the API had while simulated agents blocked the event
+loop (the old path was slower still, since its three agents also ran one
+after another). The "concurrent" run shows what the non-blocking
+simulation path sustains.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import time
+from typing import Dict, Any
+
+os.environ["MARKETMUSE_SIMULATION"] = "true"
+
+import httpx
+from api import main as api_main
+from simulation import QueryProcessor
+
+EXAMPLE_QUERY = "Identify the optimal influencers and predict campaign outcomes for launching a new sustainable skincare brand targeting Gen Z audiences"
+
+
+async def run_load(client: httpx.AsyncClient, total: int, concurrency: int) -> Dict[str, Any]:
+    """Send `total` queries with at most `concurrency` in flight and report throughput."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def send():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/api/process-query", json={"query": EXAMPLE_QUERY})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[send() for _ in range(total)])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 2),
+        "p50_latency_s": round(latencies[len(latencies) // 2], 3),
+        "max_latency_s": round(latencies[-1], 3)
+    }
+
+
+async def main(total: int, concurrency: int, latency_scale: float) -> Dict[str, Any]:
+    api_main.simulation_processor = QueryProcessor(latency_scale=latency_scale)
+    transport = httpx.ASGITransport(app=api_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Agents print every task they receive; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            serial = await run_load(client, total, 1)
+            concurrent = await run_load(client, total, concurrency)
+    return {
+        "latency_scale": latency_scale,
+        "serial": serial,
+        "concurrent": concurrent,
+        "speedup": round(concurrent["requests_per_second"] / serial["requests_per_second"], 2)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulation-mode API load test")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-scale", type=float, default=0.1,
+                        help="Multiplier for the simulated 0.5-1.5s agent delay")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.requests, args.concurrency, args.latency_scale)), indent=2))
@@ -0,0 +1,237 @@
+"""
+Reproducible benchmark suite for the MarketMuse backend.
+
+Runs from the backend directory:
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --output bench-new.json --compare bench.json
+
+Sections:
+    micro       BaseAgent._format_prompt and each agent's process_task
+    end_to_end  Orchestrator.process_query / process_campaign_request latency
+                with a configurable fake model latency
+    simulation  simulation.QueryProcessor throughput
+    http        load against the FastAPI app through an in-process ASGI client,
+                with the response caches off unless MARKETMUSE_CACHE /
+                MARKETMUSE_SEMANTIC_CACHE turn them on
+
+Every result is written to one JSON document tagged with the git revision, so
+two runs can be compared with --compare.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import time
+import timeit
+from typing import Dict, Any, List
+
+from agents.influencer_evaluator import InfluencerEvaluator
+from agents.campaign_predictor import CampaignPredictor
+from agents.optimization_strategist import OptimizationStrategist
+from core.orchestrator import Orchestrator
+from simulation import QueryProcessor
+from benchmarks.common import add_fake_latency, run_concurrently, summarize_latencies, git_revision
+
+SAMPLE_INFLUENCER = {
+    "name": "EcoBeautySarah",
+    "platform": "Instagram",
+    "followers": 250000,
+    "engagement_rate": 4.2,
+    "categories": ["beauty", "sustainability"],
+    "target_brand": "GreenGlow"
+}
+
+SAMPLE_TASKS = {
+    "InfluencerEvaluator": {"type": "profile_analysis", **SAMPLE_INFLUENCER},
+    "CampaignPredictor": {
+        "type": "performance_prediction",
+        "brand_name": "GreenGlow",
+        "category": "skincare",
+        "target_audience": "Gen Z",
+        "duration": "8 weeks",
+        "budget": 50000.0,
+        "influencer_profile": {"score": 85, "analysis": {"engagement_quality": "Good"}}
+    },
+    "OptimizationStrategist": {
+        "type": "campaign_optimization",
+        "current_performance": {"predictions": {"expected_reach": "500K-750K", "estimated_roi": "285%"}},
+        "target_metrics": {"roi": 3.0},
+        "budget_constraints": 50000.0,
+        "timeline": "8 weeks"
+    }
+}
+
+SAMPLE_QUERY = "Identify the optimal influencers and predict campaign outcomes for launching a new sustainable skincare brand targeting Gen Z audiences"
+
+
+def sample_campaign_request(index: int) -> Dict[str, Any]:
+    return {
+        "brand_name": f"Brand {index}",
+        "product_category": "skincare",
+        "target_audience": "Gen Z",
+        "campaign_duration": "8 weeks",
+        "budget": 50000.0,
+        "influencer_name": SAMPLE_INFLUENCER["name"],
+        "platform": SAMPLE_INFLUENCER["platform"],
+        "followers": SAMPLE_INFLUENCER["followers"],
+        "engagement_rate": SAMPLE_INFLUENCER["engagement_rate"],
+        "categories": SAMPLE_INFLUENCER["categories"]
+    }
+
+
+def bench_micro(iterations: int) -> Dict[str, Any]:
+    """Per-call cost of prompt formatting and of each agent's process_task (no cache, no model)."""
+    results = {}
+    for agent in (InfluencerEvaluator(), CampaignPredictor(), OptimizationStrategist()):
+        task = SAMPLE_TASKS[agent.name]
+        template = agent.task_prompts[task["type"]]
+        fields = {key: value for key, value in task.items() if key != "type"}
+        format_seconds = timeit.timeit(lambda: agent._format_prompt(template, **fields), number=iterations)
+
+        async def process_many():
+            start = time.perf_counter()
+            for _ in range(iterations):
+                await agent.process_task(task)
+            return time.perf_counter() - start
+
+        process_seconds = asyncio.run(process_many())
+        results[agent.name] = {
+            "format_prompt_us": round(format_seconds / iterations * 1e6, 3),
+            "process_task_us": round(process_seconds / iterations * 1e6, 3)
+        }
+    return results
+
+
+async def bench_end_to_end(runs: int, model_latency: float) -> Dict[str, Any]:
+    """Sequential orchestrator latency with every agent call delayed by `model_latency`."""
+    orchestrator = Orchestrator()
+    add_fake_latency(orchestrator, model_latency)
+
+    query_latencies = []
+    for index in range(runs):
+        start = time.perf_counter()
+        await orchestrator.process_query(f"{SAMPLE_QUERY} #{index}")
+        query_latencies.append(time.perf_counter() - start)
+
+    campaign_latencies = []
+    for index in range(runs):
+        start = time.perf_counter()
+        await orchestrator.process_campaign_request(sample_campaign_request(index))
+        campaign_latencies.append(time.perf_counter() - start)
+
+    return {
+        "model_latency_s": model_latency,
+        "process_query": summarize_latencies(query_latencies),
+        "process_campaign_request": summarize_latencies(campaign_latencies)
+    }
+
+
+async def bench_simulation(total: int, concurrency: int, latency_scale: float) -> Dict[str, Any]:
+    """QueryProcessor throughput under concurrent callers."""
+    processor = QueryProcessor(latency_scale=latency_scale)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = await run_concurrently(lambda index: processor.process_query(SAMPLE_QUERY), total, concurrency)
+    result["latency_scale"] = latency_scale
+    return result
+
+
+async def bench_http(total: int, concurrency: int, model_latency: float) -> Dict[str, Any]:
+    """
+    Request latency percentiles and throughput against the FastAPI app in production mode.
+    The sample requests differ only in a suffix, so the response and semantic caches are off
+    unless the environment turns them on; the caches in effect are recorded with the results.
+    """
+    import httpx
+    os.environ.setdefault("MARKETMUSE_SIMULATION", "false")
+    os.environ.setdefault("MARKETMUSE_CACHE", "false")
+    os.environ.setdefault("MARKETMUSE_SEMANTIC_CACHE", "false")
+    from api import main as api_main
+
+    add_fake_latency(api_main.orchestrator, model_latency)
+    transport = httpx.ASGITransport(app=api_main.app)
+    results = {
+        "model_latency_s": model_latency,
+        "response_cache": api_main.orchestrator.cache is not None,
+        "semantic_cache": api_main.orchestrator.semantic_cache is not None
+    }
+    async with api_main.lifespan(api_main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def query(index: int):
+                response = await client.post("/api/process-query", json={"query": f"{SAMPLE_QUERY} #{index}"})
+                response.raise_for_status()
+
+            async def analyze(index: int):
+                response = await client.post("/api/analyze", json=sample_campaign_request(index))
+                response.raise_for_status()
+
+            results["process_query"] = await run_concurrently(query, total, concurrency)
+            results["analyze"] = await run_concurrently(analyze, total, concurrency)
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], prefix: str = "") -> List[str]:
+    """List numeric leaves that changed between two result documents, with the ratio new/old."""
+    lines = []
+    for key, value in current.items():
+        path = f"{prefix}{key}"
+        old = baseline.get(key) if isinstance(baseline, dict) else None
+        if isinstance(value, dict) and isinstance(old, dict):
+            lines.extend(compare(value, old, path + "."))
+        elif isinstance(value, (int, float)) and isinstance(old, (int, float)) and old and value != old:
+            lines.append(f"{path}: {old} -> {value} ({value / old:.2f}x)")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="MarketMuse benchmark suite")
+    parser.add_argument("--sections", default="micro,end_to_end,simulation,http",
+                        help="Comma-separated sections to run")
+    parser.add_argument("--iterations", type=int, default=2000, help="Microbenchmark iterations")
+    parser.add_argument("--runs", type=int, default=50, help="Sequential orchestrator runs")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per throughput test")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--model-latency", type=float, default=0.01, help="Fake model latency per agent call (s)")
+    parser.add_argument("--latency-scale", type=float, default=0.01, help="Simulation delay multiplier")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    sections = set(args.sections.split(","))
+    results: Dict[str, Any] = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "parameters": vars(args).copy()
+    }
+    if "micro" in sections:
+        results["micro"] = bench_micro(args.iterations)
+    if "end_to_end" in sections:
+        results["end_to_end"] = asyncio.run(bench_end_to_end(args.runs, args.model_latency))
+    if "simulation" in sections:
+        results["simulation"] = asyncio.run(bench_simulation(args.requests, args.concurrency, args.latency_scale))
+    if "http" in sections:
+        results["http"] = asyncio.run(bench_http(args.requests, args.concurrency, args.model_latency))
+
+    document = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(document + "\n")
+    print(document)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print(f"\nChanges against {args.compare} ({baseline.get('revision', 'unknown')}):")
+        for line in compare(results, baseline):
+            print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Trend store ingest throughput and summary lookup latency.
+
+Runs from the backend directory:
+
+    python -m benchmarks.trend_ingest --rows 1000000 --years 3
+
+Writes a synthetic campaign outcome log, half as CSV and half as gzipped JSON
+Lines, with per-category growth and a year-end seasonal peak. Reports rows
+ingested per second for each format, the size of the resulting store, the
+time to reopen it, and the latency of a trend summary lookup, which is what
+trend analysis reads instead of asking the model for market figures.
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Any
+
+import numpy as np
+import orjson
+
+from benchmarks.common import summarize_latencies
+from core.trend_store import TrendStore
+
+CATEGORIES = ("skincare", "gaming", "fitness", "fashion", "food", "tech", "travel", "beauty")
+PLATFORMS = ("Instagram", "TikTok", "YouTube", "Twitter")
+
+
+def synthetic_rows(rows: int, years: int, seed: int = 0):
+    """Campaign outcomes whose revenue grows or shrinks per category and peaks in November and December."""
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 365 * years, rows)
+    dates = (np.datetime64("2022-01-03") + days).astype(str)
+    categories = rng.integers(0, len(CATEGORIES), rows)
+    platforms = rng.integers(0, len(PLATFORMS), rows)
+    growth = np.linspace(-0.2, 0.3, len(CATEGORIES))[categories]
+    season = 1 + 0.3 * np.cos(2 * np.pi * (days % 365 - 335) / 365)
+    spend = rng.gamma(2.0, 1000.0, rows)
+    revenue = spend * rng.uniform(3, 7, rows) * season * (1 + growth) ** (days / 365)
+    for index in range(rows):
+        yield {
+            "date": dates[index], "category": CATEGORIES[categories[index]], "platform": PLATFORMS[platforms[index]],
+            "spend": round(float(spend[index]), 2), "revenue": round(float(revenue[index]), 2),
+            "reach": int(spend[index] * 10), "engagements": int(spend[index] / 2), "conversions": int(spend[index] / 20)
+        }
+
+
+def write_logs(directory: str, rows: int, years: int) -> Dict[str, str]:
+    csv_path = os.path.join(directory, "outcomes.csv")
+    jsonl_path = os.path.join(directory, "outcomes.jsonl.gz")
+    generated = synthetic_rows(rows, years)
+    with open(csv_path, "w", newline="") as handle:
+        writer = None
+        for _, row in zip(range(rows // 2), generated):
+            if writer is None:
+                writer = csv.DictWriter(handle, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+    with gzip.open(jsonl_path, "wb") as handle:
+        for row in generated:
+            handle.write(orjson.dumps(row) + b"\n")
+    return {"csv": csv_path, "jsonl_gz": jsonl_path}
+
+
+def bench(rows: int, years: int, lookups: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"rows": rows, "years": years}
+    with tempfile.TemporaryDirectory() as directory:
+        logs = write_logs(directory, rows, years)
+        store_path = os.path.join(directory, "store")
+        store = TrendStore.open(store_path)
+        for fmt, path in logs.items():
+            began = time.perf_counter()
+            ingested = store.ingest_file(path)
+            results[f"{fmt}_rows_per_second"] = round(ingested / (time.perf_counter() - began))
+        store.save(store_path)
+        results["store_kb"] = round(sum(os.path.getsize(os.path.join(store_path, entry))
+                                        for entry in os.listdir(store_path)) / 1024, 1)
+
+        began = time.perf_counter()
+        store = TrendStore.open(store_path)
+        results["open_ms"] = round((time.perf_counter() - began) * 1000, 2)
+        began = time.perf_counter()
+        results["reingest_skipped"] = store.ingest_file(logs["csv"]) == 0
+        results["reingest_check_ms"] = round((time.perf_counter() - began) * 1000, 2)
+
+        latencies = []
+        for index in range(lookups):
+            began = time.perf_counter()
+            store.summary(CATEGORIES[index % len(CATEGORIES)])
+            latencies.append(time.perf_counter() - began)
+        results["summary_lookup"] = summarize_latencies(latencies)
+        results["growth_by_category"] = {category: store.summary(category)["growth"]["rate"]
+                                         for category in CATEGORIES}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trend store ingest benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+    print(json.dumps(bench(args.rows, args.years, args.lookups), indent=2))
@@ -0,0 +1,113 @@
+import asyncio
+import time
+from typing import Dict, Any, Callable, Optional, List
+from core.metrics import POOL_QUEUE_WAIT_SECONDS, record_timing
+
+
+class AgentPoolError(Exception):
+    """Base class for pool admission failures; `status_code` is the HTTP status to report."""
+    status_code = 503
+
+
+class PoolSaturatedError(AgentPoolError):
+    """Raised when every worker is busy and the wait queue is full."""
+    status_code = 429
+
+
+class PoolClosedError(AgentPoolError):
+    """Raised when a task arrives after the pool started draining."""
+    status_code = 503
+
+
+class AgentPool:
+    """
+    A fixed set of interchangeable agent workers with a bounded wait queue.
+
+    The pool exposes the same `name` and `process_task` interface as a single
+    agent, so it can be used anywhere an agent is expected.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 4, max_waiting: int = 64,
+                 acquire_timeout: Optional[float] = None):
+        if size < 1:
+            raise ValueError("Agent pool size must be at least 1")
+        self.workers: List[Any] = [factory() for _ in range(size)]
+        self.name = self.workers[0].name
+        self.size = size
+        self.max_waiting = max_waiting
+        self.acquire_timeout = acquire_timeout
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for worker in self.workers:
+            self._idle.put_nowait(worker)
+        self._waiting = 0
+        self._busy = 0
+        self._all_idle = asyncio.Event()
+        self._all_idle.set()
+        self._closed = False
+        self.rejected = 0
+
+    async def warm_up(self) -> None:
+        """Run every worker's warm-up hook."""
+        await asyncio.gather(*[worker.warm_up() for worker in self.workers])
+
+    async def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a task on the next free worker, failing fast when the pool is saturated or draining."""
+        worker = await self._acquire()
+        try:
+            return await worker.process_task(task)
+        finally:
+            self._release(worker)
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stop admitting tasks, wait for in-flight ones to finish, then shut workers down.
+        Returns False if in-flight tasks were still running when the timeout expired.
+        """
+        self._closed = True
+        try:
+            await asyncio.wait_for(self._all_idle.wait(), timeout)
+            drained = True
+        except asyncio.TimeoutError:
+            drained = False
+        await asyncio.gather(*[worker.shutdown() for worker in self.workers])
+        return drained
+
+    def stats(self) -> Dict[str, Any]:
+        """Return worker utilisation and queue depth."""
+        return {
+            "size": self.size,
+            "busy": self._busy,
+            "waiting": self._waiting,
+            "max_waiting": self.max_waiting,
+            "rejected": self.rejected,
+            "closed": self._closed
+        }
+
+    async def _acquire(self) -> Any:
+        if self._closed:
+            self.rejected += 1
+            raise PoolClosedError(f"{self.name} pool is shutting down")
+        if self._idle.empty() and self._waiting >= self.max_waiting:
+            self.rejected += 1
+            raise PoolSaturatedError(f"{self.name} pool is at capacity")
+        self._waiting += 1
+        start = time.perf_counter()
+        try:
+            worker = await asyncio.wait_for(self._idle.get(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise PoolSaturatedError(f"Timed out waiting for a free {self.name} worker")
+        finally:
+            self._waiting -= 1
+            waited = time.perf_counter() - start
+            POOL_QUEUE_WAIT_SECONDS.observe(waited, agent=self.name)
+            record_timing(f"{self.name}.queue_wait", waited)
+        self._busy += 1
+        self._all_idle.clear()
+        return worker
+
+    def _release(self, worker: Any) -> None:
+        self._busy -= 1
+        if self._busy == 0:
+            self._all_idle.set()
+        self._idle.put_nowait(worker)
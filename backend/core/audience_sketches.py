@@ -0,0 +1,373 @@
+"""
+Mergeable per-influencer audience sketches for deduplicated reach estimates.
+
+Summing follower counts overstates the reach of a multi-influencer campaign
+because audiences overlap. Each influencer's follower IDs are summarised by two
+fixed-size sketches that merge by element-wise max / min:
+
+    HyperLogLog     2**precision uint8 registers; the union of any set of influencers
+                    is the element-wise max of their registers (~1.6% error at precision 12)
+    MinHash         one-permutation MinHash, `bins` uint32 minima; the share of equal
+                    bins estimates the Jaccard similarity of two audiences
+
+A store is a directory of NumPy columns plus a JSON header, opened with mmap
+like the demographic feature store:
+
+    meta.json       row count, precision and bin count
+    names.npy       UTF-8 names, sorted, so lookups are a binary search
+    registers.npy   uint8 (rows, 2**precision) HyperLogLog registers
+    minhash.npy     uint32 (rows, bins) MinHash minima
+    audience.npy    float64 estimated audience size per influencer
+
+Build a store from a directory holding one follower-ID file per influencer
+(`<name>.txt` with whitespace-separated IDs, or `<name>.npy` with an integer
+array) from the backend directory:
+
+    python -m core.audience_sketches data/followers /var/lib/marketmuse/audiences
+
+Files are streamed in fixed-size chunks and sketches are written straight into
+the memory-mapped columns, so memory use does not grow with follower counts.
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import os
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Callable, Sequence, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+DEFAULT_PRECISION = 12
+DEFAULT_BINS = 256
+CHUNK_IDS = 1 << 20
+EMPTY_BIN = np.uint32(0xFFFFFFFF)
+
+# 2 ** -rank for every possible register value, used by the HyperLogLog estimator
+_INVERSE_POWERS = 2.0 ** -np.arange(65, dtype=np.float64)
+_MAX_ID = (1 << 64) - 1
+
+
+def hash_ids(ids: np.ndarray) -> np.ndarray:
+    """Mix integer IDs into well-distributed 64-bit hashes (splitmix64)."""
+    z = np.asarray(ids).astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def hash_tokens(tokens: Iterable[str]) -> np.ndarray:
+    """Hash follower IDs given as strings. Decimal IDs hash exactly as they would as integers."""
+    numeric, other = [], []
+    for token in tokens:
+        if token.isdigit():
+            numeric.append(min(int(token), _MAX_ID))
+        else:
+            other.append(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest())
+    hashes = hash_ids(np.array(numeric, dtype=np.uint64))
+    if other:
+        hashes = np.concatenate([hashes, np.frombuffer(b"".join(other), dtype=np.uint64)])
+    return hashes
+
+
+def estimate_cardinality(registers: np.ndarray) -> np.ndarray:
+    """HyperLogLog estimate for each row of a (..., 2**precision) register array, with linear counting for small sets."""
+    registers = np.asarray(registers)
+    m = registers.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / _INVERSE_POWERS[registers].sum(axis=-1)
+    zeros = (registers == 0).sum(axis=-1)
+    small = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), small, raw)
+
+
+def estimate_jaccard(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Jaccard similarity from MinHash minima; broadcasts over leading dimensions."""
+    both_empty = (a == EMPTY_BIN) & (b == EMPTY_BIN)
+    matches = ((a == b) & ~both_empty).sum(axis=-1)
+    compared = a.shape[-1] - both_empty.sum(axis=-1)
+    return np.where(compared > 0, matches / np.maximum(compared, 1), 0.0)
+
+
+class AudienceSketch:
+    """HyperLogLog registers and MinHash minima for one audience, updated in place from hashed follower IDs."""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, bins: int = DEFAULT_BINS):
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16")
+        if bins < 1 or bins & (bins - 1):
+            raise ValueError("MinHash bins must be a power of two")
+        self.precision = precision
+        self.bins = bins
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+        self.minhash = np.full(bins, EMPTY_BIN, dtype=np.uint32)
+
+    def update(self, hashes: np.ndarray) -> "AudienceSketch":
+        """Add hashed follower IDs (see hash_ids)."""
+        if len(hashes) == 0:
+            return self
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        # The rank is the position of the first set bit after the index bits: count leading zeros by smearing
+        rest = hashes << p
+        for shift in (1, 2, 4, 8, 16, 32):
+            rest |= rest >> np.uint64(shift)
+        rank = np.minimum(65 - np.bitwise_count(rest).astype(np.uint8), 65 - self.precision).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        # One-permutation MinHash: the low bits pick a bin, the next 32 bits are the value
+        bin_index = (hashes & np.uint64(self.bins - 1)).astype(np.intp)
+        values = ((hashes >> np.uint64(16)) & np.uint64(0xFFFFFFFE)).astype(np.uint32)
+        np.minimum.at(self.minhash, bin_index, values)
+        return self
+
+    def update_ids(self, ids: np.ndarray) -> "AudienceSketch":
+        """Add integer follower IDs."""
+        return self.update(hash_ids(ids))
+
+    def merge(self, other: "AudienceSketch") -> "AudienceSketch":
+        """Fold another sketch of the same shape into this one (audience union)."""
+        if (other.precision, other.bins) != (self.precision, self.bins):
+            raise ValueError("Cannot merge sketches with different precision or bin counts")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        np.minimum(self.minhash, other.minhash, out=self.minhash)
+        return self
+
+    def cardinality(self) -> float:
+        return float(estimate_cardinality(self.registers))
+
+    def jaccard(self, other: "AudienceSketch") -> float:
+        return float(estimate_jaccard(self.minhash, other.minhash))
+
+    @classmethod
+    def from_file(cls, path: str, precision: int = DEFAULT_PRECISION, bins: int = DEFAULT_BINS,
+                  chunk_ids: int = CHUNK_IDS) -> "AudienceSketch":
+        """Sketch a follower-ID file (.npy integer array, or text with whitespace-separated IDs) chunk by chunk."""
+        sketch = cls(precision, bins)
+        for hashes in iter_hashed_ids(path, chunk_ids):
+            sketch.update(hashes)
+        return sketch
+
+
+def iter_hashed_ids(path: str, chunk_ids: int = CHUNK_IDS) -> Iterator[np.ndarray]:
+    """Yield hashed follower IDs from a file in chunks of roughly `chunk_ids` IDs."""
+    if path.endswith(".npy"):
+        ids = np.load(path, mmap_mode="r")
+        for start in range(0, len(ids), chunk_ids):
+            yield hash_ids(ids[start:start + chunk_ids])
+        return
+    # Roughly 16 bytes per line; a chunk ends at the last whitespace so no ID is split
+    block_size = chunk_ids * 16
+    with open(path, "rb") as ids_file:
+        carry = b""
+        while True:
+            block = ids_file.read(block_size)
+            if not block:
+                break
+            block = carry + block
+            cut = max(block.rfind(b"\n"), block.rfind(b" "))
+            if cut < 0:
+                carry = block
+                continue
+            block, carry = block[:cut], block[cut + 1:]
+            yield _hash_block(block)
+        if carry.strip():
+            yield _hash_block(carry)
+
+
+def _hash_block(block: bytes) -> np.ndarray:
+    text = block.decode("utf-8")
+    try:
+        # Parses decimal IDs in C; anything else fails and takes the per-token path
+        return hash_ids(np.fromstring(text, dtype=np.uint64, sep=" "))
+    except ValueError:
+        return hash_tokens(text.split())
+
+
+class AudienceSketchStore:
+    """Audience sketches for every influencer, answering unique-reach and overlap questions with array operations."""
+
+    def __init__(self, names: np.ndarray, registers: np.ndarray, minhash: np.ndarray, audience: np.ndarray):
+        self.names = names
+        self.registers = registers
+        self.minhash = minhash
+        self.audience = audience
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def open(cls, path: str, mmap: bool = True) -> "AudienceSketchStore":
+        """Open a store directory. With `mmap=False` the columns are read into private memory instead."""
+        with open(os.path.join(path, "meta.json")) as meta_file:
+            meta = json.load(meta_file)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported audience sketch store version: {meta.get('version')}")
+        mmap_mode = "r" if mmap else None
+
+        def column(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+
+        store = cls(column("names"), column("registers"), column("minhash"), column("audience"))
+        if len(store.names) != meta["rows"] or store.registers.shape[1] != 1 << meta["precision"]:
+            raise ValueError(f"Audience sketch store at {path} is truncated")
+        return store
+
+    @staticmethod
+    def write(path: str, sketches: Dict[str, AudienceSketch]) -> int:
+        """Write a store directory from in-memory sketches keyed by influencer name. Returns the row count."""
+        return _write(path, list(sketches), sketches.__getitem__)
+
+    @staticmethod
+    def build(path: str, followers_dir: str, precision: int = DEFAULT_PRECISION, bins: int = DEFAULT_BINS,
+              chunk_ids: int = CHUNK_IDS) -> int:
+        """Stream a directory of per-influencer follower-ID files into a store. Returns the row count."""
+        files = {}
+        for entry in sorted(os.listdir(followers_dir)):
+            name, extension = os.path.splitext(entry)
+            if extension in (".txt", ".npy"):
+                files[name] = os.path.join(followers_dir, entry)
+        return _write(path, list(files), lambda name: AudienceSketch.from_file(files[name], precision, bins, chunk_ids),
+                      precision, bins)
+
+    def find(self, name: Optional[str]) -> Optional[int]:
+        """Row id for an influencer name, by binary search over the sorted name column."""
+        if not name:
+            return None
+        key = name.encode("utf-8")
+        if len(key) > self.names.dtype.itemsize:
+            return None
+        row = int(np.searchsorted(self.names, key))
+        return row if row < len(self) and self.names[row] == key else None
+
+    def rows(self, names: Sequence[Optional[str]]) -> Tuple[np.ndarray, List[Optional[str]]]:
+        """Row ids of the known names (deduplicated, in first-seen order) and the names without a sketch."""
+        rows, missing, seen = [], [], set()
+        for name in names:
+            row = self.find(name)
+            if row is None:
+                missing.append(name)
+            elif row not in seen:
+                seen.add(row)
+                rows.append(row)
+        return np.array(rows, dtype=np.intp), missing
+
+    def unique_audience(self, rows: np.ndarray) -> float:
+        """Estimated number of distinct followers across the given rows."""
+        if len(rows) == 0:
+            return 0.0
+        return float(estimate_cardinality(self.registers[rows].max(axis=0)))
+
+    def shared_audience(self, rows: np.ndarray) -> np.ndarray:
+        """(n, n) estimated followers shared by each pair of rows; the diagonal holds each audience size."""
+        minhash = self.minhash[rows]
+        jaccard = estimate_jaccard(minhash[:, None, :], minhash[None, :, :])
+        audience = self.audience[rows]
+        # |A n B| = J / (1 + J) * (|A| + |B|)
+        shared = jaccard / (1 + jaccard) * (audience[:, None] + audience[None, :])
+        np.fill_diagonal(shared, audience)
+        return shared
+
+    def greedy_reach(self, rows: np.ndarray, limit: Optional[int] = None,
+                     costs: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        Order rows by the new followers each adds to those already chosen (per unit cost
+        when `costs` is given), greedily; returns (row, marginal audience) pairs. Unique
+        reach is submodular, so stale gains are upper bounds and only the top of the heap
+        is re-evaluated.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        costs = np.ones(len(rows)) if costs is None else np.maximum(np.asarray(costs, dtype=np.float64), 1e-9)
+        heap = [(-self.audience[row] / cost, position) for position, (row, cost) in enumerate(zip(rows, costs))]
+        heapq.heapify(heap)
+        union = np.zeros(self.registers.shape[1], dtype=np.uint8)
+        covered = 0.0
+        order: List[Tuple[int, float]] = []
+        while heap and (limit is None or len(order) < limit):
+            _, position = heapq.heappop(heap)
+            gain = max(float(estimate_cardinality(np.maximum(union, self.registers[rows[position]]))) - covered, 0.0)
+            if heap and gain / costs[position] < -heap[0][0]:
+                heapq.heappush(heap, (-gain / costs[position], position))
+                continue
+            np.maximum(union, self.registers[rows[position]], out=union)
+            covered += gain
+            order.append((int(rows[position]), gain))
+        return order
+
+    def exclusive_shares(self, rows: np.ndarray) -> np.ndarray:
+        """Fraction of each row's audience not already reached by the rows ahead of it in greedy reach order."""
+        shares = np.ones(len(rows))
+        position = {int(row): index for index, row in enumerate(rows)}
+        for row, gain in self.greedy_reach(rows):
+            shares[position[row]] = min(gain / max(float(self.audience[row]), 1.0), 1.0)
+        return shares
+
+    def reach_report(self, names: Sequence[Optional[str]], top_pairs: int = 5,
+                     max_pairwise: int = 50) -> Dict[str, Any]:
+        """
+        Total vs deduplicated audience of a set of influencers, with the largest pairwise
+        overlaps among their `max_pairwise` biggest audiences.
+        """
+        rows, missing = self.rows(names)
+        total = float(self.audience[rows].sum()) if len(rows) else 0.0
+        unique = self.unique_audience(rows)
+        pairs = []
+        if len(rows) > 1:
+            rows = rows[np.argsort(-self.audience[rows], kind="stable")[:max_pairwise]]
+            shared = self.shared_audience(rows)
+            first, second = np.triu_indices(len(rows), k=1)
+            for index in np.argsort(-shared[first, second], kind="stable")[:top_pairs]:
+                a, b = int(first[index]), int(second[index])
+                pairs.append({
+                    "influencers": [self.names[rows[a]].decode("utf-8"), self.names[rows[b]].decode("utf-8")],
+                    "shared_audience": int(round(float(shared[a, b]))),
+                    "share_of_smaller": round(float(shared[a, b] / max(min(shared[a, a], shared[b, b]), 1.0)), 3)
+                })
+        return {
+            "influencers": len(rows),
+            "unknown_influencers": missing,
+            "total_audience": int(round(total)),
+            "unique_audience": int(round(min(unique, total))),
+            "duplication_rate": round(1 - min(unique, total) / total, 3) if total else 0.0,
+            "largest_overlaps": pairs
+        }
+
+
+def _write(path: str, names: List[str], sketch_for: Callable[[str], AudienceSketch],
+           precision: int = DEFAULT_PRECISION, bins: int = DEFAULT_BINS) -> int:
+    """Write sketches row by row into memory-mapped columns, so only one sketch is held at a time."""
+    names = sorted(names, key=lambda name: name.encode("utf-8"))
+    os.makedirs(path, exist_ok=True)
+    width = max((len(name.encode("utf-8")) for name in names), default=1)
+    np.save(os.path.join(path, "names.npy"), np.array([name.encode("utf-8") for name in names], dtype=f"S{width}"))
+    registers = np.lib.format.open_memmap(os.path.join(path, "registers.npy"), mode="w+", dtype=np.uint8,
+                                         shape=(len(names), 1 << precision))
+    minhash = np.lib.format.open_memmap(os.path.join(path, "minhash.npy"), mode="w+", dtype=np.uint32,
+                                        shape=(len(names), bins))
+    audience = np.zeros(len(names), dtype=np.float64)
+    for row, name in enumerate(names):
+        sketch = sketch_for(name)
+        if (sketch.precision, sketch.bins) != (precision, bins):
+            raise ValueError(f"Sketch for {name} does not match the store's precision and bin count")
+        registers[row] = sketch.registers
+        minhash[row] = sketch.minhash
+        audience[row] = sketch.cardinality()
+    registers.flush()
+    minhash.flush()
+    del registers, minhash
+    np.save(os.path.join(path, "audience.npy"), audience)
+    # The header goes last so a half-written directory never opens
+    with open(os.path.join(path, "meta.json"), "w") as meta_file:
+        json.dump({"version": FORMAT_VERSION, "rows": len(names), "precision": precision, "bins": bins}, meta_file)
+    return len(names)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build an audience sketch store from per-influencer follower-ID files")
+    parser.add_argument("followers_dir")
+    parser.add_argument("store_path")
+    parser.add_argument("--precision", type=int, default=DEFAULT_PRECISION)
+    parser.add_argument("--bins", type=int, default=DEFAULT_BINS)
+    args = parser.parse_args()
+    count = AudienceSketchStore.build(args.store_path, args.followers_dir, args.precision, args.bins)
+    print(f"Wrote {count} audience sketches to {args.store_path}")
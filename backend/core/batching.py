@@ -0,0 +1,138 @@
+import asyncio
+import contextvars
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from core.deadlines import request_deadline
+from core.metrics import MODEL_BATCHES, MODEL_BATCH_FILL, MODEL_BATCH_QUEUE_SECONDS, record_timing
+from core.model_client import ModelClient, ModelClientError
+
+BatchKey = Tuple[str, Optional[str], str]
+
+
+class _PendingPrompt:
+    __slots__ = ("prompt", "future", "enqueued", "sent", "deadline")
+
+    def __init__(self, prompt: str, future: asyncio.Future, deadline: Optional[float]):
+        self.prompt = prompt
+        self.future = future
+        self.enqueued = time.perf_counter()
+        self.sent = self.enqueued
+        self.deadline = deadline
+
+
+class BatchingModelClient(ModelClient):
+    """
+    Micro-batch model calls from concurrent requests.
+
+    Prompts for the same agent and task type are held for up to `max_wait`
+    seconds, or until `max_batch_size` of them are waiting, and then sent to the
+    backend as one `complete_batch` call. Each caller gets its own completion
+    back. A batch never holds more prompts than there are agent workers for
+    that agent, so the agent pool size should be at least `max_batch_size`.
+    """
+
+    def __init__(self, backend: ModelClient, max_batch_size: int = 16, max_wait: float = 0.005):
+        if max_batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: Dict[BatchKey, List[_PendingPrompt]] = {}
+        self._timers: Dict[BatchKey, asyncio.TimerHandle] = {}
+        self._sending: set = set()
+        self.batches = 0
+        self.prompts = 0
+
+    async def complete(self, agent_name: str, system_prompt: str, prompt: str,
+                       task_type: Optional[str] = None) -> str:
+        """Queue the prompt for the next batch of its agent and task type, and wait for its completion."""
+        key = (agent_name, task_type, system_prompt)
+        future = asyncio.get_running_loop().create_future()
+        pending = _PendingPrompt(prompt, future, request_deadline.get())
+        batch = self._pending.setdefault(key, [])
+        batch.append(pending)
+        if len(batch) >= self.max_batch_size:
+            self._flush(key, "full")
+        elif len(batch) == 1:
+            self._timers[key] = asyncio.get_running_loop().call_later(self.max_wait, self._flush, key, "window")
+        # A caller giving up cancels only its own future; the batch still answers the others
+        completion = await future
+        record_timing(f"{agent_name}.batch_wait", pending.sent - pending.enqueued)
+        return completion
+
+    async def complete_batch(self, agent_name: str, system_prompt: str, prompts: List[str],
+                             task_type: Optional[str] = None) -> List[str]:
+        return await self.backend.complete_batch(agent_name, system_prompt, prompts, task_type)
+
+    def _flush(self, key: BatchKey, trigger: str) -> None:
+        """Send everything waiting under `key` as one batch."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = [pending for pending in self._pending.pop(key, []) if not pending.future.done()]
+        if not batch:
+            return
+        agent_name, task_type, _ = key
+        now = time.perf_counter()
+        for pending in batch:
+            pending.sent = now
+            MODEL_BATCH_QUEUE_SECONDS.observe(now - pending.enqueued, agent=agent_name, task_type=task_type or "")
+        MODEL_BATCH_FILL.observe(len(batch) / self.max_batch_size, agent=agent_name, task_type=task_type or "")
+        MODEL_BATCHES.inc(agent=agent_name, task_type=task_type or "", trigger=trigger)
+        self.batches += 1
+        self.prompts += len(batch)
+        # The batch runs outside any one request: it gets the latest deadline among its callers
+        deadlines = [pending.deadline for pending in batch]
+        context = contextvars.Context()
+        context.run(request_deadline.set, None if None in deadlines else max(deadlines))
+        sending = asyncio.create_task(self._send(key, batch), context=context)
+        self._sending.add(sending)
+        sending.add_done_callback(self._sending.discard)
+
+    async def _send(self, key: BatchKey, batch: List[_PendingPrompt]) -> None:
+        """Make the batched call and fan the completions out to the waiting callers."""
+        agent_name, task_type, system_prompt = key
+        try:
+            completions = await self.backend.complete_batch(
+                agent_name, system_prompt, [pending.prompt for pending in batch], task_type)
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+        except asyncio.CancelledError:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.cancel()
+            raise
+        if len(completions) != len(batch):
+            # Pairing a short or long answer positionally would hand callers each other's completions
+            error = ModelClientError(
+                f"Model backend returned {len(completions)} completions for {len(batch)} prompts")
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(error)
+            return
+        for pending, completion in zip(batch, completions):
+            if not pending.future.done():
+                pending.future.set_result(completion)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batch counters, the mean batch size and how many prompts are waiting."""
+        return {
+            "batches": self.batches,
+            "prompts": self.prompts,
+            "mean_batch_size": self.prompts / self.batches if self.batches else 0.0,
+            "waiting": sum(len(batch) for batch in self._pending.values())
+        }
+
+    async def warm_up(self) -> None:
+        await self.backend.warm_up()
+
+    async def aclose(self) -> None:
+        """Send whatever is still waiting, let in-flight batches finish, then close the backend."""
+        for key in list(self._pending):
+            self._flush(key, "shutdown")
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+        await self.backend.aclose()
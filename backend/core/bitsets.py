@@ -0,0 +1,63 @@
+"""
+Interned string vocabularies and uint64 tag bitmasks shared by the columnar stores.
+
+Each distinct tag in a column gets a small integer code from a Vocabulary, and
+a row's tags are stored as one uint64 with those codes' bits set, so tag
+matching over a whole column is a vectorized AND and popcount.
+"""
+from typing import Dict, List, Optional, Iterable
+
+import numpy as np
+
+MAX_TAGS = 64
+
+
+class Vocabulary:
+    """Interns strings to small integer codes."""
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        for value in values:
+            self.intern(value)
+
+    def intern(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def split_tags(value: Optional[str]) -> List[str]:
+    """Split a pipe-separated tag column into its non-empty tags."""
+    if not value:
+        return []
+    return [tag.strip() for tag in value.split("|") if tag.strip()]
+
+
+def encode_tags(tags: Iterable[str], vocab: Vocabulary, intern: bool = True) -> int:
+    """Bitmask of the tags' codes; unknown tags are interned, or skipped when `intern` is False."""
+    mask = 0
+    for tag in tags:
+        code = vocab.intern(tag) if intern else vocab.codes.get(tag)
+        if code is None:
+            continue
+        if code >= MAX_TAGS:
+            raise ValueError(f"Tag bitmasks support at most {MAX_TAGS} distinct tags per column")
+        mask |= 1 << code
+    return mask
+
+
+def decode_tags(mask: int, vocab: Vocabulary) -> List[str]:
+    """Tags whose bits are set in `mask`, in code order."""
+    return [value for code, value in enumerate(vocab.values) if mask & (1 << code)]
+
+
+def tag_overlap(masks: np.ndarray, target: int) -> np.ndarray:
+    """Fraction of the target tags present in each row's mask."""
+    target_bits = bin(target).count("1")
+    return np.bitwise_count(masks & np.uint64(target)).astype(np.float32) / target_bits
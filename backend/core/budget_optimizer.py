@@ -0,0 +1,291 @@
+"""
+Budget allocation across candidate influencers.
+
+Each candidate's response curve, expected revenue as a function of expected spend, is
+tabulated from CampaignForecaster.simulate over a grid of budgets, so it carries the
+forecaster's cost, duration and conversion assumptions: a campaign cannot spend more than
+its duration has posts for, and a candidate the forecaster expects to lose money on is
+not worth funding here either. Channel curves scale the simulated revenue by a per-channel
+efficiency. Between grid points the curves are interpolated linearly.
+
+The allocator is a greedy marginal-return heap: budget is handed out in increments to the
+candidate whose next increment returns the most revenue per dollar, which is optimal for
+concave curves up to the increment size. Working with a candidate starts with a minimum
+booking (one post), and spending stops when no increment returns at least
+`min_marginal_return` dollars per dollar, so part of the budget, or all of it, can be held
+in reserve.
+
+With audience sketches loaded, a candidate whose followers are largely reached by
+candidates ahead of it in greedy unique-reach order keeps only its exclusive share of
+revenue, so overlapping audiences are not paid for twice.
+"""
+import heapq
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from core.forecast import CampaignForecaster
+from core.audience_sketches import AudienceSketchStore
+
+# Relative revenue efficiency per channel; unknown channels use 1.0
+DEFAULT_CHANNEL_CURVES: Dict[str, Dict[str, float]] = {
+    "Instagram": {"efficiency": 1.0},
+    "TikTok": {"efficiency": 0.9},
+    "YouTube": {"efficiency": 1.2},
+    "Twitch": {"efficiency": 0.8},
+    "Pinterest": {"efficiency": 1.1},
+    "Snapchat": {"efficiency": 0.7}
+}
+
+# Budgets simulated per candidate, and simulated outcomes (candidates x budgets x samples) per simulate call
+CURVE_POINTS = 24
+SIMULATION_CHUNK = 4_000_000
+# Fewest Monte Carlo samples per curve point, however many candidates there are
+MIN_CURVE_SAMPLES = 128
+# Lognormal cost draws rarely exceed three times the mean, so spend has flattened out by then
+MAX_COST_MULTIPLE = 3.0
+
+NOT_WORTH_SPENDING = ("Budget not worth spending: no candidate is expected to return at least "
+                      "{min_return:g} per dollar under the forecast assumptions")
+
+
+class BudgetOptimizer:
+    """Allocates a total budget across candidate influencers to maximize expected net return."""
+
+    def __init__(self, forecaster: Optional[CampaignForecaster] = None, resolution: int = 1000,
+                 channel_curves: Optional[Dict[str, Dict[str, float]]] = None,
+                 audience_sketches: Optional[AudienceSketchStore] = None):
+        self.forecaster = forecaster or CampaignForecaster()
+        self.resolution = resolution
+        self.channel_curves = {**DEFAULT_CHANNEL_CURVES, **(channel_curves or {})}
+        self.audience_sketches = audience_sketches
+
+    def response_curves(self, candidates: List[Dict[str, Any]], total_budget: float, weeks: float,
+                        channel_curves: Optional[Dict[str, Dict[str, float]]] = None) -> Dict[str, np.ndarray]:
+        """
+        Tabulated curves per candidate: expected `spend` and `revenue` (candidates x CURVE_POINTS)
+        at budgets from 0 up to what `weeks` of posting can absorb, and the mean `cost_per_post`.
+        Candidates may override cost_per_post and revenue_per_post (revenue of the first post).
+        The sample count per point is the forecaster's own for small candidate sets and shrinks
+        toward MIN_CURVE_SAMPLES as the set grows.
+        """
+        curves = {**self.channel_curves, **(channel_curves or {})}
+        forecaster = self.forecaster
+
+        def column(key: str, default: float) -> np.ndarray:
+            return np.array([float(candidate.get(key) or default) for candidate in candidates], dtype=np.float64)
+
+        followers = np.maximum(column("followers", 0), 1)
+        engagement = column("engagement_rate", 3.5)
+        # Shortlist scores are 0-100; anything else is taken as a 0-1 fit
+        fit = np.array([_fit(candidate) for candidate in candidates], dtype=np.float64)
+        efficiency = np.array([curves.get(candidate.get("platform"), {}).get("efficiency", 1.0)
+                               for candidate in candidates])
+
+        default_cost = followers / 1000 * forecaster.cost_per_thousand_followers
+        cost_per_post = np.array([float(candidate.get("cost_per_post") or cost)
+                                  for candidate, cost in zip(candidates, default_cost)])
+        # The forecaster prices posts itself; an overridden price buys cost_ratio times as many of them
+        cost_ratio = default_cost / cost_per_post
+        ceiling = np.minimum(total_budget, max(weeks, 0) * forecaster.posts_per_week * cost_per_post * MAX_COST_MULTIPLE)
+        budgets = ceiling[:, None] * np.linspace(0, 1, CURVE_POINTS)
+        samples = min(forecaster.samples,
+                      max(MIN_CURVE_SAMPLES, SIMULATION_CHUNK // max(len(candidates) * CURVE_POINTS, 1)))
+        chunk = max(SIMULATION_CHUNK // (CURVE_POINTS * samples), 1)
+
+        spend = np.empty_like(budgets)
+        revenue = np.empty_like(budgets)
+        for first in range(0, len(candidates), chunk):
+            rows = slice(first, first + chunk)
+            outcomes = forecaster.simulate(
+                (budgets[rows] * cost_ratio[rows, None]).ravel(), weeks,
+                np.repeat(followers[rows], CURVE_POINTS), np.repeat(engagement[rows], CURVE_POINTS),
+                np.repeat(fit[rows], CURVE_POINTS), samples=None if samples == forecaster.samples else samples)
+            shape = budgets[rows].shape
+            spend[rows] = outcomes["spend"].mean(axis=1).reshape(shape) / cost_ratio[rows, None]
+            revenue[rows] = outcomes["revenue"].mean(axis=1).reshape(shape)
+        # Rounding in float32 must not make the curves run backwards
+        spend = np.maximum.accumulate(spend, axis=1)
+        revenue = np.maximum.accumulate(revenue, axis=1)
+
+        shares = self.exclusive_shares(candidates)
+        scale = efficiency * shares
+        overridden = [index for index, candidate in enumerate(candidates) if candidate.get("revenue_per_post")]
+        if overridden:
+            # An overridden first-post revenue rescales the simulated curve instead of the channel efficiency
+            first_post = _interpolate(cost_per_post[overridden], spend[overridden], revenue[overridden])
+            requested = np.array([float(candidates[index]["revenue_per_post"]) for index in overridden])
+            scale[overridden] = requested / np.maximum(first_post, 1e-9) * shares[overridden]
+        return {
+            "spend": spend,
+            "revenue": revenue * scale[:, None],
+            "cost_per_post": cost_per_post
+        }
+
+    def exclusive_shares(self, candidates: List[Dict[str, Any]]) -> np.ndarray:
+        """Share of each candidate's audience not reached by candidates ahead of it in greedy reach order (1.0 without sketches)."""
+        shares = np.ones(len(candidates))
+        if self.audience_sketches is None or len(candidates) < 2:
+            return shares
+        rows = [self.audience_sketches.find(candidate.get("name")) for candidate in candidates]
+        known = [index for index, row in enumerate(rows) if row is not None]
+        # Only the first listing of an influencer counts; repeats add nobody new
+        first: Dict[int, int] = {}
+        for index in known:
+            if rows[index] in first:
+                shares[index] = 0.0
+            else:
+                first[rows[index]] = index
+        if len(first) > 1:
+            shares[list(first.values())] = self.audience_sketches.exclusive_shares(np.array(list(first)))
+        return shares
+
+    def allocate(self, total_budget: float, candidates: List[Dict[str, Any]], weeks: float = 4.0,
+                 channel_curves: Optional[Dict[str, Dict[str, float]]] = None,
+                 max_channel_share: Optional[Dict[str, float]] = None,
+                 max_candidate_share: float = 1.0, min_marginal_return: float = 1.0) -> Dict[str, Any]:
+        """
+        Allocate `total_budget` across `candidates` (dicts with name, platform, followers,
+        engagement_rate and optionally score, cost_per_post, revenue_per_post, max_spend) for a
+        campaign of `weeks` weeks. `max_channel_share` caps the fraction of the budget per
+        platform and `max_candidate_share` the fraction per candidate.
+        """
+        if total_budget <= 0 or not candidates:
+            return self._result(total_budget, candidates, np.zeros(len(candidates)), None, min_marginal_return)
+        curves = self.response_curves(candidates, total_budget, weeks, channel_curves)
+        spend_points, revenue_points, cost_per_post = curves["spend"], curves["revenue"], curves["cost_per_post"]
+        step = total_budget / self.resolution
+        # Past its last curve point a candidate has no posts left to sell in the campaign's duration
+        limits = np.minimum(total_budget * max_candidate_share, spend_points[:, -1])
+        # A max_spend of 0 excludes the candidate; only a missing one means unlimited
+        explicit = np.array([np.inf if candidate.get("max_spend") is None else float(candidate["max_spend"])
+                             for candidate in candidates])
+        limits = np.minimum(limits, explicit)
+        channel_limits = {channel: share * total_budget for channel, share in (max_channel_share or {}).items()}
+        channel_spend: Dict[str, float] = {}
+        platforms = [candidate.get("platform") for candidate in candidates]
+
+        def block(index: int, spent: float) -> float:
+            """Size of the next increment: a whole post to start with, then one step."""
+            return max(cost_per_post[index], step) if spent == 0 else step
+
+        def gain(index: int, spent: float, amount: float) -> float:
+            before, after = np.interp((spent, spent + amount), spend_points[index], revenue_points[index])
+            return after - before
+
+        # Max-heap of (-revenue per dollar of the next block, candidate); first blocks computed vectorized
+        first = np.maximum(cost_per_post, step)
+        first_rate = _interpolate(first, spend_points, revenue_points) / first
+        heap = [(-rate, index) for index, rate in enumerate(first_rate.tolist())
+                if rate >= min_marginal_return and first[index] <= limits[index]]
+        heapq.heapify(heap)
+
+        allocation = np.zeros(len(candidates))
+        remaining = total_budget
+        while heap and remaining > 1e-9:
+            negative_rate, index = heapq.heappop(heap)
+            amount = min(block(index, allocation[index]), remaining, limits[index] - allocation[index])
+            channel = platforms[index]
+            if channel in channel_limits:
+                amount = min(amount, channel_limits[channel] - channel_spend.get(channel, 0.0))
+            # A candidate cannot be booked for less than one post
+            if amount <= 1e-9 or (allocation[index] == 0 and amount < cost_per_post[index]):
+                continue
+            if amount < block(index, allocation[index]):
+                # A partial block earns less per dollar than its full-size rate promised; re-rank it
+                rate = gain(index, allocation[index], amount) / amount
+                if heap and rate < -heap[0][0]:
+                    heapq.heappush(heap, (-rate, index))
+                    continue
+            allocation[index] += amount
+            remaining -= amount
+            channel_spend[channel] = channel_spend.get(channel, 0.0) + amount
+            if allocation[index] < limits[index]:
+                next_amount = min(block(index, allocation[index]), limits[index] - allocation[index])
+                next_rate = gain(index, allocation[index], next_amount) / next_amount
+                if next_rate >= min_marginal_return:
+                    heapq.heappush(heap, (-next_rate, index))
+        return self._result(total_budget, candidates, allocation, curves, min_marginal_return)
+
+    def _result(self, total_budget: float, candidates: List[Dict[str, Any]], allocation: np.ndarray,
+                curves: Optional[Dict[str, np.ndarray]], min_marginal_return: float) -> Dict[str, Any]:
+        """Describe an allocation and compare it with an even split of the whole budget."""
+        if curves is None:
+            revenue = baseline_revenue = baseline = np.zeros(len(candidates))
+        else:
+            revenue = _interpolate(allocation, curves["spend"], curves["revenue"])
+            # An even share a candidate cannot spend within the campaign stays unspent
+            baseline = np.minimum(total_budget / max(len(candidates), 1), curves["spend"][:, -1])
+            baseline_revenue = _interpolate(baseline, curves["spend"], curves["revenue"])
+        spend = float(allocation.sum())
+        expected = _summary(spend, float(revenue.sum()))
+        even_split = _summary(float(baseline.sum()), float(baseline_revenue.sum()))
+
+        by_channel: Dict[str, float] = {}
+        allocations = []
+        for index in np.flatnonzero(allocation > 0)[np.argsort(-allocation[allocation > 0], kind="stable")]:
+            candidate = candidates[index]
+            amount = float(allocation[index])
+            by_channel[candidate.get("platform") or "unknown"] = by_channel.get(candidate.get("platform") or "unknown", 0.0) + amount
+            allocations.append({
+                "name": candidate.get("name"),
+                "platform": candidate.get("platform"),
+                "spend": round(amount, 2),
+                "share": round(amount / total_budget, 4),
+                "posts": round(amount / float(curves["cost_per_post"][index]), 1),
+                "expected_revenue": round(float(revenue[index]), 2),
+                "roi": round((float(revenue[index]) - amount) / amount * 100, 1)
+            })
+        result = {
+            "total_budget": float(total_budget),
+            "allocated": round(spend, 2),
+            "reserve": round(float(total_budget) - spend, 2),
+            "allocations": allocations,
+            "by_channel": {channel: round(amount, 2) for channel, amount in by_channel.items()},
+            "expected": expected,
+            "even_split": even_split,
+            # Nothing funded leaves nothing to compare with the even split
+            "expected_improvements": {
+                "revenue_pct": _percent_change(expected["revenue"], even_split["revenue"]),
+                "net_return_pct": _percent_change(expected["net_return"], even_split["net_return"]),
+                "roi_points": (round(expected["roi"] - even_split["roi"], 1)
+                               if even_split["roi"] is not None else None)
+            } if allocations else None
+        }
+        if not allocations and total_budget > 0 and candidates:
+            result["recommendation"] = NOT_WORTH_SPENDING.format(min_return=min_marginal_return)
+        if self.audience_sketches is not None:
+            result["audience_reach"] = self.audience_sketches.reach_report(
+                [candidates[index].get("name") for index in np.flatnonzero(allocation > 0)])
+        return result
+
+
+def _fit(candidate: Dict[str, Any]) -> float:
+    score = candidate.get("score", candidate.get("audience_fit"))
+    if not isinstance(score, (int, float)):
+        return 0.7
+    return min(max(score / 100 if score > 1 else score, 0.0), 1.0)
+
+
+def _interpolate(x: np.ndarray, xp: np.ndarray, fp: np.ndarray) -> np.ndarray:
+    """Row-wise np.interp: evaluate each row's piecewise-linear curve (xp, fp) at that row's x."""
+    right = np.clip((xp <= x[:, None]).sum(axis=1), 1, xp.shape[1] - 1)
+    rows = np.arange(len(x))
+    x0, x1 = xp[rows, right - 1], xp[rows, right]
+    y0, y1 = fp[rows, right - 1], fp[rows, right]
+    weight = np.clip((x - x0) / np.where(x1 > x0, x1 - x0, 1.0), 0.0, 1.0)
+    return y0 + weight * (y1 - y0)
+
+
+def _summary(spend: float, revenue: float) -> Dict[str, Optional[float]]:
+    # Spending nothing has no return on investment to report
+    return {
+        "spend": round(spend, 2),
+        "revenue": round(revenue, 2),
+        "net_return": round(revenue - spend, 2),
+        "roi": round((revenue - spend) / spend * 100, 1) if spend > 0 else None
+    }
+
+
+def _percent_change(new: float, old: float) -> Optional[float]:
+    return round((new - old) / abs(old) * 100, 1) if old else None
@@ -0,0 +1,207 @@
+import asyncio
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+class CacheBackend(ABC):
+    # Backends whose calls wait on disk or network set this, so async callers run them off the event loop
+    blocking = False
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Return the stored value, or None if it is missing or expired."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        """Store a value, evicting the least recently used entries beyond max_entries."""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU store. Values are copied in and out so callers cannot mutate cached results."""
+
+    def __init__(self, max_entries: int = 1024):
+        super().__init__(max_entries)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._entries[key] = (copy.deepcopy(value), expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteCacheBackend(CacheBackend):
+    """
+    On-disk LRU store so cached results survive restarts. Values must be JSON-serializable.
+
+    A hit is a read only: access times are kept in memory and written with the
+    next `set`, or once `flush_every` of them are pending, so lookups do not
+    commit to disk. Calls may come from any thread; ResponseCache.aget and aset
+    run them in worker threads.
+    """
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int = 1024, flush_every: int = 256):
+        super().__init__(max_entries)
+        self.path = path
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._accessed: Dict[str, float] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._accessed.pop(key, None)
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._accessed[key] = now
+            if len(self._accessed) >= self.flush_every:
+                self._flush_accessed()
+                self._conn.commit()
+        return json.loads(value)
+
+    def _flush_accessed(self) -> None:
+        """Write pending access times; the caller holds the lock and commits."""
+        if self._accessed:
+            self._conn.executemany("UPDATE responses SET last_access = ? WHERE key = ?",
+                                   [(accessed, key) for key, accessed in self._accessed.items()])
+            self._accessed.clear()
+
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            # Recency must be on disk before eviction picks the least recently used entries
+            self._flush_accessed()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now)
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._accessed.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_accessed()
+            self._conn.commit()
+        self._conn.close()
+
+
+class ResponseCache:
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: Optional[float] = 300.0):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(agent_name: str, task_type: str, prompt: str) -> str:
+        """Build a content-addressed key from the agent, task type and whitespace-normalized prompt."""
+        canonical = " ".join(prompt.split())
+        digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return f"{agent_name}:{task_type}:{digest}"
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._count(self.backend.get(key))
+
+    def _count(self, value: Optional[Any]) -> Optional[Any]:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.backend.set(key, value, self.ttl)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """`get` for coroutines: a blocking backend is read in a worker thread."""
+        if not self.backend.blocking:
+            return self.get(key)
+        # Only the backend call leaves the loop; the hit counters stay on it
+        return self._count(await asyncio.to_thread(self.backend.get, key))
+
+    async def aset(self, key: str, value: Any) -> None:
+        """`set` for coroutines: a blocking backend is written in a worker thread."""
+        if not self.backend.blocking:
+            self.set(key, value)
+        else:
+            await asyncio.to_thread(self.backend.set, key, value, self.ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current number of entries."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.backend)
+        }
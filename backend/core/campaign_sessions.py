@@ -0,0 +1,104 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class CampaignSession:
+    """
+    The last request and per-stage results of one campaign a planner is iterating on.
+
+    A stage's output depends exactly on the task it was given, which the orchestrator
+    builds from the request fields it reads and the outputs of upstream stages. Each
+    stage is therefore stored with a fingerprint of its task and is only recomputed
+    when that fingerprint changes.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.lock = asyncio.Lock()
+        self.request: Optional[Dict[str, Any]] = None
+        self.stages: Dict[str, Tuple[str, Any]] = {}
+        self.iterations = 0
+        self.recomputed: List[str] = []
+        self.reused: List[str] = []
+        self.touched = time.monotonic()
+
+    def begin(self, request: Dict[str, Any]) -> List[str]:
+        """Start an iteration and return the request fields that changed since the last one."""
+        previous = self.request or {}
+        changed = sorted(key for key in set(previous) | set(request) if previous.get(key) != request.get(key))
+        self.request = dict(request)
+        self.iterations += 1
+        self.recomputed = []
+        self.reused = []
+        return changed
+
+    def stage(self, name: str, agent: Any) -> "SessionStage":
+        """Wrap an agent so the stage called `name` reuses its stored result for an unchanged task."""
+        return SessionStage(self, name, agent)
+
+
+class SessionStage:
+    """Agent wrapper that memoizes one stage's result in its session."""
+
+    def __init__(self, session: CampaignSession, name: str, agent: Any):
+        self.session = session
+        self.stage_name = name
+        self.agent = agent
+        self.name = agent.name
+
+    async def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        fingerprint = json.dumps(task, sort_keys=True, default=str)
+        stored = self.session.stages.get(self.stage_name)
+        if stored is not None and stored[0] == fingerprint:
+            self.session.reused.append(self.stage_name)
+            return stored[1]
+        result = await self.agent.process_task(task)
+        self.session.stages[self.stage_name] = (fingerprint, result)
+        self.session.recomputed.append(self.stage_name)
+        return result
+
+
+class CampaignSessionStore:
+    """In-memory campaign sessions, evicted least recently used first and after `ttl` seconds idle."""
+
+    def __init__(self, max_sessions: int = 1024, ttl: float = 3600):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, CampaignSession]" = OrderedDict()
+        self.evicted = 0
+
+    def get(self, session_id: str) -> CampaignSession:
+        """Return the session, creating it (and evicting old ones) if needed."""
+        now = time.monotonic()
+        session = self._sessions.get(session_id)
+        if session is not None and now - session.touched > self.ttl:
+            self.discard(session_id)
+            session = None
+        if session is None:
+            self._evict(now)
+            session = self._sessions[session_id] = CampaignSession(session_id)
+        self._sessions.move_to_end(session_id)
+        session.touched = now
+        return session
+
+    def discard(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def _evict(self, now: float) -> None:
+        # Idle sessions sit at the front, so expired ones can be dropped from there
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.touched <= self.ttl and len(self._sessions) < self.max_sessions:
+                break
+            # A session mid-iteration keeps its own reference, so dropping it here is safe
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"sessions": len(self._sessions), "max_sessions": self.max_sessions, "evicted": self.evicted}
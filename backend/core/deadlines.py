@@ -0,0 +1,38 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Iterator
+
+# Monotonic time by which the current request must answer; asyncio tasks inherit it
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """Give the enclosed block `seconds` to finish. A nested scope can shorten an outer deadline but never extend it."""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = request_deadline.get()
+    token = request_deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        request_deadline.reset(token)
+
+
+def time_remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline (at least 0), or None without a deadline."""
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def cap_timeout(timeout: Optional[float]) -> Optional[float]:
+    """Shorten `timeout` so it does not run past the current request's deadline."""
+    remaining = time_remaining()
+    if remaining is None:
+        return timeout
+    return remaining if timeout is None else min(timeout, remaining)
@@ -0,0 +1,239 @@
+"""
+Read-only, memory-mapped store of per-influencer audience demographics.
+
+A store is a directory of fixed-width NumPy columns plus a small JSON header:
+
+    meta.json       row count and the interned location / interest vocabularies
+    names.npy       UTF-8 names, sorted, so lookups are a binary search
+    age.npy         uint8 (rows, len(AGE_BUCKETS)) audience share per age bucket, in percent
+    gender.npy      uint8 (rows, len(GENDERS)) audience share per gender, in percent
+    location.npy    uint16 primary audience location code
+    interests.npy   uint64 interest tag mask (one bit per interned interest)
+
+Columns are opened with mmap, so every worker process on a host shares one
+copy of the data through the page cache instead of loading its own.
+
+Build a store from a CSV from the backend directory:
+
+    python -m core.feature_store data/demographics_sample.csv /var/lib/marketmuse/demographics
+"""
+import argparse
+import csv
+import json
+import os
+from typing import Dict, Any, Optional, Iterable
+
+import numpy as np
+
+from core.bitsets import Vocabulary, split_tags, encode_tags, decode_tags, tag_overlap
+from core.query_parser import QueryParser, get_default_parser
+
+FORMAT_VERSION = 1
+
+AGE_BUCKETS = ("13-17", "18-24", "25-34", "35-44", "45-54", "55+")
+GENDERS = ("female", "male", "other")
+
+# Age buckets covered by each audience segment the query parser recognises
+SEGMENT_AGES = {
+    "Teens": ("13-17",),
+    "Gen Z": ("13-17", "18-24"),
+    "Students": ("18-24",),
+    "Millennials": ("25-34", "35-44"),
+    "Parents": ("25-34", "35-44"),
+    "Professionals": ("25-34", "35-44", "45-54"),
+    "Gen X": ("45-54",),
+    "Baby Boomers": ("55+",)
+}
+SEGMENT_GENDERS = {"Women": "female", "Men": "male"}
+
+
+class DemographicFeatureStore:
+    """Fixed-width demographic columns for every influencer, matched against a target audience with array operations."""
+
+    def __init__(self, names: np.ndarray, age: np.ndarray, gender: np.ndarray, location: np.ndarray,
+                 interests: np.ndarray, location_vocab: Vocabulary, interest_vocab: Vocabulary):
+        self.names = names
+        self.age = age
+        self.gender = gender
+        self.location = location
+        self.interests = interests
+        self.location_vocab = location_vocab
+        self.interest_vocab = interest_vocab
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def open(cls, path: str, mmap: bool = True) -> "DemographicFeatureStore":
+        """Open a store directory. With `mmap=False` the columns are read into private memory instead."""
+        with open(os.path.join(path, "meta.json")) as meta_file:
+            meta = json.load(meta_file)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported feature store version: {meta.get('version')}")
+        mmap_mode = "r" if mmap else None
+
+        def column(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+
+        store = cls(column("names"), column("age"), column("gender"), column("location"), column("interests"),
+                    Vocabulary(meta["locations"]), Vocabulary(meta["interests"]))
+        if len(store.names) != meta["rows"]:
+            raise ValueError(f"Feature store at {path} is truncated")
+        return store
+
+    @staticmethod
+    def write(path: str, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Write a store directory from dicts with name, age_distribution, gender_distribution
+        (percentages keyed by AGE_BUCKETS / GENDERS), location and interests. Returns the row count.
+        """
+        location_vocab, interest_vocab = Vocabulary(), Vocabulary()
+        rows = []
+        for record in records:
+            age_shares = record.get("age_distribution") or {}
+            gender_shares = record.get("gender_distribution") or {}
+            rows.append((
+                record["name"].encode("utf-8"),
+                [_percent(age_shares.get(bucket)) for bucket in AGE_BUCKETS],
+                [_percent(gender_shares.get(gender)) for gender in GENDERS],
+                location_vocab.intern(record.get("location") or "unknown"),
+                encode_tags(record.get("interests") or (), interest_vocab)
+            ))
+        rows.sort(key=lambda row: row[0])
+
+        os.makedirs(path, exist_ok=True)
+        width = max((len(row[0]) for row in rows), default=1)
+        columns = {
+            "names": np.array([row[0] for row in rows], dtype=f"S{width}"),
+            "age": np.array([row[1] for row in rows], dtype=np.uint8).reshape(len(rows), len(AGE_BUCKETS)),
+            "gender": np.array([row[2] for row in rows], dtype=np.uint8).reshape(len(rows), len(GENDERS)),
+            "location": np.array([row[3] for row in rows], dtype=np.uint16),
+            "interests": np.array([row[4] for row in rows], dtype=np.uint64)
+        }
+        for name, values in columns.items():
+            np.save(os.path.join(path, f"{name}.npy"), values)
+        # The header goes last so a half-written directory never opens
+        with open(os.path.join(path, "meta.json"), "w") as meta_file:
+            json.dump({"version": FORMAT_VERSION, "rows": len(rows), "locations": location_vocab.values,
+                       "interests": interest_vocab.values}, meta_file)
+        return len(rows)
+
+    @staticmethod
+    def write_csv(path: str, csv_path: str) -> int:
+        """Write a store from a CSV with one column per age bucket and gender, location and pipe-separated interests."""
+        with open(csv_path, newline="") as csv_file:
+            return DemographicFeatureStore.write(path, ({
+                "name": row["name"],
+                "age_distribution": {bucket: row.get(_age_column(bucket)) for bucket in AGE_BUCKETS},
+                "gender_distribution": {gender: row.get(gender) for gender in GENDERS},
+                "location": row.get("location"),
+                "interests": split_tags(row.get("interests"))
+            } for row in csv.DictReader(csv_file)))
+
+    def find(self, name: Optional[str]) -> Optional[int]:
+        """Row id for an influencer name, by binary search over the sorted name column."""
+        if not name:
+            return None
+        key = name.encode("utf-8")
+        if len(key) > self.names.dtype.itemsize:
+            return None
+        row = int(np.searchsorted(self.names, key))
+        return row if row < len(self) and self.names[row] == key else None
+
+    def target_profile(self, target_audience: Optional[str], parser: Optional[QueryParser] = None) -> Dict[str, Any]:
+        """Translate a free-text target audience into age bucket, gender, location and interest selectors."""
+        text = target_audience or ""
+        entities = (parser or get_default_parser()).parse(text)
+        segments = entities.get("audience", [])
+        ages = sorted({AGE_BUCKETS.index(bucket) for segment in segments for bucket in SEGMENT_AGES.get(segment, ())})
+        genders = sorted({GENDERS.index(SEGMENT_GENDERS[segment]) for segment in segments if segment in SEGMENT_GENDERS})
+        interests = [tag for tag in entities.get("category", []) + [segment.lower() for segment in segments]
+                     if tag in self.interest_vocab.codes]
+        lowered = f" {' '.join(text.lower().split())} "
+        locations = [code for code, location in enumerate(self.location_vocab.values)
+                     if location != "unknown" and f" {location.lower()} " in lowered]
+        return {
+            "ages": ages,
+            "genders": genders,
+            "locations": locations,
+            "interest_mask": encode_tags(interests, self.interest_vocab, intern=False)
+        }
+
+    def match_components(self, profile: Dict[str, Any], rows: Optional[np.ndarray] = None) -> Dict[str, Optional[np.ndarray]]:
+        """
+        Per-row alignment (0-1) of each demographic dimension with a target profile,
+        or None for dimensions the target does not constrain.
+        """
+        def column(values: np.ndarray) -> np.ndarray:
+            return values if rows is None else values[rows]
+
+        components: Dict[str, Optional[np.ndarray]] = {"age": None, "gender": None, "location": None, "interests": None}
+        if profile["ages"]:
+            components["age"] = column(self.age)[:, profile["ages"]].sum(axis=1, dtype=np.float32) / 100
+        if profile["genders"]:
+            components["gender"] = column(self.gender)[:, profile["genders"]].sum(axis=1, dtype=np.float32) / 100
+        if profile["locations"]:
+            components["location"] = np.isin(column(self.location), profile["locations"]).astype(np.float32)
+        if profile["interest_mask"]:
+            components["interests"] = tag_overlap(column(self.interests), profile["interest_mask"])
+        return components
+
+    def match_scores(self, profile: Dict[str, Any], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Mean alignment over the constrained dimensions, scaled to 0-100 (50 when nothing is constrained)."""
+        components = [values for values in self.match_components(profile, rows).values() if values is not None]
+        if not components:
+            return np.full(len(self) if rows is None else len(rows), 50.0, dtype=np.float32)
+        return np.clip(np.mean(components, axis=0) * 100, 0, 100)
+
+    def analyze(self, name: str, target_audience: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Demographic analysis of one influencer against a target audience, or None if the name is unknown."""
+        row = self.find(name)
+        if row is None:
+            return None
+        profile = self.target_profile(target_audience)
+        rows = np.array([row])
+        components = {key: None if values is None else float(values[0])
+                      for key, values in self.match_components(profile, rows).items()}
+        return {
+            "demographic_match": int(round(float(self.match_scores(profile, rows)[0]))),
+            "audience_insights": {
+                "age_alignment": _alignment(components["age"]),
+                "gender_distribution": _alignment(components["gender"]),
+                "geographic_reach": _alignment(components["location"]),
+                "interest_alignment": _alignment(components["interests"])
+            },
+            "audience_profile": {
+                "age_distribution": dict(zip(AGE_BUCKETS, self.age[row].tolist())),
+                "gender_distribution": dict(zip(GENDERS, self.gender[row].tolist())),
+                "location": self.location_vocab.values[int(self.location[row])],
+                "interests": decode_tags(int(self.interests[row]), self.interest_vocab)
+            }
+        }
+
+
+def _age_column(bucket: str) -> str:
+    return "age_" + bucket.replace("-", "_").replace("+", "_plus")
+
+
+def _percent(value: Any) -> int:
+    return min(max(int(round(float(value))), 0), 100) if value not in (None, "") else 0
+
+
+def _alignment(value: Optional[float]) -> str:
+    if value is None:
+        return "Not assessed"
+    if value >= 0.75:
+        return "Excellent"
+    if value >= 0.5:
+        return "Good"
+    if value >= 0.25:
+        return "Moderate"
+    return "Weak"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a demographic feature store from a CSV")
+    parser.add_argument("csv_path")
+    parser.add_argument("store_path")
+    args = parser.parse_args()
+    print(f"Wrote {DemographicFeatureStore.write_csv(args.store_path, args.csv_path)} rows to {args.store_path}")
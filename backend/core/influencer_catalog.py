@@ -0,0 +1,213 @@
+import csv
+import os
+from typing import Dict, Any, List, Optional, Iterable, Sequence
+
+import numpy as np
+
+from core.bitsets import Vocabulary, split_tags, encode_tags, decode_tags, tag_overlap
+
+# Upper bounds (exclusive) of the follower bands used by the band index
+FOLLOWER_BANDS = {
+    "nano": 10_000,
+    "micro": 100_000,
+    "mid": 500_000,
+    "macro": 1_000_000,
+    "mega": np.iinfo(np.int64).max
+}
+
+DEFAULT_WEIGHTS = {
+    "engagement": 0.35,
+    "followers": 0.15,
+    "category": 0.30,
+    "audience": 0.20
+}
+
+
+class InfluencerCatalog:
+    """
+    Columnar, NumPy-backed influencer store with indexes for fast shortlisting.
+
+    Platforms are stored as interned codes; categories and audience segments as
+    64-bit masks (one bit per interned tag), so overlap with a target set is a
+    bitwise AND and a popcount over whole columns.
+    """
+
+    def __init__(self, names: np.ndarray, platforms: np.ndarray, followers: np.ndarray,
+                 engagement_rates: np.ndarray, category_masks: np.ndarray, audience_masks: np.ndarray,
+                 platform_vocab: Vocabulary, category_vocab: Vocabulary, audience_vocab: Vocabulary):
+        self.names = names
+        self.platforms = platforms.astype(np.int16, copy=False)
+        self.followers = followers.astype(np.int64, copy=False)
+        self.engagement_rates = engagement_rates.astype(np.float32, copy=False)
+        self.category_masks = category_masks.astype(np.uint64, copy=False)
+        self.audience_masks = audience_masks.astype(np.uint64, copy=False)
+        self.platform_vocab = platform_vocab
+        self.category_vocab = category_vocab
+        self.audience_vocab = audience_vocab
+        self._build_indexes()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _build_indexes(self) -> None:
+        """Precompute normalised score components and row-id indexes on platform, category and band."""
+        self._log_followers = np.log10(np.maximum(self.followers, 1)).astype(np.float32)
+        max_log = float(self._log_followers.max()) if len(self) else 1.0
+        self._follower_scores = self._log_followers / max(max_log, 1.0)
+        # Engagement above the 99th percentile is treated as saturated (and likely inflated)
+        cap = float(np.percentile(self.engagement_rates, 99)) if len(self) else 1.0
+        self._engagement_scores = np.clip(self.engagement_rates / max(cap, 1e-6), 0, 1)
+
+        self.platform_index = {
+            code: np.flatnonzero(self.platforms == code) for code in range(len(self.platform_vocab))
+        }
+        self.category_index = {
+            code: np.flatnonzero(self.category_masks & np.uint64(1 << code)) for code in range(len(self.category_vocab))
+        }
+        bounds = np.array(list(FOLLOWER_BANDS.values()))
+        self.band_of_row = np.searchsorted(bounds, self.followers, side="right").astype(np.int8)
+        self.band_index = {
+            band: np.flatnonzero(self.band_of_row == position) for position, band in enumerate(FOLLOWER_BANDS)
+        }
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "InfluencerCatalog":
+        """Build a catalog from dicts with name, platform, followers, engagement_rate, categories and audiences."""
+        names, platforms, followers, engagement_rates, category_masks, audience_masks = [], [], [], [], [], []
+        platform_vocab, category_vocab, audience_vocab = Vocabulary(), Vocabulary(), Vocabulary()
+        for record in records:
+            names.append(record["name"])
+            platforms.append(platform_vocab.intern(record["platform"]))
+            followers.append(int(record["followers"]))
+            engagement_rates.append(float(record["engagement_rate"]))
+            category_masks.append(encode_tags(record.get("categories", ()), category_vocab))
+            audience_masks.append(encode_tags(record.get("audiences", ()), audience_vocab))
+        return cls(np.array(names, dtype=object), np.array(platforms), np.array(followers),
+                   np.array(engagement_rates), np.array(category_masks, dtype=np.uint64),
+                   np.array(audience_masks, dtype=np.uint64), platform_vocab, category_vocab, audience_vocab)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "InfluencerCatalog":
+        """Load a CSV whose categories and audiences columns are pipe-separated lists."""
+        with open(path, newline="") as csv_file:
+            return cls.from_records({
+                **row,
+                "categories": split_tags(row.get("categories")),
+                "audiences": split_tags(row.get("audiences"))
+            } for row in csv.DictReader(csv_file))
+
+    @classmethod
+    def from_parquet(cls, path: str) -> "InfluencerCatalog":
+        """Load a Parquet file with the same columns as the CSV format. Requires pyarrow."""
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Loading Parquet catalogs requires pyarrow (pip install pyarrow)") from e
+        table = pq.read_table(path).to_pydict()
+        return cls.from_records({
+            "name": table["name"][row],
+            "platform": table["platform"][row],
+            "followers": table["followers"][row],
+            "engagement_rate": table["engagement_rate"][row],
+            "categories": split_tags(table["categories"][row]),
+            "audiences": split_tags(table["audiences"][row])
+        } for row in range(len(table["name"])))
+
+    def save(self, path: str) -> None:
+        """Write a compact .npz snapshot that loads much faster than CSV."""
+        np.savez(path, names=self.names.astype(str), platforms=self.platforms, followers=self.followers,
+                 engagement_rates=self.engagement_rates, category_masks=self.category_masks,
+                 audience_masks=self.audience_masks, platform_vocab=np.array(self.platform_vocab.values, dtype=str),
+                 category_vocab=np.array(self.category_vocab.values, dtype=str),
+                 audience_vocab=np.array(self.audience_vocab.values, dtype=str))
+
+    @classmethod
+    def from_npz(cls, path: str) -> "InfluencerCatalog":
+        with np.load(path) as data:
+            return cls(data["names"].astype(object), data["platforms"], data["followers"], data["engagement_rates"],
+                       data["category_masks"], data["audience_masks"], Vocabulary(data["platform_vocab"].tolist()),
+                       Vocabulary(data["category_vocab"].tolist()), Vocabulary(data["audience_vocab"].tolist()))
+
+    @classmethod
+    def load(cls, path: str) -> "InfluencerCatalog":
+        """Load a catalog, choosing the reader from the file extension."""
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".npz":
+            return cls.from_npz(path)
+        if extension == ".parquet":
+            return cls.from_parquet(path)
+        return cls.from_csv(path)
+
+    def candidate_rows(self, platforms: Optional[Sequence[str]] = None, categories: Optional[Sequence[str]] = None,
+                       bands: Optional[Sequence[str]] = None) -> Optional[np.ndarray]:
+        """
+        Combine the platform, category and band indexes into sorted row ids.
+        Returns None when no filter applies.
+        """
+        filters = []
+        if platforms:
+            filters.append([self.platform_index[self.platform_vocab.codes[p]]
+                            for p in platforms if p in self.platform_vocab.codes])
+        if categories:
+            filters.append([self.category_index[self.category_vocab.codes[c]]
+                            for c in categories if c in self.category_vocab.codes])
+        if bands:
+            filters.append([self.band_index[band] for band in bands if band in self.band_index])
+        if not filters:
+            return None
+        if len(filters) == 1 and len(filters[0]) == 1:
+            return filters[0][0]
+
+        # Scatter each filter's posting lists into a boolean mask and AND them together
+        selected = None
+        for postings in filters:
+            mask = np.zeros(len(self), dtype=bool)
+            for rows in postings:
+                mask[rows] = True
+            selected = mask if selected is None else selected & mask
+        return np.flatnonzero(selected)
+
+    def shortlist(self, categories: Optional[Sequence[str]] = None, audiences: Optional[Sequence[str]] = None,
+                  platforms: Optional[Sequence[str]] = None, bands: Optional[Sequence[str]] = None,
+                  k: int = 10, weights: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """
+        Return the top-k influencers by a weighted score of engagement, follower count,
+        category overlap and audience match. Platform and band filters use the indexes;
+        categories only filter when the catalog knows at least one of them.
+        """
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        known_categories = [c for c in categories or () if c in self.category_vocab.codes]
+        rows = self.candidate_rows(platforms, known_categories, bands)
+        if rows is not None and len(rows) == 0:
+            return []
+
+        def column(values: np.ndarray) -> np.ndarray:
+            return values if rows is None else values[rows]
+
+        scores = weights["engagement"] * column(self._engagement_scores)
+        scores = scores + weights["followers"] * column(self._follower_scores)
+        category_target = encode_tags(known_categories, self.category_vocab, intern=False)
+        if category_target:
+            scores = scores + weights["category"] * tag_overlap(column(self.category_masks), category_target)
+        audience_target = encode_tags(audiences or (), self.audience_vocab, intern=False)
+        if audience_target:
+            scores = scores + weights["audience"] * tag_overlap(column(self.audience_masks), audience_target)
+
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        row_ids = top if rows is None else rows[top]
+        return [self._row(int(row_id), float(score)) for row_id, score in zip(row_ids, scores[top])]
+
+    def _row(self, row_id: int, score: float) -> Dict[str, Any]:
+        return {
+            "name": str(self.names[row_id]),
+            "platform": self.platform_vocab.values[self.platforms[row_id]],
+            "followers": int(self.followers[row_id]),
+            "engagement_rate": round(float(self.engagement_rates[row_id]), 2),
+            "categories": decode_tags(int(self.category_masks[row_id]), self.category_vocab),
+            "audiences": decode_tags(int(self.audience_masks[row_id]), self.audience_vocab),
+            "score": round(score * 100, 1)
+        }
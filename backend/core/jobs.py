@@ -0,0 +1,347 @@
+import asyncio
+import copy
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TERMINAL_STATUSES = {SUCCEEDED, FAILED, CANCELLED}
+
+
+class JobQueueError(Exception):
+    """Base class for job admission failures; `status_code` is the HTTP status to report."""
+    status_code = 503
+
+
+class JobQueueFullError(JobQueueError):
+    """Raised when the number of queued jobs has reached the queue limit."""
+    status_code = 429
+
+
+class JobQueueClosedError(JobQueueError):
+    """Raised when a job is submitted after the queue started shutting down."""
+    status_code = 503
+
+
+class JobStore(ABC):
+    """Keeps job records (status, timestamps, result or error) until they expire."""
+
+    # Stores whose calls wait on disk set this, so JobQueue runs them off the event loop
+    blocking = False
+
+    @abstractmethod
+    def save(self, record: Dict[str, Any]) -> None:
+        """Insert or replace a record; `expires_at` (epoch seconds or None) sets its lifetime."""
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the record, or None if it is missing or expired."""
+        pass
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Delete expired records and return how many were removed."""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+
+class MemoryJobStore(JobStore):
+    """In-process job records. Records are copied in and out so callers cannot mutate stored results."""
+
+    def __init__(self):
+        self._records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def save(self, record: Dict[str, Any]) -> None:
+        self._records[record["job_id"]] = copy.deepcopy(record)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        record = self._records.get(job_id)
+        if record is None:
+            return None
+        if _expired(record, time.time()):
+            del self._records[job_id]
+            return None
+        return copy.deepcopy(record)
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        expired = [job_id for job_id, record in self._records.items() if _expired(record, now)]
+        for job_id in expired:
+            del self._records[job_id]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class SqliteJobStore(JobStore):
+    """On-disk job records, shared by every worker process on a host. Results must be JSON-serializable."""
+
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, record TEXT NOT NULL, expires_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at)")
+        self._conn.commit()
+
+    def save(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, record, expires_at) VALUES (?, ?, ?)",
+                (record["job_id"], json.dumps(record, default=str), record.get("expires_at"))
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record, expires_at FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return json.loads(row[0])
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class JobQueue:
+    """
+    Runs submitted coroutines on a fixed number of background workers.
+
+    Submitting returns a job record at once; the result is kept in the store for
+    `result_ttl` seconds after the job finishes, for clients to poll or long-poll.
+    A blocking store is called from one dedicated thread, so its reads and writes
+    stay off the event loop and run in the order they were issued.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None, workers: int = 4, max_queued: int = 256,
+                 result_ttl: float = 3600, purge_interval: float = 60):
+        if workers < 1:
+            raise ValueError("Job queue needs at least one worker")
+        self.store = store if store is not None else MemoryJobStore()
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.purge_interval = purge_interval
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._work: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._finished: Dict[str, asyncio.Event] = {}
+        self._worker_tasks: list = []
+        self._closed = False
+        self._last_purge = time.monotonic()
+        self._store_thread = (ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+                              if self.store.blocking else None)
+        self.counts = {"submitted": 0, SUCCEEDED: 0, FAILED: 0, CANCELLED: 0, "rejected": 0}
+
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        self._closed = False
+        self._worker_tasks = [asyncio.create_task(self._worker(), name=f"job-worker-{index}")
+                              for index in range(self.workers)]
+
+    async def shutdown(self, drain_timeout: Optional[float] = None) -> bool:
+        """
+        Stop accepting jobs, give running ones `drain_timeout` seconds to finish, then cancel
+        what is left, including queued jobs. Returns False if any job had to be cancelled.
+        """
+        self._closed = True
+        drained = True
+        if self._running:
+            _, pending = await asyncio.wait(list(self._running.values()), timeout=drain_timeout)
+            drained = not pending
+        for job_id in list(self._work):
+            await self.cancel(job_id)
+            drained = False
+        for running in list(self._running.values()):
+            running.cancel()
+        for worker in self._worker_tasks:
+            worker.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        return drained
+
+    def _in_store(self, call: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        """
+        Run a store call on the store thread, or right away for a store that does not block.
+        Calls are queued when this is called, not when the result is awaited.
+        """
+        loop = asyncio.get_running_loop()
+        if self._store_thread is not None:
+            return loop.run_in_executor(self._store_thread, call, *args)
+        done = loop.create_future()
+        done.set_result(call(*args))
+        return done
+
+    async def submit(self, kind: str, work: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+        """Queue `work` (a coroutine function) and return its job record."""
+        if self._closed:
+            self.counts["rejected"] += 1
+            raise JobQueueClosedError("Job queue is shutting down")
+        if len(self._work) >= self.max_queued:
+            self.counts["rejected"] += 1
+            raise JobQueueFullError("Job queue is at capacity")
+        self._maybe_purge()
+        record = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": QUEUED,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+            "expires_at": None
+        }
+        # Queued on the store thread ahead of any read a worker or poller makes for this job
+        saved = self._in_store(self.store.save, copy.deepcopy(record))
+        self._work[record["job_id"]] = work
+        self._finished[record["job_id"]] = asyncio.Event()
+        self._queue.put_nowait(record["job_id"])
+        self.counts["submitted"] += 1
+        await saved
+        return record
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._in_store(self.store.get, job_id)
+
+    async def wait(self, job_id: str, timeout: float, poll_interval: float = 0.25) -> Optional[Dict[str, Any]]:
+        """Return the job record once it is finished or `timeout` seconds have passed."""
+        finished = self._finished.get(job_id)
+        if finished is not None:
+            try:
+                await asyncio.wait_for(finished.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            return await self.get(job_id)
+        # Jobs owned by another process (sharing a SQLite store) are polled
+        deadline = time.monotonic() + timeout
+        while True:
+            record = await self.get(job_id)
+            if record is None or record["status"] in TERMINAL_STATUSES or time.monotonic() >= deadline:
+                return record
+            await asyncio.sleep(min(poll_interval, max(deadline - time.monotonic(), 0)))
+
+    def owns(self, job_id: str) -> bool:
+        """Whether the job is queued or running in this process."""
+        return job_id in self._work or job_id in self._running
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued or running job owned by this process and return its record."""
+        if job_id in self._work:
+            del self._work[job_id]
+            return await self._finish(job_id, CANCELLED, error="Cancelled before it started")
+        running = self._running.get(job_id)
+        if running is not None:
+            # The worker records the cancellation when the task unwinds
+            running.cancel()
+        return await self.get(job_id)
+
+    @property
+    def queued(self) -> int:
+        """Jobs of this process waiting for a worker."""
+        return len(self._work)
+
+    @property
+    def running(self) -> int:
+        """Jobs of this process currently running."""
+        return len(self._running)
+
+    async def stats(self) -> Dict[str, Any]:
+        """Return queue depth, worker utilisation and outcome counters."""
+        return {
+            "workers": self.workers,
+            "queued": self.queued,
+            "running": self.running,
+            "max_queued": self.max_queued,
+            "stored": await self._in_store(len, self.store),
+            "closed": self._closed,
+            **self.counts
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            work = self._work.pop(job_id, None)
+            if work is None:
+                # Cancelled while queued
+                continue
+            running = asyncio.create_task(work(), name=f"job-{job_id}")
+            # Tracked before the record is read, so a cancel arriving meanwhile still reaches the job
+            self._running[job_id] = running
+            try:
+                record = await self.get(job_id)
+                if record is not None:
+                    record.update(status=RUNNING, started_at=time.time())
+                    await self._in_store(self.store.save, record)
+                result = await asyncio.shield(running)
+            except asyncio.CancelledError:
+                # Either the job was cancelled or the worker itself is being shut down;
+                # the job task may already have unwound, so only the queue state tells them apart
+                running.cancel()
+                await self._finish(job_id, CANCELLED,
+                                   error="Cancelled during shutdown" if self._closed else "Cancelled while running")
+                if self._closed:
+                    raise
+            except Exception as e:
+                await self._finish(job_id, FAILED, error=str(e) or type(e).__name__)
+            else:
+                await self._finish(job_id, SUCCEEDED, result=result)
+            finally:
+                self._running.pop(job_id, None)
+
+    async def _finish(self, job_id: str, status: str, result: Any = None,
+                      error: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        record = await self.get(job_id)
+        if record is not None and record["status"] not in TERMINAL_STATUSES:
+            now = time.time()
+            record.update(status=status, finished_at=now, result=result, error=error, expires_at=now + self.result_ttl)
+            await self._in_store(self.store.save, record)
+            self.counts[status] += 1
+        finished = self._finished.pop(job_id, None)
+        if finished is not None:
+            finished.set()
+        return record
+
+    def _maybe_purge(self) -> None:
+        now = time.monotonic()
+        if now - self._last_purge >= self.purge_interval:
+            self._last_purge = now
+            # Nobody waits for the purge; it only has to run on the store thread
+            self._in_store(self.store.purge_expired)
+
+
+def _expired(record: Dict[str, Any], now: float) -> bool:
+    return record.get("expires_at") is not None and record["expires_at"] <= now
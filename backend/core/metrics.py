@@ -0,0 +1,226 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Tuple, Callable, Iterator
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Per-request timing breakdown; set to a dict by the API when a client asks for it
+request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+# (name, start, end) perf_counter spans; set to a list while the current request is being profiled
+request_spans: ContextVar[Optional[List[Tuple[str, float, float]]]] = ContextVar("request_spans", default=None)
+
+
+def _format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metric(ABC):
+    type_name = "untyped"
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type_name}"] + self._samples()
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Return the metric's sample lines in Prometheus text format."""
+        pass
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = ()):
+        super().__init__(name, description, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in self._values.items()]
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = (),
+                 collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        """`collect`, if given, is called at render time and returns values keyed by label tuple."""
+        super().__init__(name, description, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._collect = collect
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        values = dict(self._values)
+        if self._collect is not None:
+            values.update(self._collect())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in values.items()]
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, description, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the wall-clock duration of the enclosed block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(self._key(labels), []))
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(self.label_names, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {self._sums[key]}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric, or return the already registered one with the same name."""
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, description: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, description, label_names))
+
+    def gauge(self, name: str, description: str, label_names: Tuple[str, ...] = (), collect=None) -> Gauge:
+        return self.register(Gauge(name, description, label_names, collect))
+
+    def histogram(self, name: str, description: str, label_names: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, description, label_names, buckets))
+
+    def unregister(self, name: str) -> None:
+        self._metrics.pop(name, None)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+AGENT_TASK_SECONDS = REGISTRY.histogram(
+    "marketmuse_agent_task_seconds", "Agent task latency, including cache lookups", ("agent", "task_type"))
+PROMPT_BUILD_SECONDS = REGISTRY.histogram(
+    "marketmuse_prompt_build_seconds", "Time spent rendering task prompts", ("agent", "task_type"),
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01))
+AGENT_IN_FLIGHT = REGISTRY.gauge(
+    "marketmuse_agent_in_flight", "Agent tasks currently executing", ("agent",))
+CACHE_LOOKUPS = REGISTRY.counter(
+    "marketmuse_cache_lookups_total", "Response cache lookups by result", ("agent", "result"))
+POOL_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "marketmuse_pool_queue_wait_seconds", "Time spent waiting for a free agent worker", ("agent",))
+ORCHESTRATOR_SECONDS = REGISTRY.histogram(
+    "marketmuse_orchestrator_seconds", "End-to-end orchestrator latency by operation", ("operation",))
+MODEL_BATCHES = REGISTRY.counter(
+    "marketmuse_model_batches_total", "Batched model calls by what sent them: a full batch or the end of the window",
+    ("agent", "task_type", "trigger"))
+MODEL_BATCH_FILL = REGISTRY.histogram(
+    "marketmuse_model_batch_fill_ratio", "Prompts per batched model call as a fraction of the maximum batch size",
+    ("agent", "task_type"), buckets=(0.1, 0.25, 0.5, 0.75, 0.9, 1.0))
+MODEL_BATCH_QUEUE_SECONDS = REGISTRY.histogram(
+    "marketmuse_model_batch_queue_seconds", "Time a prompt waited for its batch to be sent", ("agent", "task_type"),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1))
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "marketmuse_http_request_seconds", "HTTP request latency", ("method", "path", "status"))
+COALESCED_REQUESTS = REGISTRY.counter(
+    "marketmuse_coalesced_requests_total", "Callers served by another caller's in-flight run")
+INVALID_RESPONSES = REGISTRY.counter(
+    "marketmuse_invalid_responses_total", "Results that failed response model validation, by route", ("path",))
+PROFILED_REQUESTS = REGISTRY.counter(
+    "marketmuse_profiled_requests_total", "Requests profiled, by what selected them and whether CPU was captured",
+    ("trigger", "cpu"))
+
+
+def record_timing(name: str, seconds: float) -> None:
+    """Add a duration that ends now to the current request's timing breakdown and profile, if either is being collected."""
+    timings = request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+    spans = request_spans.get()
+    if spans is not None:
+        end = time.perf_counter()
+        spans.append((name, end - seconds, end))
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Record the duration of the enclosed block in the current request's timing breakdown."""
+    if request_timings.get() is None and request_spans.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, time.perf_counter() - start)
@@ -0,0 +1,225 @@
+import asyncio
+import json
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional, Callable
+
+import httpx
+
+from core.deadlines import cap_timeout, time_remaining
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class ModelClientError(Exception):
+    """Raised when a model call fails after all retries."""
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """Allow `rate` acquisitions per second on average, with bursts up to `capacity`."""
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class RetryPolicy:
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 8.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Exponential backoff with full jitter, never shorter than a server-provided Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class ModelClient(ABC):
+    @abstractmethod
+    async def complete(self, agent_name: str, system_prompt: str, prompt: str,
+                       task_type: Optional[str] = None) -> str:
+        """Send a prompt to the model on behalf of an agent and return the completion text."""
+        pass
+
+    async def complete_batch(self, agent_name: str, system_prompt: str, prompts: List[str],
+                             task_type: Optional[str] = None) -> List[str]:
+        """
+        Complete several prompts that share an agent and system prompt, returning one
+        completion per prompt in order. Backends with a batch endpoint override this;
+        by default the prompts are sent as concurrent single calls.
+        """
+        return list(await asyncio.gather(*[
+            self.complete(agent_name, system_prompt, prompt, task_type) for prompt in prompts
+        ]))
+
+    async def warm_up(self) -> None:
+        """Open pooled resources ahead of the first call."""
+        pass
+
+    async def aclose(self) -> None:
+        """Release any pooled resources."""
+        pass
+
+
+class HTTPModelClient(ModelClient):
+    """
+    Model client backed by one pooled httpx.AsyncClient shared by every agent.
+
+    Calls are bounded by a global and a per-agent concurrency limit, paced by an
+    optional token bucket, and retried with exponential backoff on transport
+    errors, timeouts and retryable status codes.
+    """
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, timeout: float = 30.0,
+                 max_concurrency: int = 32, per_agent_concurrency: int = 8,
+                 requests_per_second: Optional[float] = None,
+                 retry_policy: Optional[RetryPolicy] = None, max_connections: int = 64):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.per_agent_concurrency = per_agent_concurrency
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.max_connections = max_connections
+        self._global_limit = asyncio.Semaphore(max_concurrency)
+        self._agent_limits: Dict[str, asyncio.Semaphore] = {}
+        self._rate_limit = TokenBucket(requests_per_second) if requests_per_second else None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create the pooled HTTP client on first use."""
+        if self._client is None:
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections)
+            )
+        return self._client
+
+    def _agent_limit(self, agent_name: str) -> asyncio.Semaphore:
+        if agent_name not in self._agent_limits:
+            self._agent_limits[agent_name] = asyncio.Semaphore(self.per_agent_concurrency)
+        return self._agent_limits[agent_name]
+
+    async def warm_up(self) -> None:
+        self._get_client()
+
+    async def complete(self, agent_name: str, system_prompt: str, prompt: str,
+                       task_type: Optional[str] = None) -> str:
+        payload = {"agent": agent_name, "system": system_prompt, "prompt": prompt}
+        async with self._agent_limit(agent_name), self._global_limit:
+            response = await self._post_with_retries("/v1/complete", payload)
+        return response["completion"]
+
+    async def complete_batch(self, agent_name: str, system_prompt: str, prompts: List[str],
+                             task_type: Optional[str] = None) -> List[str]:
+        """Send the prompts in one call to the batch endpoint; a batch holds one concurrency slot."""
+        payload = {"agent": agent_name, "system": system_prompt, "prompts": prompts}
+        async with self._agent_limit(agent_name), self._global_limit:
+            response = await self._post_with_retries("/v1/complete/batch", payload)
+        completions = response["completions"]
+        if len(completions) != len(prompts):
+            raise ModelClientError(f"Model returned {len(completions)} completions for {len(prompts)} prompts")
+        return completions
+
+    async def _post_with_retries(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a JSON payload, retrying transient failures according to the retry policy."""
+        client = self._get_client()
+        last_error = None
+        for attempt in range(self.retry_policy.max_retries + 1):
+            if self._rate_limit is not None:
+                await self._rate_limit.acquire()
+            retry_after = None
+            try:
+                # Each attempt is cut short by the request deadline, if there is one
+                response = await client.post(path, json=payload, timeout=cap_timeout(self.timeout))
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    response.raise_for_status()
+                    return response.json()
+                last_error = ModelClientError(f"Model returned HTTP {response.status_code}")
+                retry_after = _parse_retry_after(response.headers.get("retry-after"))
+            except httpx.HTTPStatusError as e:
+                raise ModelClientError(f"Model returned HTTP {e.response.status_code}") from e
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                last_error = ModelClientError(f"Model call failed: {e!r}")
+            if attempt < self.retry_policy.max_retries:
+                delay = self.retry_policy.backoff(attempt, retry_after)
+                remaining = time_remaining()
+                if remaining is not None and delay >= remaining:
+                    # A retry could not finish before the deadline
+                    break
+                await asyncio.sleep(delay)
+        raise last_error
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class FakeModelClient(ModelClient):
+    """
+    Local stand-in for a model server, for benchmarks and load tests.
+
+    A call with n prompts takes `latency * n ** batch_exponent` seconds, so batches
+    cost sub-linearly like on a real accelerator, and at most `max_concurrency` calls
+    run at once. Completions are JSON objects built by `respond(agent_name, prompt)`.
+    """
+
+    def __init__(self, latency: float = 0.05, batch_exponent: float = 0.3, max_concurrency: int = 4,
+                 respond: Optional[Callable[[str, str], Dict[str, Any]]] = None):
+        self.latency = latency
+        self.batch_exponent = batch_exponent
+        self.respond = respond or _stub_completion
+        self._limit = asyncio.Semaphore(max_concurrency)
+        self.calls = 0
+        self.prompts = 0
+
+    async def complete(self, agent_name: str, system_prompt: str, prompt: str,
+                       task_type: Optional[str] = None) -> str:
+        return (await self.complete_batch(agent_name, system_prompt, [prompt], task_type))[0]
+
+    async def complete_batch(self, agent_name: str, system_prompt: str, prompts: List[str],
+                             task_type: Optional[str] = None) -> List[str]:
+        async with self._limit:
+            self.calls += 1
+            self.prompts += len(prompts)
+            await asyncio.sleep(self.latency * len(prompts) ** self.batch_exponent)
+        return [json.dumps(self.respond(agent_name, prompt)) for prompt in prompts]
+
+
+def _stub_completion(agent_name: str, prompt: str) -> Dict[str, Any]:
+    return {
+        "agent": agent_name,
+        "analysis": f"Stub analysis of a {len(prompt)}-character prompt",
+        "recommendations": ["Stub recommendation"]
+    }
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Read a Retry-After header given in seconds."""
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
@@ -1,22 +1,198 @@
-from typing import Dict, Any, List
+import asyncio
+import json
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
 from agents.influencer_evaluator import InfluencerEvaluator
 from agents.campaign_predictor import CampaignPredictor
 from agents.optimization_strategist import OptimizationStrategist
+from core.task_graph import TaskGraph, OK, FALLBACK
+from core.deadlines import deadline_scope
+from core.cache import ResponseCache
+from core.single_flight import SingleFlight
+from core.model_client import ModelClient
+from core.agent_pool import AgentPool
+from core.metrics import ORCHESTRATOR_SECONDS, timed
+from core.influencer_catalog import InfluencerCatalog
+from core.feature_store import DemographicFeatureStore
+from core.forecast import CampaignForecaster
+from core.budget_optimizer import BudgetOptimizer
+from core.campaign_sessions import CampaignSession, CampaignSessionStore
+from core.semantic_cache import SemanticQueryCache
+from core.audience_sketches import AudienceSketchStore
+from core.trend_store import TrendStore
+from core.query_parser import QueryParser, get_default_parser, brand_description, audience_description, duration_description
+
+# Query entities a semantic cache hit must match exactly: the numbers the forecast and the budget
+# allocation are computed from, and the platforms the shortlist is limited to
+SEMANTIC_GUARD = ("platform", "budget", "duration_weeks")
 
 class Orchestrator:
-    def __init__(self):
+    def __init__(self, node_timeout: Optional[float] = None, cache: Optional[ResponseCache] = None,
+                 model_client: Optional[ModelClient] = None, pool_size: int = 4,
+                 max_waiting: int = 64, acquire_timeout: Optional[float] = None,
+                 query_parser: Optional[QueryParser] = None, catalog: Optional[InfluencerCatalog] = None,
+                 feature_store: Optional[DemographicFeatureStore] = None,
+                 forecaster: Optional[CampaignForecaster] = None, optimizer: Optional[BudgetOptimizer] = None,
+                 sessions: Optional[CampaignSessionStore] = None, request_deadline: Optional[float] = None,
+                 hedge_after: Optional[float] = None, semantic_cache: Optional[SemanticQueryCache] = None,
+                 audience_sketches: Optional[AudienceSketchStore] = None, trend_store: Optional[TrendStore] = None):
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+        self.query_parser = query_parser if query_parser is not None else get_default_parser()
+        self.model_client = model_client
+        self.catalog = catalog
+        self.feature_store = feature_store
+        self.forecaster = forecaster or CampaignForecaster()
+        self.audience_sketches = audience_sketches
+        self.trend_store = trend_store
+        self.optimizer = optimizer or BudgetOptimizer(self.forecaster, audience_sketches=audience_sketches)
+        def agent_factories(cache: Optional[ResponseCache], model_client: Optional[ModelClient]) -> Dict[str, Any]:
+            return {
+                "influencer_evaluator": lambda: InfluencerEvaluator(cache, model_client, catalog,
+                                                                    feature_store=feature_store),
+                "campaign_predictor": lambda: CampaignPredictor(cache, model_client, self.forecaster,
+                                                                audience_sketches=audience_sketches,
+                                                                trend_store=trend_store),
+                "optimization_strategist": lambda: OptimizationStrategist(cache, model_client, self.optimizer)
+            }
+
         self.agents = {
-            "influencer_evaluator": InfluencerEvaluator(),
-            "campaign_predictor": CampaignPredictor(),
-            "optimization_strategist": OptimizationStrategist()
+            key: AgentPool(factory, pool_size, max_waiting, acquire_timeout)
+            for key, factory in agent_factories(cache, model_client).items()
         }
+        # Requests with a deadline can fall back to the agents' local responses when the model is
+        # late or failing. They are not cached, so they never stand in for a model answer later.
+        self.fallback_agents = {} if model_client is None else {
+            key: factory() for key, factory in agent_factories(None, None).items()
+        }
+        self.node_timeout = node_timeout
+        self.request_deadline = request_deadline
+        self.hedge_after = hedge_after
+        self.single_flight = SingleFlight()
+        self.sessions = sessions if sessions is not None else CampaignSessionStore()
+
+    async def start(self) -> None:
+        """Warm up the model client and every agent pool before serving traffic."""
+        if self.model_client is not None:
+            await self.model_client.warm_up()
+        await asyncio.gather(*[pool.warm_up() for pool in self.agents.values()])
 
-    async def process_campaign_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+    async def shutdown(self, drain_timeout: Optional[float] = None) -> bool:
+        """Stop admitting work and wait for in-flight agent calls. Returns False if the drain timed out."""
+        drained = await asyncio.gather(*[pool.drain(drain_timeout) for pool in self.agents.values()])
+        return all(drained)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return utilisation and queue depth for each agent pool."""
+        return {key: pool.stats() for key, pool in self.agents.items()}
+
+    async def process_campaign_request(self, request: Dict[str, Any], session_id: Optional[str] = None,
+                                       deadline: Optional[float] = None) -> Dict[str, Any]:
         """
         Process a complete campaign request by coordinating multiple agents.
+        Concurrent identical requests share a single pipeline run. With a `session_id`,
+        only the stages whose inputs changed since the session's previous request are recomputed.
+        With a `deadline` (seconds), whatever has finished by then is returned; see `_run_graph`.
+        """
+        deadline = deadline if deadline is not None else self.request_deadline
+        if session_id is not None:
+            with ORCHESTRATOR_SECONDS.time(operation="process_campaign_request"):
+                return await self._run_session_request(session_id, request, deadline)
+        key = f"campaign:{deadline}:" + json.dumps(request, sort_keys=True, default=str)
+        with ORCHESTRATOR_SECONDS.time(operation="process_campaign_request"):
+            return await self.single_flight.do(key, lambda: self._run_campaign_request(request, deadline=deadline))
+
+    async def _run_session_request(self, session_id: str, request: Dict[str, Any],
+                                   deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Re-run a campaign session's pipeline, reusing every stage whose task is unchanged."""
+        session = self.sessions.get(session_id)
+        # Iterations on one session run one at a time so each sees the previous one's stages
+        async with session.lock:
+            changed_fields = session.begin(request)
+            result = await self._run_campaign_request(request, session=session, deadline=deadline)
+            return dict(result, incremental={
+                "session_id": session_id,
+                "iteration": session.iterations,
+                "changed_fields": changed_fields,
+                "recomputed": sorted(session.recomputed),
+                "reused": sorted(session.reused)
+            })
+
+    async def process_campaign_batch(self, requests: List[Dict[str, Any]], max_concurrency: int = 8) -> List[Dict[str, Any]]:
+        """
+        Process many campaign requests with bounded concurrency.
+        Market trend analysis runs once per brand and product category and is shared by its items.
+        Returns one entry per request, in order, carrying either a result or an error.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def bounded(coro):
+            async with semaphore:
+                return await coro
+
+        groups = {}
+        for request in requests:
+            groups.setdefault(self._trend_key(request), request)
+        trend_keys = list(groups)
+        trend_outcomes = await asyncio.gather(*[
+            bounded(self.agents["campaign_predictor"].process_task(self._trend_task(groups[key])))
+            for key in trend_keys
+        ], return_exceptions=True)
+        trends = dict(zip(trend_keys, trend_outcomes))
+
+        async def run_item(request):
+            market_trends = trends[self._trend_key(request)]
+            if isinstance(market_trends, Exception):
+                raise market_trends
+            return await self._run_campaign_request(request, market_trends)
+
+        outcomes = await asyncio.gather(*[bounded(run_item(request)) for request in requests], return_exceptions=True)
+
+        items = []
+        for index, outcome in enumerate(outcomes):
+            if isinstance(outcome, Exception):
+                items.append({"index": index, "status": "error", "error": str(outcome) or type(outcome).__name__})
+            else:
+                items.append({"index": index, "status": "ok", "result": outcome})
+        return items
+
+    def _trend_key(self, request: Dict[str, Any]) -> tuple:
+        """Group key for work shared by every item of the same brand and product category."""
+        return (request.get("brand_name"), request.get("product_category"))
+
+    def _trend_task(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the market trend analysis task for a campaign request."""
+        # Market figures are optional request fields, filled from the trend store or left to the model when absent
+        return {
+            "type": "trend_analysis",
+            "product_category": request.get("product_category"),
+            "market_size": request.get("market_size"),
+            "growth_rate": request.get("growth_rate"),
+            "competitor_data": request.get("competitor_data"),
+            "seasonal_data": request.get("seasonal_data")
+        }
+
+    async def _run_campaign_request(self, request: Dict[str, Any], market_trends: Optional[Dict[str, Any]] = None,
+                                    session: Optional[CampaignSession] = None,
+                                    deadline: Optional[float] = None) -> Dict[str, Any]:
         """
+        Run the influencer -> prediction -> optimization pipeline for a campaign request,
+        with market trend analysis alongside. Pass `market_trends` to reuse a shared result,
+        `session` to reuse the session's results for stages whose task has not changed,
+        and `deadline` to return partial results (None for the stages that did not finish).
+        """
+        def agent(key: str, stage: str) -> Any:
+            return self.agents[key] if session is None else session.stage(stage, self.agents[key])
+
+        def hedge(key: str) -> Dict[str, Any]:
+            return self._hedge_options(key, deadline)
+
+        graph = TaskGraph(default_timeout=self.node_timeout)
+        if market_trends is None:
+            graph.add_node("trend_analysis", agent("campaign_predictor", "trend_analysis"), self._trend_task(request),
+                           **hedge("campaign_predictor"))
+
         # Step 1: Evaluate potential influencers
-        influencer_results = await self.agents["influencer_evaluator"].process_task({
+        graph.add_node("influencer_evaluator", agent("influencer_evaluator", "influencer_evaluator"), {
             "type": "profile_analysis",
             "name": request.get("influencer_name"),
             "platform": request.get("platform"),
@@ -24,43 +200,131 @@ class Orchestrator:
             "engagement_rate": request.get("engagement_rate"),
             "categories": request.get("categories"),
             "target_brand": request.get("brand_name")
-        })
+        }, **hedge("influencer_evaluator"))
 
-        # Step 2: Predict campaign performance
-        campaign_results = await self.agents["campaign_predictor"].process_task({
+        # Audience demographics come from the feature store, so they are only checked when one is loaded
+        check_demographics = self.feature_store is not None and bool(request.get("influencer_name"))
+        if check_demographics:
+            graph.add_node("audience_demographics", agent("influencer_evaluator", "audience_demographics"), {
+                "type": "demographic_analysis",
+                "name": request.get("influencer_name"),
+                "age_range": request.get("age_range"),
+                "gender_dist": request.get("gender_distribution"),
+                "location": request.get("location"),
+                "interests": request.get("interests"),
+                "target_audience": request.get("target_audience")
+            }, **hedge("influencer_evaluator"))
+
+        # Step 2: Predict campaign performance (needs the influencer evaluation)
+        graph.add_node("campaign_predictor", agent("campaign_predictor", "campaign_predictor"), lambda inputs: {
             "type": "performance_prediction",
             "brand_name": request.get("brand_name"),
             "category": request.get("product_category"),
             "target_audience": request.get("target_audience"),
             "duration": request.get("campaign_duration"),
             "budget": request.get("budget"),
-            "influencer_profile": influencer_results
-        })
+            "followers": request.get("followers"),
+            "engagement_rate": request.get("engagement_rate"),
+            "influencers": [candidate.get("name") for candidate in request.get("candidates") or []] or None,
+            "influencer_profile": inputs["influencer_evaluator"]
+        }, depends_on=["influencer_evaluator"], **hedge("campaign_predictor"))
 
-        # Step 3: Generate optimization recommendations
-        optimization_results = await self.agents["optimization_strategist"].process_task({
+        # Step 3: Generate optimization recommendations (needs the prediction)
+        graph.add_node("optimization_strategist", agent("optimization_strategist", "optimization_strategist"), lambda inputs: {
             "type": "campaign_optimization",
-            "current_performance": campaign_results,
+            "current_performance": inputs["campaign_predictor"],
             "target_metrics": request.get("target_metrics"),
             "budget_constraints": request.get("budget"),
-            "timeline": request.get("campaign_duration")
-        })
+            "timeline": request.get("campaign_duration"),
+            "candidates": self._campaign_candidates(request),
+            "max_channel_share": request.get("max_channel_share")
+        }, depends_on=["campaign_predictor"], **hedge("optimization_strategist"))
 
-        # Combine all results
-        return {
+        results, statuses = await self._run_graph(graph, deadline)
+        influencer_results = results.get("influencer_evaluator")
+        campaign_results = results.get("campaign_predictor")
+        optimization_results = results.get("optimization_strategist")
+        if market_trends is None:
+            market_trends = results.get("trend_analysis")
+
+        # Combine all results; stages that did not finish contribute nothing to the summary
+        with timed("summary"):
+            summary = {
+                "recommended_influencers": self._get_recommended_influencers(influencer_results)
+                if influencer_results is not None else [],
+                "expected_performance": self._summarize_performance(campaign_results or {}),
+                "key_recommendations": self._extract_key_recommendations(optimization_results or {})
+            }
+        response = {
             "influencer_evaluation": influencer_results,
             "campaign_prediction": campaign_results,
             "optimization_recommendations": optimization_results,
-            "summary": {
-                "recommended_influencers": self._get_recommended_influencers(influencer_results),
-                "expected_performance": self._summarize_performance(campaign_results),
-                "key_recommendations": self._extract_key_recommendations(optimization_results)
-            }
+            "market_trends": market_trends,
+            "summary": summary
         }
+        if check_demographics:
+            response["audience_demographics"] = results.get("audience_demographics")
+        if statuses is not None:
+            response.update(self._partial_fields(statuses))
+        return response
+
+    def _hedge_options(self, key: str, deadline: Optional[float]) -> Dict[str, Any]:
+        """TaskGraph node options that back an agent call up with its local fallback, for requests with a deadline."""
+        fallback = self.fallback_agents.get(key)
+        if deadline is None or fallback is None:
+            return {}
+        return {"fallback": fallback, "hedge_after": self.hedge_after}
+
+    async def _run_graph(self, graph: TaskGraph, deadline: Optional[float]) -> Tuple[Dict[str, Any], Optional[Dict[str, Dict[str, Any]]]]:
+        """
+        Run a graph. Without a deadline any failing node fails the request. With one, the
+        deadline caps every agent call (and model call) it starts, and the results that
+        finished in time are returned with a status per node; only when no node produced
+        a result is the first error raised.
+        """
+        if deadline is None:
+            return await graph.run(), None
+        with deadline_scope(deadline):
+            results, statuses = await graph.run_partial()
+        if not results and graph.errors:
+            raise next(iter(graph.errors.values()))
+        return results, statuses
+
+    def _partial_fields(self, statuses: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Per-agent status flags for a response built under a deadline."""
+        return {
+            "partial": any(status["status"] not in (OK, FALLBACK) for status in statuses.values()),
+            "agent_status": statuses
+        }
+
+    def _campaign_candidates(self, request: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Influencers to allocate the budget across: the request's candidates, else its named influencer."""
+        if request.get("candidates"):
+            return request["candidates"]
+        if request.get("followers"):
+            return [{
+                "name": request.get("influencer_name"),
+                "platform": request.get("platform"),
+                "followers": request.get("followers"),
+                "engagement_rate": request.get("engagement_rate")
+            }]
+        return None
 
     def _get_recommended_influencers(self, results: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract and format recommended influencers from evaluation results."""
-        # Mock implementation - in real system would process actual data
+        if "shortlist" in results:
+            # An empty shortlist means the catalog had no match, which is reported as no influencers
+            return [{
+                "name": candidate["name"],
+                "platform": candidate["platform"],
+                "score": candidate["score"],
+                "match_reasons": [
+                    f"{candidate['engagement_rate']}% engagement across {candidate['followers']:,} followers",
+                    f"Categories: {', '.join(candidate['categories']) or 'n/a'}",
+                    f"Audiences: {', '.join(candidate['audiences']) or 'n/a'}"
+                ]
+            } for candidate in results["shortlist"]]
+        # Without a catalog there is only the single evaluated profile to report
         return [{
             "name": "Sample Influencer",
             "score": results.get("score", 0),
@@ -68,20 +332,29 @@ class Orchestrator:
         }]
 
     def _summarize_performance(self, results: Dict[str, Any]) -> Dict[str, Any]:
-        """Summarize predicted campaign performance."""
+        """Summarize predicted campaign performance as numeric intervals (None when unavailable)."""
         predictions = results.get("predictions", {})
-        return {
-            "expected_reach": predictions.get("expected_reach", "N/A"),
-            "engagement_rate": predictions.get("engagement_rate", "N/A"),
-            "conversion_rate": predictions.get("conversion_rate", "N/A"),
-            "roi": predictions.get("estimated_roi", "N/A")
+        summary = {
+            "expected_reach": predictions.get("expected_reach"),
+            "engagement_rate": predictions.get("engagement_rate"),
+            "conversion_rate": predictions.get("conversion_rate"),
+            "roi": predictions.get("estimated_roi"),
+            "probability_of_profit": results.get("probability_of_profit")
         }
+        if results.get("audience_overlap"):
+            summary["unique_audience"] = results["audience_overlap"]["unique_audience"]
+        return summary
 
     def _extract_key_recommendations(self, results: Dict[str, Any]) -> List[str]:
         """Extract key recommendations from optimization results."""
         optimization_plan = results.get("optimization_plan", {})
         recommendations = []
         
+        # A budget the optimizer would not spend outweighs any content advice
+        allocation = optimization_plan.get("budget_allocation") or {}
+        if allocation.get("recommendation"):
+            recommendations.append(allocation["recommendation"])
+        
         # Add content strategy recommendations
         content_strategy = optimization_plan.get("content_strategy", [])
         recommendations.extend(content_strategy[:2])  # Take top 2 content recommendations
@@ -93,66 +366,153 @@ class Orchestrator:
             
         return recommendations
         
-    async def process_query(self, query: str) -> Dict[str, Any]:
+    async def process_query(self, query: str, deadline: Optional[float] = None) -> Dict[str, Any]:
         """
         Process a natural language query by coordinating multiple agents.
+        Concurrent queries that normalize to the same text share a single pipeline run.
+        With a `deadline` (seconds), the agents that answered in time are returned; see `_run_graph`.
         """
-        # Decompose the query into subtasks for different agents
-        # In a real implementation, this would use NLP to extract entities and intent
-        query_lower = query.lower()
-        
-        # Identify brand and product category
-        brand_info = "sustainable skincare brand" if "skincare" in query_lower else "brand"
-        
-        # Identify target audience
-        target_audience = "Gen Z" if "gen z" in query_lower else "general audience"
+        deadline = deadline if deadline is not None else self.request_deadline
+        key = f"query:{deadline}:" + " ".join(query.lower().split())
+        with ORCHESTRATOR_SECONDS.time(operation="process_query"):
+            if self.semantic_cache is not None:
+                with timed("semantic_cache"):
+                    result = self.semantic_cache.get(*self._semantic_key(query))
+                if result is not None:
+                    return self._with_query(result, query)
+            result = await self.single_flight.do(key, lambda: self._run_query(query, deadline))
+        return result if result["query"] == query else self._with_query(result, query)
+
+    @staticmethod
+    def _with_query(result: Dict[str, Any], query: str) -> Dict[str, Any]:
+        """A query result answered for another wording (a paraphrase or a coalesced caller), restated for `query`."""
+        return dict(result, query=query, agent_responses={
+            key: dict(response, query=query) for key, response in result.get("agent_responses", {}).items()
+        })
+
+    def _semantic_key(self, query: str) -> Tuple[str, str, List[str]]:
+        """
+        Text, guard and keywords for the semantic cache. Vocabulary terms are replaced by
+        their canonical values so synonyms embed alike. The guard holds only the SEMANTIC_GUARD
+        entities, which a result must not be reused across however alike the wording. Category,
+        value, audience and intent are weighted keywords in the embedding instead, so the
+        similarity threshold decides whether a query that reorders, adds or swaps one of them
+        is still the same question: an exact match on every entity would make the vector index
+        no better than a dict keyed on the parse.
+        """
+        entities = self.query_parser.parse(query)
+        keywords = [f"{entity_type}:{value}" for entity_type, values in entities.items()
+                    if isinstance(values, list) for value in values]
+        guard = {entity_type: sorted(entities[entity_type]) if isinstance(entities[entity_type], list)
+                 else entities[entity_type] for entity_type in SEMANTIC_GUARD}
+        return self.query_parser.canonical_text(query), json.dumps(guard, sort_keys=True), keywords
+
+    async def _run_query(self, query: str, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Decompose a query into agent subtasks and run them."""
+        results, statuses = await self._run_graph(self._build_query_graph(query, deadline), deadline)
+        response = {
+            "query": query,
+            "agent_responses": {
+                key: self._agent_response(key, query, result)
+                for key, result in results.items()
+            },
+            "summary": self._query_summary(results)
+        }
+        # Only complete answers from the primary agents are worth serving to paraphrases
+        if self.semantic_cache is not None and all(status["status"] == OK for status in (statuses or {}).values()):
+            text, guard, keywords = self._semantic_key(query)
+            self.semantic_cache.set(text, guard, response, keywords)
+        if statuses is not None:
+            response.update(self._partial_fields(statuses))
+        return response
+
+    async def stream_query(self, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a natural language query, yielding each agent's response as soon as it completes
+        and finishing with the consolidated summary.
+        """
+        results = {}
+        async for key, result in self._build_query_graph(query).run_iter():
+            results[key] = result
+            yield {"event": "agent_response", "agent_key": key, "data": self._agent_response(key, query, result)}
+        yield {"event": "summary", "data": {"query": query, "summary": self._query_summary(results)}}
+
+    def _build_query_graph(self, query: str, deadline: Optional[float] = None) -> TaskGraph:
+        """Decompose a query into one independent subtask per agent."""
+        # Extract entities and intent from the query
+        entities = self.query_parser.parse(query)
+        brand_info = brand_description(entities)
+        target_audience = audience_description(entities)
+        duration = duration_description(entities)
         
         # Create subtasks for each agent
+        # Fields the query does not mention are passed as None and rendered as "not specified"
         influencer_task = {
             "type": "profile_analysis",
-            "task": f"Identify optimal influencers for {brand_info} targeting {target_audience} audiences"
+            "task": f"Identify optimal influencers for {brand_info} targeting {target_audience} audiences",
+            "name": None,
+            "platform": ", ".join(entities["platform"]) or None,
+            "followers": None,
+            "engagement_rate": None,
+            "categories": entities["category"] or None,
+            "target_brand": brand_info,
+            "audiences": entities["audience"],
+            "platforms": entities["platform"]
         }
         
         campaign_task = {
             "type": "performance_prediction",
-            "task": f"Predict campaign outcomes for {brand_info} targeting {target_audience} audiences"
+            "task": f"Predict campaign outcomes for {brand_info} targeting {target_audience} audiences",
+            "brand_name": brand_info,
+            "category": entities["category"][0] if entities["category"] else None,
+            "target_audience": target_audience,
+            "duration": duration,
+            "budget": entities["budget"],
+            "influencer_profile": None
         }
         
         optimization_task = {
             "type": "campaign_optimization",
-            "task": f"Recommend optimization strategies for {brand_info} campaign targeting {target_audience} audiences"
-        }
-        
-        # Process each subtask with the appropriate agent
-        influencer_results = await self.agents["influencer_evaluator"].process_task(influencer_task)
-        campaign_results = await self.agents["campaign_predictor"].process_task(campaign_task)
-        optimization_results = await self.agents["optimization_strategist"].process_task(optimization_task)
-        
-        # Generate a consolidated summary
-        summary = {
-            "top_influencers": self._get_recommended_influencers(influencer_results),
-            "expected_performance": self._summarize_performance(campaign_results),
-            "key_recommendations": self._extract_key_recommendations(optimization_results)
+            "task": f"Recommend optimization strategies for {brand_info} campaign targeting {target_audience} audiences",
+            "current_performance": None,
+            "target_metrics": None,
+            "budget_constraints": entities["budget"],
+            "timeline": duration
         }
         
+        # The subtasks are independent, so all three agents run concurrently, except that a
+        # budgeted query with a catalog allocates the budget across the evaluator's shortlist
+        graph = TaskGraph(default_timeout=self.node_timeout)
+        graph.add_node("influencer_evaluator", self.agents["influencer_evaluator"], influencer_task,
+                       **self._hedge_options("influencer_evaluator", deadline))
+        graph.add_node("campaign_predictor", self.agents["campaign_predictor"], campaign_task,
+                       **self._hedge_options("campaign_predictor", deadline))
+        optimizer_hedge = self._hedge_options("optimization_strategist", deadline)
+        if self.catalog is not None and entities["budget"]:
+            graph.add_node("optimization_strategist", self.agents["optimization_strategist"], lambda inputs: dict(
+                optimization_task, candidates=inputs["influencer_evaluator"].get("shortlist")
+            ), depends_on=["influencer_evaluator"], **optimizer_hedge)
+        else:
+            graph.add_node("optimization_strategist", self.agents["optimization_strategist"], optimization_task,
+                           **optimizer_hedge)
+        return graph
+
+    def _agent_response(self, key: str, query: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Wrap an agent's result in the response envelope the frontend renders."""
         return {
+            "agent": self.agents[key].name,
             "query": query,
-            "agent_responses": {
-                "influencer_evaluator": {
-                    "agent": "InfluencerEvaluator",
-                    "query": query,
-                    "response": influencer_results
-                },
-                "campaign_predictor": {
-                    "agent": "CampaignPredictor",
-                    "query": query,
-                    "response": campaign_results
-                },
-                "optimization_strategist": {
-                    "agent": "OptimizationStrategist",
-                    "query": query,
-                    "response": optimization_results
-                }
-            },
-            "summary": summary
-        } 
\ No newline at end of file
+            "response": result
+        }
+
+    def _query_summary(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate a consolidated summary from the agent results of a query."""
+        # Agents missing from a partial result contribute nothing to the summary
+        with timed("summary"):
+            influencer_results = results.get("influencer_evaluator")
+            return {
+                "top_influencers": self._get_recommended_influencers(influencer_results)
+                if influencer_results is not None else [],
+                "expected_performance": self._summarize_performance(results.get("campaign_predictor", {})),
+                "key_recommendations": self._extract_key_recommendations(results.get("optimization_strategist", {}))
+            }
@@ -0,0 +1,260 @@
+"""
+Opt-in profiling of single API requests.
+
+A profiled request records two views of its pass through the API and the
+orchestrator:
+
+- wall-clock spans: every duration reported through core.metrics.record_timing
+  or timed (prompt building, agent tasks, pool and batch waits, summary
+  building, serialization) with its start and end, so time spent awaiting the
+  model shows up next to time spent computing;
+- CPU: a cProfile of the event loop thread for the length of the request.
+
+The spans belong to the request alone. cProfile sees everything the thread
+runs, so a CPU profile taken while other requests are in flight includes
+their work too. Only one request per process is CPU-profiled at a time; others
+selected meanwhile get spans only.
+
+Each profile is written as <id>.prof (pstats, for pstats.Stats, snakeviz or
+gprof2dot) and <id>.speedscope.json (https://www.speedscope.app), and the
+newest `keep` profiles are kept. Requests that are not profiled pay one
+context variable lookup per recorded timing.
+"""
+import asyncio
+import cProfile
+import os
+import random
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
+
+import orjson
+
+from core.metrics import PROFILED_REQUESTS, request_spans
+
+# Artifact format name -> file suffix
+FORMATS = {"pstats": ".prof", "speedscope": ".speedscope.json"}
+
+Span = Tuple[str, float, float]
+
+
+class RequestProfile:
+    """Spans and, when it holds the CPU profiler, a cProfile of one request."""
+
+    def __init__(self, label: str, trigger: str, cpu: bool):
+        self.profile_id = uuid.uuid4().hex
+        self.label = label
+        self.trigger = trigger
+        self.created_at = time.time()
+        self.spans: List[Span] = []
+        self.cpu = cProfile.Profile() if cpu else None
+        self.status: Optional[int] = None
+        self.started = self.finished = 0.0
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        if self.cpu is not None:
+            try:
+                self.cpu.enable()
+            except ValueError:
+                # Another profiler (a debugger, or py-spy in-process) already owns the hook
+                self.cpu = None
+
+    def stop(self) -> None:
+        if self.cpu is not None:
+            self.cpu.disable()
+        self.finished = time.perf_counter()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "profile_id": self.profile_id,
+            "label": self.label,
+            "trigger": self.trigger,
+            "status": self.status,
+            "created_at": self.created_at,
+            "duration_ms": round((self.finished - self.started) * 1000, 3),
+            "spans": len(self.spans),
+            "formats": [name for name in FORMATS if name != "pstats" or self.cpu is not None]
+        }
+
+    def speedscope(self) -> Dict[str, Any]:
+        """
+        The profile in speedscope's file format: one evented profile per lane of
+        properly nested wall-clock spans (concurrent agent tasks overlap, so they
+        land in separate lanes), plus the CPU self time by function and caller.
+        """
+        frames: List[Dict[str, Any]] = []
+        frame_ids: Dict[Any, int] = {}
+
+        def frame(key: Any, name: str, file: Optional[str] = None, line: Optional[int] = None) -> int:
+            if key not in frame_ids:
+                frame_ids[key] = len(frames)
+                frames.append({"name": name, **({"file": file, "line": line} if file else {})})
+            return frame_ids[key]
+
+        duration = (self.finished - self.started) * 1000
+        spans = [(self.label, self.started, self.finished)] + [
+            (name, max(start, self.started), min(end, self.finished)) for name, start, end in self.spans
+        ]
+        profiles = []
+        for number, lane in enumerate(_lanes([span for span in spans if span[2] >= span[1]])):
+            events: List[Dict[str, Any]] = []
+            open_spans: List[Tuple[float, int]] = []
+            for name, start, end in lane:
+                while open_spans and open_spans[-1][0] <= start:
+                    closed_at, closed = open_spans.pop()
+                    events.append({"type": "C", "frame": closed, "at": (closed_at - self.started) * 1000})
+                opened = frame(("span", name), name)
+                events.append({"type": "O", "frame": opened, "at": (start - self.started) * 1000})
+                open_spans.append((end, opened))
+            while open_spans:
+                closed_at, closed = open_spans.pop()
+                events.append({"type": "C", "frame": closed, "at": (closed_at - self.started) * 1000})
+            profiles.append({
+                "type": "evented", "name": "Wall clock" if number == 0 else f"Wall clock, overlapping spans {number}",
+                "unit": "milliseconds", "startValue": 0, "endValue": duration, "events": events
+            })
+
+        if self.cpu is not None:
+            self.cpu.create_stats()
+            samples, weights = [], []
+
+            def cpu_frame(function: Tuple[str, int, str]) -> int:
+                file, line, name = function
+                return frame(("cpu",) + function, name, None if file == "~" else file, line)
+
+            for function, (_, _, own, _, callers) in self.cpu.stats.items():
+                if not callers:
+                    # The frame profiling started in has no recorded caller
+                    samples.append([cpu_frame(function)])
+                    weights.append(own * 1000)
+                # Each caller entry holds the function's own time when called from there
+                for caller, (_, _, caller_own, _) in callers.items():
+                    samples.append([cpu_frame(caller), cpu_frame(function)])
+                    weights.append(caller_own * 1000)
+            profiles.append({
+                "type": "sampled", "name": "CPU self time by caller", "unit": "milliseconds",
+                "startValue": 0, "endValue": sum(weights), "samples": samples, "weights": weights
+            })
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.label,
+            "exporter": "marketmuse",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles
+        }
+
+
+def _lanes(spans: List[Span]) -> List[List[Span]]:
+    """Split spans into lanes in which every two spans are either disjoint or nested, earliest lane first."""
+    lanes: List[List[Span]] = []
+    open_ends: List[List[float]] = []
+    for span in sorted(spans, key=lambda span: (span[1], -span[2])):
+        _, start, end = span
+        for lane, ends in zip(lanes, open_ends):
+            while ends and ends[-1] <= start:
+                ends.pop()
+            if not ends or end <= ends[-1]:
+                break
+        else:
+            lane, ends = [], []
+            lanes.append(lane)
+            open_ends.append(ends)
+        lane.append(span)
+        ends.append(end)
+    return lanes
+
+
+class RequestProfiler:
+    """
+    Selects requests for profiling and keeps their artifacts.
+
+    A request is profiled when it asks to be and `allow_header` is on, or at
+    random with probability `sample_rate`. Both can be changed at runtime.
+    Callers decide who may ask; the API only lets admin requests do so.
+    """
+
+    def __init__(self, directory: Optional[str] = None, sample_rate: float = 0.0, allow_header: bool = False,
+                 keep: int = 50):
+        # Without a directory, a temporary one is created when the first profile is written
+        self.directory = directory
+        self.sample_rate = 0.0
+        self.allow_header = allow_header
+        self.keep = keep
+        self.configure(sample_rate=sample_rate)
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cpu_busy = False
+
+    def configure(self, sample_rate: Optional[float] = None, allow_header: Optional[bool] = None) -> Dict[str, Any]:
+        """Change the sampling rate and whether the request header is honoured; returns the settings."""
+        if sample_rate is not None:
+            if not 0.0 <= sample_rate <= 1.0:
+                raise ValueError("Sample rate must be between 0 and 1")
+            self.sample_rate = sample_rate
+        if allow_header is not None:
+            self.allow_header = allow_header
+        return {"sample_rate": self.sample_rate, "allow_header": self.allow_header}
+
+    def select(self, requested: bool) -> Optional[str]:
+        """What selects this request for profiling ("header" or "sampled"), or None to leave it alone."""
+        if requested and self.allow_header:
+            return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    @asynccontextmanager
+    async def profile(self, label: str, trigger: str) -> AsyncIterator[RequestProfile]:
+        """Profile the enclosed block as one request, then write its artifacts."""
+        cpu = not self._cpu_busy
+        self._cpu_busy = True
+        profile = RequestProfile(label, trigger, cpu)
+        token = request_spans.set(profile.spans)
+        profile.start()
+        try:
+            yield profile
+        finally:
+            profile.stop()
+            request_spans.reset(token)
+            if cpu:
+                self._cpu_busy = False
+            PROFILED_REQUESTS.inc(trigger=trigger, cpu=str(profile.cpu is not None).lower())
+            if self.directory is None:
+                self.directory = tempfile.mkdtemp(prefix="marketmuse-profiles-")
+            # Building the speedscope file walks every profiled function; keep it off the event loop
+            await asyncio.to_thread(self._write, profile)
+            self._profiles[profile.profile_id] = profile.describe()
+            while len(self._profiles) > self.keep:
+                expired, _ = self._profiles.popitem(last=False)
+                self._remove(expired)
+
+    def _write(self, profile: RequestProfile) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, profile.profile_id)
+        with open(base + FORMATS["speedscope"], "wb") as f:
+            f.write(orjson.dumps(profile.speedscope()))
+        if profile.cpu is not None:
+            profile.cpu.dump_stats(base + FORMATS["pstats"])
+
+    def _remove(self, profile_id: str) -> None:
+        for suffix in FORMATS.values():
+            try:
+                os.remove(os.path.join(self.directory, profile_id + suffix))
+            except FileNotFoundError:
+                pass
+
+    def profiles(self) -> List[Dict[str, Any]]:
+        """Kept profiles, newest first."""
+        return list(reversed(self._profiles.values()))
+
+    def artifact(self, profile_id: str, fmt: str) -> Optional[str]:
+        """Path of a kept profile's artifact in `fmt`, or None if there is no such profile or format."""
+        described = self._profiles.get(profile_id)
+        if described is None or fmt not in described["formats"]:
+            return None
+        return os.path.join(self.directory, profile_id + FORMATS[fmt])
@@ -0,0 +1,73 @@
+import json
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, Any, List, Tuple, Optional
+
+DEFAULT_MAX_FIELD_CHARS = 2000
+TRUNCATION_MARKER = "...(truncated)"
+
+
+class PromptValidationError(ValueError):
+    """Raised when a task is missing fields its prompt template needs."""
+    pass
+
+
+def serialize_value(value: Any, max_chars: int = DEFAULT_MAX_FIELD_CHARS) -> str:
+    """
+    Render a field value for a prompt. Nested structures become compact JSON with
+    sorted keys so the same input always produces the same prompt text.
+    """
+    if value is None:
+        text = "not specified"
+    elif isinstance(value, str):
+        text = value
+    elif isinstance(value, (dict, list, tuple)):
+        text = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    else:
+        text = str(value)
+    if len(text) > max_chars:
+        text = text[:max_chars - len(TRUNCATION_MARKER)] + TRUNCATION_MARKER
+    return text
+
+
+class PromptTemplate:
+    """A str.format-style template parsed once into literal and field segments."""
+
+    def __init__(self, template: str, max_field_chars: int = DEFAULT_MAX_FIELD_CHARS):
+        self.template = template
+        self.max_field_chars = max_field_chars
+        self._segments: List[Tuple[str, Optional[str], str]] = []
+        for literal, field_name, format_spec, conversion in Formatter().parse(template):
+            if field_name is not None:
+                if not field_name.isidentifier():
+                    raise ValueError(f"Unsupported template field: {{{field_name}}}")
+                if conversion:
+                    raise ValueError(f"Conversions are not supported in prompt templates: {{{field_name}!{conversion}}}")
+            self._segments.append((literal, field_name, format_spec or ""))
+        self.fields = frozenset(name for _, name, _ in self._segments if name is not None)
+
+    def missing_fields(self, values: Dict[str, Any]) -> List[str]:
+        """Return the template fields that `values` does not provide, in sorted order."""
+        return sorted(self.fields.difference(values))
+
+    def render(self, values: Dict[str, Any]) -> str:
+        """Fill the template, raising PromptValidationError if any field is missing."""
+        missing = self.missing_fields(values)
+        if missing:
+            raise PromptValidationError(f"Missing prompt fields: {', '.join(missing)}")
+        parts = []
+        for literal, field_name, format_spec in self._segments:
+            parts.append(literal)
+            if field_name is not None:
+                value = values[field_name]
+                if format_spec and isinstance(value, (int, float)):
+                    parts.append(format(value, format_spec))
+                else:
+                    parts.append(serialize_value(value, self.max_field_chars))
+        return "".join(parts)
+
+
+@lru_cache(maxsize=256)
+def compile_template(template: str) -> PromptTemplate:
+    """Return the compiled form of a template, parsing each distinct template only once."""
+    return PromptTemplate(template)
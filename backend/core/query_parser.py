@@ -0,0 +1,175 @@
+import json
+import os
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+DEFAULT_VOCABULARY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                       "data", "query_vocabulary.json")
+
+BUDGET_PATTERN = re.compile(
+    r"(?:\$\s?(?P<dollars>\d[\d,]*(?:\.\d+)?)\s*(?P<dollar_scale>k|m|thousand|million)?\b"
+    r"|\b(?P<amount>\d[\d,]*(?:\.\d+)?)\s*(?P<amount_scale>k|m|thousand|million)?\s*(?:usd|dollars)\b"
+    r"|\bbudget\s+(?:of\s+)?(?P<budget>\d[\d,]*(?:\.\d+)?)\s*(?P<budget_scale>k|m|thousand|million)?\b)"
+)
+DURATION_PATTERN = re.compile(r"\b(?P<count>\d+(?:\.\d+)?)[\s-]*(?P<unit>day|week|month|year)s?\b")
+
+SCALES = {None: 1, "k": 1_000, "thousand": 1_000, "m": 1_000_000, "million": 1_000_000}
+WEEKS_PER_UNIT = {"day": 1 / 7, "week": 1, "month": 52 / 12, "year": 52}
+
+
+class AhoCorasick:
+    """Multi-pattern matcher; scans text in time linear in its length regardless of pattern count."""
+
+    def __init__(self, patterns: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self.patterns = patterns
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        # Breadth-first, so a state's failure target is always finalised before its children's
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, int]]:
+        """Return (start, end, pattern index) for every occurrence, including overlapping ones."""
+        matches = []
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                matches.append((position + 1 - len(self.patterns[index]), position + 1, index))
+        return matches
+
+
+class QueryParser:
+    """
+    Extracts entities and intents from a free-text marketing query.
+
+    The vocabulary maps entity types (category, audience, platform, ...) to
+    {surface term: canonical value}. All terms are compiled once into a single
+    Aho-Corasick automaton; budgets and durations are read with regexes.
+    """
+
+    def __init__(self, vocabulary: Dict[str, Dict[str, str]]):
+        self.entity_types = list(vocabulary)
+        terms: Dict[str, List[Tuple[str, str]]] = {}
+        for entity_type, entries in vocabulary.items():
+            for surface, canonical in entries.items():
+                terms.setdefault(self._normalize(surface), []).append((entity_type, canonical))
+        self._terms = list(terms)
+        self._meanings = [terms[term] for term in self._terms]
+        self._matcher = AhoCorasick(self._terms)
+
+    @classmethod
+    def from_file(cls, path: str) -> "QueryParser":
+        with open(path) as vocabulary_file:
+            return cls(json.load(vocabulary_file))
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def parse(self, query: str) -> Dict[str, Any]:
+        """Return canonical entities per type (in order of appearance), plus budget and duration."""
+        text = self._normalize(query)
+        entities: Dict[str, List[str]] = {entity_type: [] for entity_type in self.entity_types}
+        for start, end, index in self._select_matches(text):
+            for entity_type, canonical in self._meanings[index]:
+                if canonical not in entities[entity_type]:
+                    entities[entity_type].append(canonical)
+        entities["budget"] = self._parse_budget(text)
+        entities["duration_weeks"] = self._parse_duration(text)
+        return entities
+
+    def canonical_text(self, query: str) -> str:
+        """The normalized query with every vocabulary term replaced by its canonical value(s)."""
+        text = self._normalize(query)
+        parts = []
+        position = 0
+        for start, end, index in self._select_matches(text):
+            parts.append(text[position:start])
+            parts.append(" ".join(canonical.lower().replace(" ", "_") for _, canonical in self._meanings[index]))
+            position = end
+        parts.append(text[position:])
+        return "".join(parts)
+
+    def _select_matches(self, text: str) -> List[Tuple[int, int, int]]:
+        """Keep whole-word matches, preferring the longest at each position and dropping overlaps."""
+        candidates = [
+            match for match in self._matcher.find_all(text)
+            if (match[0] == 0 or not text[match[0] - 1].isalnum())
+            and (match[1] == len(text) or not text[match[1]].isalnum())
+        ]
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+        selected = []
+        covered_until = 0
+        for match in candidates:
+            if match[0] >= covered_until:
+                selected.append(match)
+                covered_until = match[1]
+        return selected
+
+    def _parse_budget(self, text: str) -> Optional[float]:
+        match = BUDGET_PATTERN.search(text)
+        if match is None:
+            return None
+        for amount_group, scale_group in (("dollars", "dollar_scale"), ("amount", "amount_scale"), ("budget", "budget_scale")):
+            if match.group(amount_group):
+                return float(match.group(amount_group).replace(",", "")) * SCALES[match.group(scale_group)]
+        return None
+
+    def _parse_duration(self, text: str) -> Optional[float]:
+        match = DURATION_PATTERN.search(text)
+        if match is None:
+            return None
+        return round(float(match.group("count")) * WEEKS_PER_UNIT[match.group("unit")], 2)
+
+
+def brand_description(entities: Dict[str, Any]) -> str:
+    """Describe the brand from extracted values and category, e.g. "sustainable skincare brand"."""
+    words = entities.get("value", [])[:2] + entities.get("category", [])[:1]
+    return " ".join(words + ["brand"])
+
+
+def audience_description(entities: Dict[str, Any]) -> str:
+    """Describe the target audience, falling back to "general audience"."""
+    audiences = entities.get("audience", [])
+    return " and ".join(audiences) if audiences else "general audience"
+
+
+def duration_description(entities: Dict[str, Any]) -> Optional[str]:
+    weeks = entities.get("duration_weeks")
+    return f"{weeks:g} weeks" if weeks is not None else None
+
+
+@lru_cache(maxsize=1)
+def get_default_parser() -> QueryParser:
+    """Build the parser from MARKETMUSE_VOCABULARY_PATH (or the bundled vocabulary) once per process."""
+    return QueryParser.from_file(os.getenv("MARKETMUSE_VOCABULARY_PATH", DEFAULT_VOCABULARY_PATH))
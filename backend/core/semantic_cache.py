@@ -0,0 +1,336 @@
+"""
+Semantic cache for paraphrased queries.
+
+Queries are embedded offline with a hashed n-gram vectorizer (word and character
+n-grams plus any canonical keywords the caller supplies, hashed into a fixed
+number of signed buckets) and stored in an inverted-file (IVF) index: vectors are
+grouped under their nearest k-means centroid, and a lookup only scores the
+entries of the `nprobe` lists whose centroids are closest to the query.
+
+Every entry also carries a guard string. A neighbour is only served when its
+guard equals the query's, so a paraphrase can reuse a result but a query that
+differs in a hard constraint (a budget, a platform) cannot, however similar its
+wording. Everything left out of the guard is judged by similarity alone, so the
+guard should hold no more than those constraints.
+"""
+import copy
+import re
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9$_]+(?:[.,][0-9]+)*")
+
+# Function words and filler that do not change what a marketing query asks for
+DEFAULT_STOPWORDS = frozenset(
+    "a an the and or of for to in on at by with about from into me us our my i we you "
+    "find show get give list recommend suggest best top good great some any who which what that "
+    "aimed targeting target targeted focused please".split()
+)
+
+
+class HashedNgramEmbedder:
+    """Embeds text as an L2-normalized vector of signed, hashed word and character n-gram counts."""
+
+    def __init__(self, dim: int = 256, char_ngrams: Sequence[int] = (3, 4, 5), keyword_weight: float = 3.0,
+                 stopwords: Optional[frozenset] = None):
+        self.dim = dim
+        self.char_ngrams = tuple(char_ngrams)
+        self.keyword_weight = keyword_weight
+        self.stopwords = DEFAULT_STOPWORDS if stopwords is None else stopwords
+
+    def features(self, text: str) -> List[str]:
+        """Words, word bigrams and character n-grams of each word (with boundary markers), skipping stopwords."""
+        words = [word for word in _TOKEN.findall(text.lower()) if word not in self.stopwords]
+        features = [f"w:{word}" for word in words]
+        features.extend(f"b:{first} {second}" for first, second in zip(words, words[1:]))
+        for word in words:
+            padded = f" {word} "
+            for size in self.char_ngrams:
+                features.extend(padded[start:start + size] for start in range(len(padded) - size + 1))
+        return features
+
+    def embed(self, text: str, keywords: Sequence[str] = ()) -> np.ndarray:
+        """Embed `text`; `keywords` (e.g. canonical entities) are added as whole features with extra weight."""
+        features = self.features(text)
+        hashes = np.fromiter((zlib.crc32(feature.encode("utf-8")) for feature in features), dtype=np.int64,
+                             count=len(features))
+        weights = np.ones(len(features), dtype=np.float64)
+        if keywords:
+            keyword_hashes = np.fromiter((zlib.crc32(f"k:{keyword}".encode("utf-8")) for keyword in keywords),
+                                         dtype=np.int64, count=len(keywords))
+            hashes = np.concatenate([hashes, keyword_hashes])
+            weights = np.concatenate([weights, np.full(len(keywords), self.keyword_weight)])
+        # The top hash bit picks the sign, so collisions cancel out on average instead of piling up
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+        vector = np.bincount(hashes % self.dim, weights=weights * signs, minlength=self.dim).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+
+class IVFIndex:
+    """
+    Approximate nearest-neighbour index over unit vectors (cosine similarity) with a fixed capacity.
+
+    Vectors are scalar-quantized to int8 with one float32 scale each, in preallocated
+    arrays, so memory is bounded by about `capacity * (dim + 12)` bytes plus the
+    inverted lists; int8 codes also widen to float32 far faster than float16 when a
+    lookup scores its candidates. Until `train_size` vectors
+    have been added every entry sits in a single list (exact search); the centroids
+    are then trained once with k-means on the vectors present and entries are assigned
+    to their nearest centroid from then on.
+    """
+
+    def __init__(self, dim: int, capacity: int, nlist: Optional[int] = None, nprobe: int = 8,
+                 train_size: Optional[int] = None, kmeans_iterations: int = 8, seed: int = 0):
+        self.dim = dim
+        self.capacity = capacity
+        self.nlist = nlist or max(1, int(np.sqrt(capacity)))
+        self.nprobe = min(nprobe, self.nlist)
+        self.train_size = min(train_size or self.nlist * 8, capacity)
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+        self.codes = np.zeros((capacity, dim), dtype=np.int8)
+        self.scales = np.zeros(capacity, dtype=np.float32)
+        self.list_of = np.full(capacity, -1, dtype=np.int32)
+        self.position = np.zeros(capacity, dtype=np.int32)
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = [np.empty(16, dtype=np.int32)]
+        self._sizes = np.zeros(1, dtype=np.int64)
+        self._next_slot = 0
+        self._free: List[int] = []
+        self.size = 0
+
+    def add(self, vector: np.ndarray) -> int:
+        """Store a vector and return its slot."""
+        if self._free:
+            slot = self._free.pop()
+        elif self._next_slot < self.capacity:
+            slot = self._next_slot
+            self._next_slot += 1
+        else:
+            raise ValueError("IVF index is full")
+        self._store(np.array([slot]), vector[None, :])
+        self._append(self._assign(vector[None, :])[0], slot)
+        self.size += 1
+        if self.centroids is None and self.size >= self.train_size and self.nlist > 1:
+            self.train()
+        return slot
+
+    def add_many(self, vectors: np.ndarray) -> np.ndarray:
+        """Store a batch of vectors in unused slots and return their slots."""
+        count = len(vectors)
+        if self._next_slot + count > self.capacity:
+            raise ValueError("IVF index is full")
+        slots = np.arange(self._next_slot, self._next_slot + count, dtype=np.int32)
+        self._next_slot += count
+        self._store(slots, vectors)
+        self.size += count
+        self._extend(self._assign(vectors), slots)
+        if self.centroids is None and self.size >= self.train_size and self.nlist > 1:
+            self.train()
+        return slots
+
+    def remove(self, slot: int) -> None:
+        """Drop the vector in `slot` and make the slot reusable."""
+        list_id = self.list_of[slot]
+        if list_id < 0:
+            return
+        members = self._lists[list_id]
+        last = self._sizes[list_id] - 1
+        moved = members[last]
+        members[self.position[slot]] = moved
+        self.position[moved] = self.position[slot]
+        self._sizes[list_id] = last
+        self.list_of[slot] = -1
+        self._free.append(slot)
+        self.size -= 1
+
+    def search(self, vector: np.ndarray, k: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+        """Return up to `k` (slots, similarities) of the nearest stored vectors, most similar first."""
+        if self.centroids is None:
+            probe = [0]
+        else:
+            scores = self.centroids @ vector
+            probe = np.argpartition(-scores, self.nprobe - 1)[:self.nprobe] if self.nprobe < self.nlist else range(self.nlist)
+        candidates = np.concatenate([self._lists[list_id][:self._sizes[list_id]] for list_id in probe])
+        if len(candidates) == 0:
+            return candidates, np.empty(0, dtype=np.float32)
+        similarities = (self.codes[candidates].astype(np.float32) @ vector) * self.scales[candidates]
+        if len(candidates) > k:
+            best = np.argpartition(-similarities, k - 1)[:k]
+            candidates, similarities = candidates[best], similarities[best]
+        order = np.argsort(-similarities)
+        return candidates[order], similarities[order]
+
+    def train(self) -> None:
+        """Fit the centroids with k-means on the stored vectors and rebuild the inverted lists."""
+        slots = self._stored_slots()
+        rng = np.random.default_rng(self.seed)
+        sample = slots if len(slots) <= self.nlist * 64 else rng.choice(slots, self.nlist * 64, replace=False)
+        data = self.decode(sample)
+        centroids = data[rng.choice(len(data), self.nlist, replace=len(data) < self.nlist)].copy()
+        for _ in range(self.kmeans_iterations):
+            assignment = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, data)
+            counts = np.bincount(assignment, minlength=self.nlist)
+            # Empty clusters keep their previous centroid
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            centroids /= np.where(norms > 0, norms, 1)
+        self.centroids = centroids
+        self._lists = [np.empty(16, dtype=np.int32) for _ in range(self.nlist)]
+        self._sizes = np.zeros(self.nlist, dtype=np.int64)
+        for start in range(0, len(slots), 65536):
+            batch = slots[start:start + 65536]
+            self._extend(self._assign(self.decode(batch)), batch)
+
+    def decode(self, slots: np.ndarray) -> np.ndarray:
+        """The stored (quantized) vectors in `slots`, as float32."""
+        return self.codes[slots].astype(np.float32) * self.scales[slots, None]
+
+    @property
+    def nbytes(self) -> int:
+        lists = sum(members.nbytes for members in self._lists)
+        centroids = self.centroids.nbytes if self.centroids is not None else 0
+        return (self.codes.nbytes + self.scales.nbytes + self.list_of.nbytes + self.position.nbytes
+                + lists + centroids)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "capacity": self.capacity,
+            "trained": self.centroids is not None,
+            "nlist": self.nlist if self.centroids is not None else 1,
+            "nprobe": self.nprobe,
+            "bytes": self.nbytes
+        }
+
+    def _store(self, slots: np.ndarray, vectors: np.ndarray) -> None:
+        peaks = np.abs(vectors).max(axis=1)
+        scales = np.where(peaks > 0, peaks / 127, 1.0).astype(np.float32)
+        self.codes[slots] = np.rint(vectors / scales[:, None]).astype(np.int8)
+        self.scales[slots] = scales
+
+    def _stored_slots(self) -> np.ndarray:
+        return np.concatenate([members[:size] for members, size in zip(self._lists, self._sizes)])
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        if self.centroids is None:
+            return np.zeros(len(vectors), dtype=np.int64)
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def _append(self, list_id: int, slot: int) -> None:
+        self._extend(np.array([list_id]), np.array([slot], dtype=np.int32))
+
+    def _extend(self, list_ids: np.ndarray, slots: np.ndarray) -> None:
+        order = np.argsort(list_ids, kind="stable")
+        list_ids, slots = list_ids[order], slots[order]
+        boundaries = np.flatnonzero(np.diff(list_ids)) + 1
+        for group in np.split(np.arange(len(slots)), boundaries):
+            if len(group) == 0:
+                continue
+            list_id = int(list_ids[group[0]])
+            size = int(self._sizes[list_id])
+            members = self._lists[list_id]
+            if size + len(group) > len(members):
+                # Grow geometrically so appends stay amortized O(1)
+                grown = np.empty(max(2 * len(members), size + len(group)), dtype=np.int32)
+                grown[:size] = members[:size]
+                members = self._lists[list_id] = grown
+            members[size:size + len(group)] = slots[group]
+            self.position[slots[group]] = np.arange(size, size + len(group))
+            self.list_of[slots[group]] = list_id
+            self._sizes[list_id] = size + len(group)
+
+
+class SemanticQueryCache:
+    """
+    Query results keyed by meaning: a lookup returns the result stored for the most
+    similar earlier query (cosine similarity at least `threshold`) with the same guard.
+    Holds at most `max_entries` results, evicting the least recently used first, and
+    drops results older than `ttl` seconds.
+    """
+
+    def __init__(self, embedder: Optional[HashedNgramEmbedder] = None, max_entries: int = 10000,
+                 threshold: float = 0.9, ttl: Optional[float] = 300.0, nlist: Optional[int] = None,
+                 nprobe: int = 8, candidates: int = 4):
+        self.embedder = embedder or HashedNgramEmbedder()
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+        self.candidates = candidates
+        self.index = IVFIndex(self.embedder.dim, max_entries, nlist=nlist, nprobe=nprobe)
+        # slot -> (guard, value, expires_at), least recently used first
+        self._entries: "OrderedDict[int, Tuple[str, Any, Optional[float]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def get(self, text: str, guard: str = "", keywords: Sequence[str] = ()) -> Optional[Any]:
+        """Return a copy of the result stored for a similar query with the same guard, or None."""
+        match = self._match(self.embedder.embed(text, keywords), guard)
+        if match is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(match)
+        return copy.deepcopy(self._entries[match][1])
+
+    def set(self, text: str, guard: str, value: Any, keywords: Sequence[str] = ()) -> None:
+        """Store a result. A near-identical query with the same guard has its result replaced."""
+        vector = self.embedder.embed(text, keywords)
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        match = self._match(vector, guard, threshold=0.999)
+        if match is not None:
+            self._entries[match] = (guard, copy.deepcopy(value), expires_at)
+            self._entries.move_to_end(match)
+            return
+        while len(self._entries) >= self.max_entries:
+            slot, _ = self._entries.popitem(last=False)
+            self.index.remove(slot)
+            self.evicted += 1
+        slot = self.index.add(vector)
+        self._entries[slot] = (guard, copy.deepcopy(value), expires_at)
+
+    def clear(self) -> None:
+        for slot in list(self._entries):
+            self.index.remove(slot)
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "evicted": self.evicted,
+            "threshold": self.threshold,
+            "index": self.index.stats()
+        }
+
+    def _match(self, vector: np.ndarray, guard: str, threshold: Optional[float] = None) -> Optional[int]:
+        """Slot of the most similar live entry with the same guard, if it clears the threshold."""
+        threshold = self.threshold if threshold is None else threshold
+        slots, similarities = self.index.search(vector, self.candidates)
+        now = time.time()
+        for slot, similarity in zip(slots.tolist(), similarities.tolist()):
+            if similarity < threshold:
+                break
+            entry_guard, _, expires_at = self._entries[slot]
+            if expires_at is not None and expires_at <= now:
+                del self._entries[slot]
+                self.index.remove(slot)
+                continue
+            if entry_guard == guard:
+                return slot
+        return None
@@ -0,0 +1,50 @@
+import asyncio
+import copy
+from typing import Dict, Any, Awaitable, Callable, List, Tuple
+
+from core.metrics import COALESCED_REQUESTS
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one in-flight execution.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same result instead of starting their own. When
+    callers were coalesced, each gets its own deep copy of the result, so one
+    caller's changes to it never reach another.
+    """
+
+    def __init__(self):
+        # key -> (task, [callers awaiting it])
+        self._in_flight: Dict[str, Tuple[asyncio.Task, List[int]]] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `func` once per key among concurrent callers and share its result."""
+        self.calls += 1
+        flight = self._in_flight.get(key)
+        if flight is None:
+            self.executions += 1
+            # Run the work in its own task so one caller disconnecting does not cancel it for the others
+            flight = (asyncio.create_task(func()), [0])
+            self._in_flight[key] = flight
+            flight[0].add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+            COALESCED_REQUESTS.inc()
+        task, callers = flight
+        callers[0] += 1
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result) if callers[0] > 1 else result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call, execution and coalescing counters."""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight)
+        }
@@ -0,0 +1,241 @@
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Callable, Union, AsyncIterator, Tuple
+from core.deadlines import cap_timeout, time_remaining
+
+TaskSpec = Union[Dict[str, Any], Callable[[Dict[str, Any]], Dict[str, Any]]]
+
+
+class NodeCancelledError(Exception):
+    """Raised when a node (or one of its dependencies) was cancelled."""
+    pass
+
+
+class DependencyFailedError(Exception):
+    """Raised by a node that could not run because one of its dependencies failed."""
+    pass
+
+# Node outcomes reported by TaskGraph.run_partial
+OK = "ok"
+FALLBACK = "fallback"
+FAILED = "failed"
+TIMEOUT = "timeout"
+SKIPPED = "skipped"
+
+
+class TaskNode:
+    def __init__(self, name: str, agent: Any, task: TaskSpec,
+                 depends_on: Optional[List[str]] = None, timeout: Optional[float] = None,
+                 fallback: Any = None, hedge_after: Optional[float] = None):
+        """
+        A single agent call in a task graph.
+
+        `task` is either a ready task dict or a callable that receives the
+        results of the nodes listed in `depends_on` and returns the task dict.
+        With a `fallback` agent, the same task is also sent to it when the primary
+        fails or has not answered after `hedge_after` seconds; the first success wins.
+        """
+        self.name = name
+        self.agent = agent
+        self.task = task
+        self.depends_on = depends_on or []
+        self.timeout = timeout
+        self.fallback = fallback
+        self.hedge_after = hedge_after
+
+    def build_task(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the task dict for this node from its dependency outputs."""
+        if callable(self.task):
+            return self.task(inputs)
+        return self.task
+
+
+class TaskGraph:
+    def __init__(self, default_timeout: Optional[float] = None):
+        self.nodes: Dict[str, TaskNode] = {}
+        self.default_timeout = default_timeout
+        self._running: Dict[str, asyncio.Task] = {}
+        self._served_by_fallback: set = set()
+        # Why each node without a result failed, filled in by run_partial
+        self.errors: Dict[str, BaseException] = {}
+
+    def add_node(self, name: str, agent: Any, task: TaskSpec,
+                 depends_on: Optional[List[str]] = None, timeout: Optional[float] = None,
+                 fallback: Any = None, hedge_after: Optional[float] = None) -> TaskNode:
+        """Register a node. Dependencies must already be in the graph, which keeps it acyclic."""
+        if name in self.nodes:
+            raise ValueError(f"Duplicate node: {name}")
+        for dependency in depends_on or []:
+            if dependency not in self.nodes:
+                raise ValueError(f"Unknown dependency '{dependency}' for node '{name}'")
+        node = TaskNode(name, agent, task, depends_on, timeout, fallback, hedge_after)
+        self.nodes[name] = node
+        return node
+
+    def cancel(self, name: str) -> bool:
+        """Cancel a running node. Nodes depending on it fail with NodeCancelledError."""
+        running = self._running.get(name)
+        if running is None or running.done():
+            return False
+        return running.cancel()
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Execute the graph, starting every node as soon as its dependencies finish.
+        Returns a mapping of node name to agent result.
+        """
+        self._start()
+        try:
+            outcomes = await asyncio.gather(*self._running.values(), return_exceptions=True)
+        finally:
+            for running in self._running.values():
+                if not running.done():
+                    running.cancel()
+
+        results = {}
+        for name, outcome in zip(self._running, outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise NodeCancelledError(f"Node '{name}' was cancelled")
+            if isinstance(outcome, BaseException):
+                raise outcome
+            results[name] = outcome
+        return results
+
+    async def run_iter(self) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Execute the graph and yield (node name, agent result) pairs in completion order.
+        The first failing node cancels the rest and its error is raised.
+        """
+        self._start()
+        pending = set(self._running.values())
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for running in done:
+                    name = running.get_name()
+                    if running.cancelled():
+                        raise NodeCancelledError(f"Node '{name}' was cancelled")
+                    yield name, running.result()
+        finally:
+            for running in self._running.values():
+                if not running.done():
+                    running.cancel()
+                elif not running.cancelled():
+                    # Mark sibling failures as retrieved; only the first one is raised
+                    running.exception()
+
+    async def run_partial(self) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """
+        Execute the graph until every node settles or the request deadline passes, without
+        letting one node's failure stop the others. Returns the results of the nodes that
+        succeeded and a status per node: ok, fallback (answered by the fallback agent),
+        failed, timeout, or skipped (a dependency did not succeed).
+        """
+        self._start()
+        start = time.perf_counter()
+        settled_at: Dict[str, float] = {}
+
+        def settled(running: asyncio.Task) -> None:
+            settled_at[running.get_name()] = time.perf_counter() - start
+
+        for running in self._running.values():
+            running.add_done_callback(settled)
+        try:
+            _, pending = await asyncio.wait(self._running.values(), timeout=time_remaining())
+        finally:
+            for running in self._running.values():
+                if not running.done():
+                    running.cancel()
+        if pending:
+            # Let cancelled nodes unwind so their agent calls release pool workers
+            await asyncio.wait(pending)
+
+        results: Dict[str, Any] = {}
+        statuses: Dict[str, Dict[str, Any]] = {}
+        self.errors = {}
+        for name, running in self._running.items():
+            waiting_on = [dependency for dependency in self.nodes[name].depends_on if dependency not in results]
+            if running in pending:
+                if waiting_on:
+                    error = DependencyFailedError(f"Dependency '{waiting_on[0]}' of node '{name}' did not finish in time")
+                else:
+                    error = TimeoutError(f"Node '{name}' did not finish before the request deadline")
+            else:
+                error = NodeCancelledError(f"Node '{name}' was cancelled") if running.cancelled() else running.exception()
+            if isinstance(error, TimeoutError):
+                status = {"status": TIMEOUT}
+            elif isinstance(error, (DependencyFailedError, NodeCancelledError)):
+                status = {"status": SKIPPED}
+            elif error is not None:
+                status = {"status": FAILED, "error": str(error) or type(error).__name__}
+            else:
+                results[name] = running.result()
+                status = {"status": FALLBACK if name in self._served_by_fallback else OK}
+            if error is not None:
+                self.errors[name] = error
+            if running not in pending:
+                status["elapsed_ms"] = round(settled_at.get(name, 0.0) * 1000, 1)
+            statuses[name] = status
+        return results, statuses
+
+    def _start(self) -> None:
+        """Create one asyncio task per node."""
+        self._running = {}
+        self._served_by_fallback = set()
+        # Nodes are inserted in dependency order, so every dependency's task exists already
+        for name, node in self.nodes.items():
+            self._running[name] = asyncio.create_task(self._run_node(node), name=name)
+
+    async def _run_node(self, node: TaskNode) -> Any:
+        """Wait for dependencies, then run the node's agent call under its timeout."""
+        inputs = {}
+        for dependency in node.depends_on:
+            try:
+                inputs[dependency] = await asyncio.shield(self._running[dependency])
+            except asyncio.CancelledError:
+                if not self._running[dependency].cancelled():
+                    raise
+                raise NodeCancelledError(f"Dependency '{dependency}' of node '{node.name}' was cancelled")
+            except Exception as e:
+                raise DependencyFailedError(f"Dependency '{dependency}' of node '{node.name}' failed: {e}") from e
+
+        task = node.build_task(inputs)
+        # Never wait past the request deadline, whatever the node's own timeout
+        timeout = cap_timeout(node.timeout if node.timeout is not None else self.default_timeout)
+        call = node.agent.process_task(task) if node.fallback is None else self._hedged_call(node, task)
+        running = asyncio.ensure_future(call)
+        try:
+            done, _ = await asyncio.wait({running}, timeout=timeout)
+        except asyncio.CancelledError:
+            running.cancel()
+            raise
+        if not done:
+            running.cancel()
+            await asyncio.wait({running})
+            raise TimeoutError(f"Node '{node.name}' timed out after {timeout:.3g}s")
+        # A TimeoutError the agent raised itself (an upstream read timeout, say) propagates unchanged
+        return running.result()
+
+    async def _hedged_call(self, node: TaskNode, task: Dict[str, Any]) -> Any:
+        """Run the primary agent, backing it up with the fallback once it fails or runs late."""
+        primary = asyncio.create_task(node.agent.process_task(task))
+        backup = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=node.hedge_after)
+            if done and primary.exception() is None:
+                return primary.result()
+            backup = asyncio.create_task(node.fallback.process_task(task))
+            pending = {backup} if done else {primary, backup}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    if finished.exception() is None:
+                        if finished is backup:
+                            self._served_by_fallback.add(node.name)
+                        return finished.result()
+            # Both failed; the primary's error is the one worth reporting
+            raise primary.exception()
+        finally:
+            for call in (primary, backup):
+                if call is not None and not call.done():
+                    call.cancel()
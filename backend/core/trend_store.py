@@ -0,0 +1,375 @@
+"""
+Market trend aggregates built by streaming historical campaign outcome logs.
+
+Logs are CSV or JSON Lines files (optionally gzipped) with one campaign outcome
+per row:
+
+    date            ISO date the outcome was recorded (YYYY-MM-DD, longer timestamps are truncated)
+    category        product category, e.g. skincare
+    platform        e.g. Instagram
+    spend, revenue, reach, engagements, conversions
+                    numbers; missing values count as 0
+
+Files are read row by row and folded into the store in fixed-size chunks, so
+memory use does not depend on file size. The store keeps weekly sums per
+category, platform and week, and is updated in place as new files arrive.
+Files already ingested are skipped, and files appended to since resume after
+the rows already read. After each ingest the per-category trend
+summaries (rolling means, growth rates, seasonal indices, campaign activity)
+are recomputed from the sums, so reading one is a dict lookup.
+
+A store is a directory:
+
+    meta.json       category and platform vocabularies, first week, ingested files
+    cells.npy       float64 (categories, platforms, weeks, len(METRICS)) weekly sums
+    summaries.json  precomputed trend summary per category
+
+Ingest logs from the backend directory:
+
+    python -m core.trend_store /var/lib/marketmuse/trends logs/2023.csv.gz logs/2024.jsonl
+"""
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import os
+from typing import Dict, Any, List, Optional, Iterable, Iterator
+
+import numpy as np
+import orjson
+
+from core.bitsets import Vocabulary
+
+FORMAT_VERSION = 1
+
+METRICS = ("campaigns", "spend", "revenue", "reach", "engagements", "conversions")
+CHUNK_ROWS = 50_000
+# Bytes at the start of a log compared to check that a grown file was appended to, not rewritten
+PREFIX_BYTES = 65_536
+
+# Weeks start on Monday; week 0 is the week of 1970-01-05
+_EPOCH_MONDAY = np.datetime64("1970-01-05", "D")
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def iter_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield rows from a CSV or JSON Lines log, one at a time."""
+    opener = gzip.open if path.endswith(".gz") else open
+    name = path[:-3] if path.endswith(".gz") else path
+    with opener(path, "rb") as raw:
+        if name.endswith((".jsonl", ".ndjson")):
+            for line in raw:
+                if line.strip():
+                    yield orjson.loads(line)
+        else:
+            yield from csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8", newline=""))
+
+
+def iter_chunks(rows: Iterable[Dict[str, Any]], size: int = CHUNK_ROWS) -> Iterator[List[Dict[str, Any]]]:
+    """Group rows into lists of at most `size`."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _codes(values: List[Any], vocabulary: Vocabulary, normalize) -> np.ndarray:
+    """Intern a column, normalising each distinct raw value once."""
+    mapping = {value: vocabulary.intern(normalize(value)) for value in set(values)}
+    return np.array([mapping[value] for value in values], dtype=np.intp)
+
+
+def _column(values: List[Any]) -> np.ndarray:
+    """Convert a numeric column in one pass, falling back per value when some are malformed. Missing values are 0."""
+    try:
+        column = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([_number(value) for value in values], dtype=np.float64)
+    column[np.isnan(column)] = 0.0
+    return column
+
+
+def _number(value: Any) -> float:
+    if value in (None, ""):
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _key(value: Any) -> str:
+    return " ".join(str(value or "").lower().split())
+
+
+class TrendStore:
+    """Weekly campaign outcome sums per category and platform, with precomputed trend summaries per category."""
+
+    def __init__(self, categories: Optional[Vocabulary] = None, platforms: Optional[Vocabulary] = None,
+                 first_week: int = 0, cells: Optional[np.ndarray] = None,
+                 ingested: Optional[Dict[str, Any]] = None, summaries: Optional[Dict[str, Any]] = None):
+        self.categories = categories or Vocabulary()
+        self.platforms = platforms or Vocabulary()
+        self.first_week = first_week
+        self.cells = cells if cells is not None else np.zeros((0, 0, 0, len(METRICS)))
+        self.ingested = ingested or {}
+        self.summaries = summaries or {}
+        self.skipped_rows = 0
+
+    @classmethod
+    def open(cls, path: str) -> "TrendStore":
+        """Open a store directory, or start an empty store if it does not exist yet."""
+        if not os.path.exists(os.path.join(path, "meta.json")):
+            return cls()
+        with open(os.path.join(path, "meta.json")) as meta_file:
+            meta = json.load(meta_file)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported trend store version: {meta.get('version')}")
+        with open(os.path.join(path, "summaries.json"), "rb") as summaries_file:
+            summaries = orjson.loads(summaries_file.read())
+        cells = np.load(os.path.join(path, "cells.npy"))
+        return cls(Vocabulary(meta["categories"]), Vocabulary(meta["platforms"]), meta["first_week"],
+                   cells, meta["ingested"], summaries)
+
+    def save(self, path: str) -> None:
+        """Write the store directory, header last so a half-written directory never opens."""
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "cells.npy"), self.cells)
+        with open(os.path.join(path, "summaries.json"), "wb") as summaries_file:
+            summaries_file.write(orjson.dumps(self.summaries))
+        with open(os.path.join(path, "meta.json"), "w") as meta_file:
+            json.dump({"version": FORMAT_VERSION, "categories": self.categories.values,
+                       "platforms": self.platforms.values, "first_week": self.first_week,
+                       "metrics": list(METRICS), "ingested": self.ingested}, meta_file)
+
+    @property
+    def weeks(self) -> int:
+        return self.cells.shape[2]
+
+    def ingest_file(self, path: str, chunk_rows: int = CHUNK_ROWS) -> int:
+        """
+        Stream a log file into the store and refresh the summaries. Returns rows added.
+
+        A file whose size and modification time are unchanged since it was ingested is
+        skipped. A file that has only been appended to resumes after the rows already
+        read, so they are not counted twice. A file that was truncated or rewritten
+        raises ValueError, since its old rows cannot be taken back out of the sums.
+        """
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        previous = self.ingested.get(key)
+        if previous is not None and (previous["size"], previous["mtime"]) == (stat.st_size, stat.st_mtime):
+            return 0
+        resume_after = 0
+        if previous is not None:
+            if ("rows" not in previous or stat.st_size < previous["size"]
+                    or _prefix_digest(path, previous["size"]) != previous["prefix"]):
+                raise ValueError(f"{path} changed other than by appending since it was ingested; rebuild the store")
+            resume_after = previous["rows"]
+        read = [resume_after]
+
+        def counted(rows: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+            for row in rows:
+                read[0] += 1
+                yield row
+
+        added = self.ingest(counted(itertools.islice(iter_rows(path), resume_after, None)), chunk_rows)
+        # Rows read, not rows added, so rows skipped for a bad date are not re-read either
+        self.ingested[key] = {"size": stat.st_size, "mtime": stat.st_mtime, "rows": read[0],
+                              "prefix": _prefix_digest(path, stat.st_size)}
+        return added
+
+    def ingest(self, rows: Iterable[Dict[str, Any]], chunk_rows: int = CHUNK_ROWS) -> int:
+        """Fold rows into the weekly sums chunk by chunk, then refresh the summaries. Returns rows added."""
+        added = 0
+        for chunk in iter_chunks(rows, chunk_rows):
+            added += self._add_chunk(chunk)
+        self.refresh()
+        return added
+
+    def _add_chunk(self, chunk: List[Dict[str, Any]]) -> int:
+        """Add one chunk of rows with a bincount per metric over flattened (category, platform, week) cells."""
+        dates = [str(row.get("date") or "")[:10] for row in chunk]
+        try:
+            days = np.array(dates, dtype="datetime64[D]")
+        except ValueError:
+            days = np.array([_parse_day(date) for date in dates], dtype="datetime64[D]")
+        valid = ~np.isnat(days)
+        self.skipped_rows += int((~valid).sum())
+        if not valid.any():
+            return 0
+        chunk = [row for row, keep in zip(chunk, valid.tolist()) if keep]
+        weeks = ((days[valid] - _EPOCH_MONDAY).astype(np.int64) // 7)
+        categories = _codes([row.get("category") for row in chunk], self.categories, lambda value: _key(value) or "unknown")
+        platforms = _codes([row.get("platform") for row in chunk], self.platforms,
+                           lambda value: str(value or "unknown").strip())
+        values = np.ones((len(chunk), len(METRICS)))
+        for index, metric in enumerate(METRICS[1:], start=1):
+            values[:, index] = _column([row.get(metric) for row in chunk])
+
+        self._ensure_shape(int(weeks.min()), int(weeks.max()))
+        shape = self.cells.shape[:3]
+        flat = np.ravel_multi_index((categories, platforms, weeks - self.first_week), shape)
+        cells = self.cells.reshape(-1, len(METRICS))
+        for metric in range(len(METRICS)):
+            cells[:, metric] += np.bincount(flat, weights=values[:, metric], minlength=cells.shape[0])
+        return len(chunk)
+
+    def _ensure_shape(self, first_week: int, last_week: int) -> None:
+        """Grow the cell array to cover every interned category and platform and the given weeks."""
+        if self.weeks == 0:
+            self.first_week = first_week
+        before = max(self.first_week - first_week, 0)
+        after = max(last_week - (self.first_week + self.weeks - 1), 0) if self.weeks else last_week - first_week + 1
+        pad = ((0, len(self.categories) - self.cells.shape[0]), (0, len(self.platforms) - self.cells.shape[1]),
+               (before, after), (0, 0))
+        if any(width for side in pad for width in side):
+            self.cells = np.pad(self.cells, pad)
+            self.first_week -= before
+
+    def refresh(self) -> None:
+        """Recompute every category's trend summary from the weekly sums."""
+        # Every category shares the store's last week, so categories gone quiet show their decline
+        self.summaries = {
+            category: _summarize(self.cells[code], self.platforms.values, self.first_week)
+            for code, category in enumerate(self.categories.values)
+        } if self.weeks else {}
+
+    def summary(self, category: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Precomputed trend summary for a product category, or None if the logs never mention it."""
+        return self.summaries.get(_key(category))
+
+    def market_data(self, category: Optional[str]) -> Optional[Dict[str, Any]]:
+        """The trend_analysis task fields for a category, rendered from its summary."""
+        summary = self.summary(category)
+        if summary is None:
+            return None
+        growth = summary["growth"]
+        activity = summary["activity"]
+        seasonal = summary["seasonality"]
+        seasonal_text = "not enough history for seasonal indices"
+        if seasonal is not None:
+            peak = max(seasonal["monthly_index"], key=seasonal["monthly_index"].get)
+            seasonal_text = (f"upcoming month index {seasonal['upcoming_index']:.2f}; "
+                             f"peak month {peak} ({seasonal['monthly_index'][peak]:.2f})")
+        return {
+            "market_size": f"${summary['market_size']:,.0f} campaign revenue over the trailing 52 weeks",
+            "growth_rate": "not enough history" if growth["rate"] is None else f"{growth['rate']:+.1f}% ({growth['basis']})",
+            "competitor_data": (f"{activity['campaigns_13w']:.0f} campaigns in the last 13 weeks"
+                                + ("" if activity["change_pct"] is None else f" ({activity['change_pct']:+.1f}% vs the 13 before)")),
+            "seasonal_data": seasonal_text
+        }
+
+
+def _prefix_digest(path: str, size: int) -> str:
+    """Digest of the file's first bytes, up to `size`, to tell an appended file from a rewritten one."""
+    with open(path, "rb") as raw:
+        return hashlib.blake2b(raw.read(min(size, PREFIX_BYTES)), digest_size=16).hexdigest()
+
+
+def _parse_day(value: str) -> np.datetime64:
+    try:
+        return np.datetime64(value, "D")
+    except ValueError:
+        return np.datetime64("NaT")
+
+
+def _window(series: np.ndarray, weeks: int, offset: int = 0) -> Optional[np.ndarray]:
+    """The `weeks` values ending `offset` weeks before the last, or None if the series is too short."""
+    end = len(series) - offset
+    if end - weeks < 0:
+        return None
+    return series[end - weeks:end]
+
+
+def _change(series: np.ndarray, weeks: int) -> Optional[float]:
+    recent, previous = _window(series, weeks), _window(series, weeks, weeks)
+    if recent is None or previous is None or previous.sum() <= 0:
+        return None
+    return round(float(recent.sum() / previous.sum() - 1) * 100, 1)
+
+
+def _summarize(cells: np.ndarray, platforms: List[str], first_week: int) -> Dict[str, Any]:
+    """Trend summary of one category from its (platforms, weeks, metrics) sums."""
+    weekly = cells.sum(axis=0)
+    campaigns, spend, revenue = weekly[:, 0], weekly[:, 1], weekly[:, 2]
+    year = _window(revenue, 52) if len(revenue) >= 52 else revenue
+
+    def rolling(weeks: int) -> Dict[str, float]:
+        window = weekly[-weeks:]
+        return {metric: round(float(window[:, index].mean()), 2) for index, metric in enumerate(METRICS)}
+
+    if len(revenue) >= 104:
+        growth = {"rate": _change(revenue, 52), "basis": "year over year"}
+    else:
+        growth = {"rate": _change(revenue, 13), "basis": "last 13 weeks vs the 13 before"}
+    recent_spend = float(_window(spend, 13).sum()) if len(spend) >= 13 else float(spend.sum())
+    recent_revenue = float(_window(revenue, 13).sum()) if len(revenue) >= 13 else float(revenue.sum())
+    by_platform = cells[:, -13:, 2].sum(axis=1)
+    platform_total = float(by_platform.sum())
+    return {
+        "as_of_week": str(_EPOCH_MONDAY + np.timedelta64(7 * (first_week + len(revenue) - 1), "D")),
+        "weeks_of_history": int(len(revenue) - np.argmax(campaigns > 0)) if campaigns.any() else 0,
+        "market_size": round(float(year.sum()), 2),
+        "rolling_4w": rolling(4),
+        "rolling_13w": rolling(13),
+        "growth": growth,
+        "roi_13w": round((recent_revenue - recent_spend) / recent_spend * 100, 1) if recent_spend > 0 else None,
+        "activity": {
+            "campaigns_13w": float(_window(campaigns, 13).sum()) if len(campaigns) >= 13 else float(campaigns.sum()),
+            "change_pct": _change(campaigns, 13)
+        },
+        "platform_share_13w": {
+            platform: round(float(share) / platform_total, 3)
+            for platform, share in zip(platforms, by_platform) if share > 0
+        } if platform_total > 0 else {},
+        "seasonality": _seasonality(revenue, first_week)
+    }
+
+
+def _seasonality(revenue: np.ndarray, first_week: int) -> Optional[Dict[str, Any]]:
+    """
+    Monthly seasonal indices by the ratio-to-moving-average method: each week's revenue over
+    its centred 52-week mean, averaged per calendar month and normalised to a mean of 1.
+    Needs at least two years of history.
+    """
+    if len(revenue) < 104:
+        return None
+    cumulative = np.concatenate([[0.0], np.cumsum(revenue)])
+    centre = np.arange(26, len(revenue) - 26)
+    moving = (cumulative[centre + 26] - cumulative[centre - 26]) / 52
+    ratios = np.where(moving > 0, revenue[centre] / np.maximum(moving, 1e-9), np.nan)
+    mondays = _EPOCH_MONDAY + (7 * (first_week + centre)).astype("timedelta64[D]")
+    months = mondays.astype("datetime64[M]").astype(np.int64) % 12
+    index = np.array([np.nanmean(ratios[months == month]) if np.any(months == month) else np.nan
+                      for month in range(12)])
+    if np.isnan(index).all():
+        return None
+    index = np.where(np.isnan(index), 1.0, index)
+    index /= index.mean()
+    last_monday = _EPOCH_MONDAY + np.timedelta64(7 * (first_week + len(revenue) - 1), "D")
+    upcoming = (last_monday.astype("datetime64[M]").astype(np.int64) + 1) % 12
+    return {
+        "monthly_index": {month: round(float(value), 3) for month, value in zip(MONTHS, index)},
+        "upcoming_index": round(float(index[upcoming]), 3)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream campaign outcome logs into a trend store")
+    parser.add_argument("store_path")
+    parser.add_argument("logs", nargs="+")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+    store = TrendStore.open(args.store_path)
+    for log in args.logs:
+        print(f"{log}: {store.ingest_file(log, args.chunk_rows)} rows")
+    store.save(args.store_path)
+    print(f"{len(store.categories)} categories, {store.weeks} weeks, {store.skipped_rows} rows skipped")
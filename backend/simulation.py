@@ -1,16 +1,18 @@
 import json
-from typing import Dict, List, Any
-import time
+from typing import Dict, List, Any, AsyncIterator
+import asyncio
 import random
+from core.query_parser import get_default_parser, brand_description, audience_description
 
 class Agent:
-    def __init__(self, name: str):
+    def __init__(self, name: str, latency_scale: float = 1.0):
         self.name = name
+        self.latency_scale = latency_scale
         
-    def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
-        """Simulate agent processing a task with a delay"""
+    async def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Simulate agent processing a task with a non-blocking delay"""
         print(f"{self.name} processing task: {task['query']}")
-        time.sleep(random.uniform(0.5, 1.5))  # Simulate processing time
+        await asyncio.sleep(random.uniform(0.5, 1.5) * self.latency_scale)  # Simulate processing time
         return self._generate_response(task)
     
     def _generate_response(self, task: Dict[str, Any]) -> Dict[str, Any]:
@@ -100,23 +102,67 @@ class Agent:
             return {"error": "Unknown agent type"}
 
 class QueryProcessor:
-    def __init__(self):
+    def __init__(self, latency_scale: float = 1.0):
         self.agents = {
-            "influencer_evaluator": Agent("InfluencerEvaluator"),
-            "campaign_predictor": Agent("CampaignPredictor"),
-            "optimization_strategist": Agent("OptimizationStrategist")
+            "influencer_evaluator": Agent("InfluencerEvaluator", latency_scale),
+            "campaign_predictor": Agent("CampaignPredictor", latency_scale),
+            "optimization_strategist": Agent("OptimizationStrategist", latency_scale)
         }
     
-    def process_query(self, query: str) -> Dict[str, Any]:
+    async def process_query(self, query: str) -> Dict[str, Any]:
         """Process a query by decomposing it and assigning subtasks to agents"""
-        # Extract key information from the query
-        query_lower = query.lower()
+        subtasks = self._decompose_query(query)
         
-        # Identify brand and product category
-        brand_info = "sustainable skincare brand" if "skincare" in query_lower else "brand"
+        # Process the subtasks concurrently with the appropriate agents
+        responses = await asyncio.gather(*[
+            self.agents[subtask["agent"]].process_task(subtask)
+            for subtask in subtasks
+        ])
+        agent_responses = {
+            subtask["agent"]: response
+            for subtask, response in zip(subtasks, responses)
+        }
         
-        # Identify target audience
-        target_audience = "Gen Z" if "gen z" in query_lower else "general audience"
+        # Generate a consolidated summary
+        summary = self._generate_summary(agent_responses)
+        
+        return {
+            "query": query,
+            "agent_responses": agent_responses,
+            "summary": summary
+        }
+
+    async def stream_query(self, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield each agent's response as soon as it completes, then the consolidated summary"""
+        subtasks = self._decompose_query(query)
+        pending = {
+            asyncio.create_task(self.agents[subtask["agent"]].process_task(subtask)): subtask["agent"]
+            for subtask in subtasks
+        }
+        agent_responses = {}
+        waiting = set(pending)
+        try:
+            while waiting:
+                done, waiting = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                for running in done:
+                    agent_name = pending[running]
+                    agent_responses[agent_name] = running.result()
+                    yield {"event": "agent_response", "agent_key": agent_name, "data": agent_responses[agent_name]}
+        finally:
+            for running in waiting:
+                running.cancel()
+        yield {"event": "summary", "data": {"query": query, "summary": self._generate_summary(agent_responses)}}
+
+    def process_query_sync(self, query: str) -> Dict[str, Any]:
+        """Blocking wrapper around process_query for scripts without an event loop"""
+        return asyncio.run(self.process_query(query))
+
+    def _decompose_query(self, query: str) -> List[Dict[str, Any]]:
+        """Break a query into one subtask per agent"""
+        # Extract key information from the query
+        entities = get_default_parser().parse(query)
+        brand_info = brand_description(entities)
+        target_audience = audience_description(entities)
         
         # Create subtasks for each agent
         subtasks = [
@@ -136,23 +182,7 @@ class QueryProcessor:
                 "task": f"Recommend optimization strategies for {brand_info} campaign targeting {target_audience} audiences"
             }
         ]
-        
-        # Process each subtask with the appropriate agent
-        agent_responses = {}
-        for subtask in subtasks:
-            agent_name = subtask["agent"]
-            agent = self.agents[agent_name]
-            response = agent.process_task(subtask)
-            agent_responses[agent_name] = response
-        
-        # Generate a consolidated summary
-        summary = self._generate_summary(agent_responses)
-        
-        return {
-            "query": query,
-            "agent_responses": agent_responses,
-            "summary": summary
-        }
+        return subtasks
     
     def _generate_summary(self, agent_responses: Dict[str, Any]) -> Dict[str, Any]:
         """Generate a consolidated summary from all agent responses"""
@@ -178,5 +208,5 @@ if __name__ == "__main__":
     processor = QueryProcessor()
     example_query = "Identify the optimal influencers and predict campaign outcomes for launching a new sustainable skincare brand targeting Gen Z audiences"
     
-    result = processor.process_query(example_query)
+    result = processor.process_query_sync(example_query)
     print(json.dumps(result, indent=2)) 
\ No newline at end of file
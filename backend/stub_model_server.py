@@ -0,0 +1,69 @@
+"""
+Local stand-in for a model provider, for exercising the HTTP model client.
+
+    uvicorn stub_model_server:app --port 8100
+    MARKETMUSE_MODEL_URL=http://localhost:8100 uvicorn api.main:app
+
+STUB_LATENCY adds a delay per call (seconds) and STUB_FAILURE_RATE makes a
+fraction of calls return 503 so retries and backoff can be observed. A batch of
+n prompts takes STUB_LATENCY * n ** STUB_BATCH_EXPONENT, and at most
+STUB_CONCURRENCY calls run at once, like a model server on one accelerator.
+"""
+import asyncio
+import json
+import os
+import random
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+app = FastAPI(title="MarketMuse stub model server")
+
+LATENCY = float(os.getenv("STUB_LATENCY", "0.05"))
+FAILURE_RATE = float(os.getenv("STUB_FAILURE_RATE", "0"))
+BATCH_EXPONENT = float(os.getenv("STUB_BATCH_EXPONENT", "0.3"))
+CONCURRENCY = int(os.getenv("STUB_CONCURRENCY", "0"))
+_limit = asyncio.Semaphore(CONCURRENCY) if CONCURRENCY > 0 else None
+
+class CompletionRequest(BaseModel):
+    agent: str
+    system: str
+    prompt: str
+
+class BatchCompletionRequest(BaseModel):
+    agent: str
+    system: str
+    prompts: List[str]
+
+def _completion(agent: str, prompt: str) -> str:
+    return json.dumps({
+        "agent": agent,
+        "analysis": f"Stub analysis of a {len(prompt)}-character prompt",
+        "recommendations": ["Stub recommendation"]
+    })
+
+async def _run(prompts: int) -> bool:
+    """Simulate one model call over `prompts` prompts; False when it should fail."""
+    if _limit is None:
+        await asyncio.sleep(LATENCY * prompts ** BATCH_EXPONENT)
+    else:
+        async with _limit:
+            await asyncio.sleep(LATENCY * prompts ** BATCH_EXPONENT)
+    return random.random() >= FAILURE_RATE
+
+def _overloaded() -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": "stub overloaded"}, headers={"Retry-After": "0"})
+
+@app.post("/v1/complete")
+async def complete(request: CompletionRequest):
+    if not await _run(1):
+        return _overloaded()
+    return {"completion": _completion(request.agent, request.prompt)}
+
+@app.post("/v1/complete/batch")
+async def complete_batch(request: BatchCompletionRequest):
+    if not await _run(len(request.prompts)):
+        return _overloaded()
+    return {"completions": [_completion(request.agent, prompt) for prompt in request.prompts]}
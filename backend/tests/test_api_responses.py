@@ -0,0 +1,25 @@
+import asyncio
+import os
+
+import httpx
+
+os.environ.setdefault("MARKETMUSE_SIMULATION", "false")
+from api import main  # noqa: E402
+
+
+def test_invalid_agent_result_is_a_bad_gateway(monkeypatch):
+    async def malformed(query, deadline=None):
+        return {"query": query, "agent_responses": {"trend_analysis": "not an object"}, "summary": {}}
+
+    monkeypatch.setattr(main, "TRUSTED_RESPONSES", False)
+    monkeypatch.setattr(main.orchestrator, "process_query", malformed)
+
+    async def post():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/process-query", json={"query": "skincare for gen z"})
+
+    response = asyncio.run(post())
+
+    assert response.status_code == 502
+    assert ["response", "agent_responses", "trend_analysis"] in [error["loc"] for error in response.json()["errors"]]
@@ -0,0 +1,51 @@
+import asyncio
+
+from core.batching import BatchingModelClient
+from core.model_client import ModelClient, ModelClientError
+
+
+class ShortBatchBackend(ModelClient):
+    """Answers every batch with one completion too few."""
+
+    async def complete(self, agent_name, system_prompt, prompt, task_type=None):
+        return prompt
+
+    async def complete_batch(self, agent_name, system_prompt, prompts, task_type=None):
+        return prompts[:-1]
+
+
+class EchoBackend(ModelClient):
+    def __init__(self):
+        self.batch_sizes = []
+
+    async def complete(self, agent_name, system_prompt, prompt, task_type=None):
+        return prompt
+
+    async def complete_batch(self, agent_name, system_prompt, prompts, task_type=None):
+        self.batch_sizes.append(len(prompts))
+        return [f"re: {prompt}" for prompt in prompts]
+
+
+def gather_completions(client, count):
+    async def main():
+        try:
+            return await asyncio.wait_for(asyncio.gather(
+                *[client.complete("Agent", "system", f"prompt {index}") for index in range(count)],
+                return_exceptions=True), timeout=1)
+        finally:
+            await client.aclose()
+    return asyncio.run(main())
+
+
+def test_every_caller_gets_its_own_completion():
+    backend = EchoBackend()
+    results = gather_completions(BatchingModelClient(backend, max_batch_size=4, max_wait=0.01), 6)
+    assert results == [f"re: prompt {index}" for index in range(6)]
+    assert backend.batch_sizes == [4, 2]
+
+
+def test_wrong_completion_count_fails_every_caller_instead_of_hanging():
+    results = gather_completions(BatchingModelClient(ShortBatchBackend(), max_batch_size=3, max_wait=0.01), 3)
+    assert len(results) == 3
+    for result in results:
+        assert isinstance(result, ModelClientError)
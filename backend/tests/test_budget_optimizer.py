@@ -0,0 +1,44 @@
+import pytest
+
+from core.budget_optimizer import BudgetOptimizer
+from core.forecast import CampaignForecaster
+
+UNPROFITABLE = {"name": "steady", "platform": "Instagram", "followers": 100000, "engagement_rate": 3.0}
+PROFITABLE = {"name": "rising", "platform": "Instagram", "followers": 100000, "engagement_rate": 6.0, "score": 90}
+
+
+def test_unprofitable_budget_is_held_in_reserve():
+    forecaster = CampaignForecaster()
+    forecast = forecaster.forecast(5000, 8, 100000, 3.0)
+    assert forecast["predictions"]["estimated_roi"]["mean"] < 0
+
+    result = BudgetOptimizer(forecaster).allocate(5000, [UNPROFITABLE], weeks=8)
+
+    assert result["allocations"] == []
+    assert result["reserve"] == 5000
+    assert result["expected"]["roi"] is None
+    assert result["expected_improvements"] is None
+    assert result["recommendation"].startswith("Budget not worth spending")
+    # The even split books the same campaign the forecaster priced
+    assert result["even_split"]["roi"] == pytest.approx(forecast["predictions"]["estimated_roi"]["mean"], abs=0.1)
+
+
+def test_allocation_agrees_with_forecast():
+    forecaster = CampaignForecaster()
+    forecast = forecaster.forecast(5000, 8, 100000, 6.0, 0.9)
+
+    result = BudgetOptimizer(forecaster).allocate(5000, [PROFITABLE, UNPROFITABLE], weeks=8)
+
+    assert [allocation["name"] for allocation in result["allocations"]] == ["rising"]
+    assert result["allocations"][0]["roi"] == pytest.approx(forecast["predictions"]["estimated_roi"]["mean"], abs=0.1)
+    assert "recommendation" not in result
+    assert result["expected_improvements"]["roi_points"] > 0
+
+
+def test_duration_limits_spend():
+    forecaster = CampaignForecaster()
+    # One week of three $1,000 posts cannot absorb $50,000
+    result = BudgetOptimizer(forecaster).allocate(50000, [PROFITABLE], weeks=1)
+
+    assert 0 < result["allocated"] <= 3 * 1000
+    assert result["reserve"] >= 50000 - 3 * 1000
@@ -0,0 +1,39 @@
+import asyncio
+import threading
+
+from core.cache import ResponseCache, SqliteCacheBackend
+
+
+class RecordingSqliteBackend(SqliteCacheBackend):
+    """Records the thread every read and write runs on."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return super().get(key)
+
+    def set(self, key, value, ttl):
+        self.threads.append(threading.get_ident())
+        super().set(key, value, ttl)
+
+
+def test_sqlite_backend_runs_off_the_event_loop(tmp_path):
+    backend = RecordingSqliteBackend(str(tmp_path / "cache.db"))
+    cache = ResponseCache(backend)
+
+    async def main():
+        assert await cache.aget("key") is None
+        await cache.aset("key", {"result": 1})
+        return await cache.aget("key"), threading.get_ident()
+
+    value, loop_thread = asyncio.run(main())
+    stats = cache.stats()
+    backend.close()
+
+    assert value == {"result": 1}
+    assert len(backend.threads) == 3
+    assert loop_thread not in backend.threads
+    assert stats["hits"] == 1 and stats["misses"] == 1
@@ -0,0 +1,50 @@
+import asyncio
+import threading
+
+from core.jobs import JobQueue, SqliteJobStore, CANCELLED, SUCCEEDED
+
+
+class RecordingSqliteJobStore(SqliteJobStore):
+    """Records the thread every record read and write runs on."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.threads = set()
+
+    def save(self, record):
+        self.threads.add(threading.get_ident())
+        super().save(record)
+
+    def get(self, job_id):
+        self.threads.add(threading.get_ident())
+        return super().get(job_id)
+
+
+def test_sqlite_job_store_runs_off_the_event_loop(tmp_path):
+    store = RecordingSqliteJobStore(str(tmp_path / "jobs.db"))
+
+    async def main():
+        queue = JobQueue(store, workers=1)
+        await queue.start()
+        release = asyncio.Event()
+
+        async def blocked():
+            await release.wait()
+            return {"answer": 42}
+
+        first = await queue.submit("test", blocked)
+        second = await queue.submit("test", blocked)
+        cancelled = await queue.cancel(second["job_id"])
+        release.set()
+        finished = await queue.wait(first["job_id"], 5.0)
+        stats = await queue.stats()
+        await queue.shutdown(1.0)
+        return threading.get_ident(), finished, cancelled, stats
+
+    loop_thread, finished, cancelled, stats = asyncio.run(main())
+    store.close()
+
+    assert finished["status"] == SUCCEEDED and finished["result"] == {"answer": 42}
+    assert cancelled["status"] == CANCELLED
+    assert stats["stored"] == 2
+    assert store.threads and loop_thread not in store.threads
@@ -0,0 +1,22 @@
+import asyncio
+
+from core.orchestrator import Orchestrator
+from core.semantic_cache import SemanticQueryCache
+
+
+def test_paraphrases_share_a_result_but_constraints_and_audiences_do_not():
+    cache = SemanticQueryCache(max_entries=64)
+    orchestrator = Orchestrator(semantic_cache=cache)
+
+    async def ask(*queries):
+        for query in queries:
+            await orchestrator.process_query(query)
+
+    asyncio.run(ask("influencers for eco skincare aimed at Gen Z", "best Gen Z sustainable skincare creators"))
+    assert (cache.hits, len(cache)) == (1, 1)
+
+    # Same wording apart from a budget: the guard keeps the cached result out
+    asyncio.run(ask("influencers for eco skincare aimed at Gen Z with a $5k budget"))
+    # Another audience: the guard allows it, but the similarity threshold does not
+    asyncio.run(ask("influencers for eco skincare aimed at millennials"))
+    assert (cache.hits, len(cache)) == (1, 3)
@@ -0,0 +1,24 @@
+import asyncio
+
+from core.metrics import COALESCED_REQUESTS
+from core.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_run_with_separate_copies():
+    flight = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return {"items": [1]}
+
+    async def main():
+        return await asyncio.gather(*[flight.do("key", work) for _ in range(3)])
+
+    before = COALESCED_REQUESTS.value()
+    results = asyncio.run(main())
+    assert len(runs) == 1
+    assert COALESCED_REQUESTS.value() - before == 2
+    results[0]["items"].append(2)
+    assert results[1] == results[2] == {"items": [1]}
@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from core.task_graph import TaskGraph
+
+
+class SlowAgent:
+    name = "Slow"
+
+    async def process_task(self, task):
+        await asyncio.sleep(1)
+        return {"done": True}
+
+
+class UpstreamTimeoutAgent:
+    name = "Upstream"
+
+    async def process_task(self, task):
+        raise TimeoutError("upstream read timeout")
+
+
+def run_graph(agent, timeout=None):
+    graph = TaskGraph()
+    graph.add_node("node", agent, {}, timeout=timeout)
+    return asyncio.run(graph.run())
+
+
+def test_node_timeout_is_reported_as_node_timeout():
+    with pytest.raises(TimeoutError, match="Node 'node' timed out"):
+        run_graph(SlowAgent(), timeout=0.01)
+
+
+@pytest.mark.parametrize("timeout", [None, 5.0])
+def test_agent_timeout_propagates_unchanged(timeout):
+    with pytest.raises(TimeoutError, match="upstream read timeout"):
+        run_graph(UpstreamTimeoutAgent(), timeout=timeout)
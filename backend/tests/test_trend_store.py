@@ -0,0 +1,65 @@
+import csv
+import os
+
+import numpy as np
+import pytest
+
+from core.trend_store import TrendStore, METRICS
+
+FIELDS = ["date", "category", "platform", "spend", "revenue", "reach", "engagements", "conversions"]
+
+
+def write_rows(path, rows, mode="w"):
+    with open(path, mode, newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=FIELDS)
+        if mode == "w":
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def outcome(day, revenue):
+    return {"date": f"2024-01-{day:02d}", "category": "Skincare", "platform": "Instagram",
+            "spend": 100, "revenue": revenue, "reach": 1000, "engagements": 50, "conversions": 5}
+
+
+def totals(store):
+    return dict(zip(METRICS, store.cells.sum(axis=(0, 1, 2)).tolist()))
+
+
+def test_reingesting_an_appended_log_adds_only_the_new_rows(tmp_path):
+    log = str(tmp_path / "outcomes.csv")
+    write_rows(log, [outcome(day, 500) for day in range(1, 11)])
+    store = TrendStore()
+    assert store.ingest_file(log) == 10
+    assert store.ingest_file(log) == 0
+
+    write_rows(log, [outcome(day, 700) for day in range(11, 16)], mode="a")
+    os.utime(log, (1, 1))
+    assert store.ingest_file(log) == 5
+    assert totals(store)["campaigns"] == 15
+    assert totals(store)["revenue"] == 10 * 500 + 5 * 700
+    assert store.summary("skincare")["market_size"] == pytest.approx(8500)
+
+
+def test_resume_survives_save_and_open(tmp_path):
+    log, path = str(tmp_path / "outcomes.csv"), str(tmp_path / "store")
+    write_rows(log, [outcome(day, 500) for day in range(1, 6)])
+    store = TrendStore()
+    store.ingest_file(log)
+    store.save(path)
+
+    write_rows(log, [outcome(20, 900)], mode="a")
+    reopened = TrendStore.open(path)
+    assert reopened.ingest_file(log) == 1
+    assert totals(reopened)["revenue"] == 5 * 500 + 900
+
+
+def test_rewritten_log_is_rejected(tmp_path):
+    log = str(tmp_path / "outcomes.csv")
+    write_rows(log, [outcome(day, 500) for day in range(1, 11)])
+    store = TrendStore()
+    store.ingest_file(log)
+    write_rows(log, [outcome(day, 999) for day in range(1, 21)])
+    with pytest.raises(ValueError, match="other than by appending"):
+        store.ingest_file(log)
+    assert np.isclose(totals(store)["revenue"], 5000)
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { QueryResponse } from '../types';
+import { QueryResponse, QueryStreamEvent } from '../types';
 
 const API_BASE_URL = 'http://localhost:8000/api';
 
@@ -22,6 +22,39 @@ export const processQuery = async (query: string): Promise<QueryResponse> => {
     }
 };
 
+export const streamQuery = async (
+    query: string,
+    onEvent: (event: QueryStreamEvent) => void
+): Promise<void> => {
+    const response = await fetch(`${API_BASE_URL}/process-query/stream`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Accept': 'application/x-ndjson',
+        },
+        body: JSON.stringify({ query }),
+    });
+    if (!response.ok || !response.body) {
+        throw new Error('An error occurred while processing the query');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop() || '';
+        for (const line of lines) {
+            if (line.trim()) {
+                onEvent(JSON.parse(line) as QueryStreamEvent);
+            }
+        }
+    }
+};
+
 export const checkHealth = async (): Promise<boolean> => {
     try {
         const response = await api.get('/health');
@@ -1,31 +1,76 @@
+// Simulated 10th-50th-90th percentile range of a forecast metric
+export interface Interval {
+    low: number;
+    median: number;
+    high: number;
+    mean: number;
+}
+
+// A recommended (simulation) or shortlisted (catalog) influencer
+export interface InfluencerProfile {
+    name: string;
+    platform?: string | null;
+    followers?: number | string | null;
+    engagement_rate?: number | string | null;
+    relevance_score?: number | null;
+    reason?: string | null;
+    score?: number | null;
+    categories?: string[] | null;
+    audiences?: string[] | null;
+}
+
+export interface PredictedMetrics {
+    reach?: string | null;
+    engagement_rate?: string | null;
+    conversion_rate?: string | null;
+    estimated_roi?: string | null;
+}
+
+// Agent results come from model output, so any of these may be missing and others may be present
+export interface AgentResult {
+    recommended_influencers?: InfluencerProfile[] | null;
+    shortlist?: InfluencerProfile[] | null;
+    predicted_metrics?: PredictedMetrics | null;
+    predictions?: { [metric: string]: Interval } | null;
+    probability_of_profit?: number | null;
+    recommendations?: string[] | null;
+    confidence_score?: number | null;
+    key_factors?: string[] | null;
+    budget_allocation?: { [key: string]: any } | null;
+    timeline?: { [key: string]: any } | null;
+    [key: string]: any;
+}
+
 export interface AgentResponse {
     agent: string;
     query: string;
-    response: {
-        recommended_influencers?: Array<{
-            name: string;
-            platform: string;
-            followers: string;
-            engagement_rate: string;
-            relevance_score: number;
-            reason: string;
-        }>;
-        predicted_metrics?: {
-            reach: string;
-            engagement_rate: string;
-            conversion_rate: string;
-            estimated_roi: string;
-        };
-        recommendations?: string[];
-        confidence_score?: number;
-        key_factors?: string[];
-        budget_allocation?: {
-            [key: string]: string;
-        };
-        timeline?: {
-            [key: string]: string;
-        };
-    };
+    response: AgentResult;
+}
+
+export interface InfluencerSummary {
+    name?: string | null;
+    platform?: string | null;
+    score?: number | null;
+    match_reasons?: string[] | null;
+}
+
+// Simulation mode fills the string fields; production mode the numeric forecasts
+export interface ExpectedPerformance {
+    reach?: string;
+    engagement?: string;
+    roi?: Interval | string | null;
+    expected_reach?: Interval | null;
+    engagement_rate?: Interval | null;
+    conversion_rate?: Interval | null;
+    probability_of_profit?: number | null;
+    // Deduplicated audience across the campaign's influencers, when audience sketches are loaded
+    unique_audience?: number;
+}
+
+export interface AgentStatus {
+    status: 'ok' | 'fallback' | 'failed' | 'timeout' | 'skipped';
+    error?: string;
+    elapsed_ms?: number;
 }
 
 export interface QueryResponse {
@@ -34,13 +79,20 @@ export interface QueryResponse {
         [key: string]: AgentResponse;
     };
     summary: {
-        top_influencers: string[];
-        expected_performance: {
-            reach: string;
-            engagement: string;
-            roi: string;
-        };
+        // Names in simulation mode, catalog matches in production mode
+        top_influencers: Array<string | InfluencerSummary>;
+        expected_performance: ExpectedPerformance;
         key_recommendations: string[];
-        confidence_score: number;
+        confidence_score?: number | null;
     };
-} 
\ No newline at end of file
+    // Only present when the request ran under a deadline
+    partial?: boolean;
+    agent_status?: {
+        [key: string]: AgentStatus;
+    };
+} 
+
+export type QueryStreamEvent =
+    | { event: 'agent_response'; agent_key: string; data: AgentResponse }
+    | { event: 'summary'; data: { query: string; summary: QueryResponse['summary'] } }
+    | { event: 'error'; data: { detail: string } };
\ No newline at end of file